@@ -1,8 +1,8 @@
 # app.py — Landing BCS Blackbox (Partner Program)
+import sqlite3
 import streamlit as st
-import pandas as pd
-from datetime import datetime
-import os
+from services.landing_leads import SOURCE_PARTNER_KIT, capture_lead
+from utils.write_queue import AckTimeout, QueueFull
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="BCS Blackbox — Partner Program", page_icon="🧩", layout="wide")
@@ -33,13 +33,11 @@ st.markdown(
 )
 
 # --- Helper: save partner registrations locally ---
-REG_FILE = "partners_registrations.csv"
 def save_partner_submission(data: dict):
-    df = pd.DataFrame([data])
-    if os.path.exists(REG_FILE):
-        df.to_csv(REG_FILE, mode='a', index=False, header=False)
-    else:
-        df.to_csv(REG_FILE, index=False)
+    # Almacén único de las landings (antes partners_registrations.csv)
+    return capture_lead(SOURCE_PARTNER_KIT, data["name"], data["email"], phone=data["phone"],
+                        company=data["company"], sector=data["niche"], country=data["country"],
+                        message=data["notes"])
 
 # --- HERO SECTION ---
 with st.container():
@@ -232,7 +230,6 @@ with st.container():
                 st.warning("Por favor completa al menos nombre y correo.")
             else:
                 data = {
-                    "timestamp": datetime.utcnow().isoformat(),
                     "name": name,
                     "email": email,
                     "country": country,
@@ -241,9 +238,19 @@ with st.container():
                     "phone": phone,
                     "notes": notes
                 }
-                save_partner_submission(data)
-                st.success("✅ Registro recibido. Te enviaremos el Partner Kit en breve (simulado).")
-                st.info("Próximos pasos: capacitación, material comercial y demo para tus primeros clientes.")
+                try:
+                    save_partner_submission(data)
+                except QueueFull:
+                    st.error("Estamos recibiendo muchos registros. Inténtalo de nuevo en unos segundos.")
+                except AckTimeout:
+                    st.warning("El envío está tardando más de lo normal y es posible que ya lo hayamos recibido. Espera unos minutos antes de volver a enviarlo para no duplicarlo.")
+                except sqlite3.Error:
+                    st.error("No hemos podido guardar tu registro. Revisa los datos e inténtalo de nuevo.")
+                except Exception:
+                    st.error("Ha ocurrido un error al guardar tu registro. Inténtalo de nuevo más tarde.")
+                else:
+                    st.success("✅ Registro recibido. Te enviaremos el Partner Kit en breve (simulado).")
+                    st.info("Próximos pasos: capacitación, material comercial y demo para tus primeros clientes.")
     st.markdown("</div>", unsafe_allow_html=True)
 
 st.write("")
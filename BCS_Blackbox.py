@@ -1,9 +1,8 @@
 import streamlit as st
 import sqlite3
-from BCSDBconfig import BCSDatabase
-from BCS_dashboards.admin_dashboard import admin_dashboard
-from BCS_dashboards.partner_dashboard import partner_dashboard
-from BCS_dashboards.user_dashboard import user_dashboard
+from BCSDBconfig import get_database
+from utils.session_tokens import get_token_cache
+from utils.assets import image_source
 
 # Page configuration
 st.set_page_config(
@@ -12,12 +11,8 @@ st.set_page_config(
     layout="wide"
 )
 
-# Initialize database
-@st.cache_resource
-def init_database():
-    return BCSDatabase()
-
-db = init_database()
+# Shared database object (no writes unless the schema is behind; see utils/migrations.py)
+db = get_database()
 
 # Initialize session state
 if 'authenticated' not in st.session_state:
@@ -26,17 +21,41 @@ if 'user_role' not in st.session_state:
     st.session_state.user_role = None
 if 'user_data' not in st.session_state:
     st.session_state.user_data = None
+if 'auth_token' not in st.session_state:
+    st.session_state.auth_token = None
+
+# Open sessions: the password KDF only runs on login (see utils/session_tokens.py)
+session_tokens = get_token_cache('bcs')
+
+def start_session(user_data):
+    st.session_state.authenticated = True
+    st.session_state.user_role = user_data['role']
+    st.session_state.user_data = user_data
+    # The token stays server-side in session_state; never put it in the URL
+    st.session_state.auth_token = session_tokens.issue(user_data['id'], user_data)
+
+def session_active():
+    """True if the session's token is still valid; expired or revoked tokens end the session"""
+    if not st.session_state.authenticated:
+        return False
+    if session_tokens.get(st.session_state.auth_token) is None:
+        st.session_state.authenticated = False
+        st.session_state.user_role = None
+        st.session_state.user_data = None
+        st.session_state.auth_token = None
+        return False
+    return True
 
 def login_page():
     """Display login form"""
     col1, col2, col3 = st.columns([1, 2.5, 0.5])
     with col1:
-        st.image("assets/BCS_logo.png", width=130)
+        st.image(image_source("assets/BCS_logo.png", 130), width=130)
     with col2:
         st.title("BCS Blackbox")
         st.subheader("Tu plataforma :red[todo-en-uno] para negocios inteligentes.")
     with col3:
-        st.image("assets/logo.png", width=300)
+        st.image(image_source("assets/logo.png", 300), width=300)
     
     st.markdown("---")
         
@@ -69,9 +88,7 @@ def login_page():
                     user_data = db.authenticate_user(username, password)
                     
                     if user_data:
-                        st.session_state.authenticated = True
-                        st.session_state.user_role = user_data['role']
-                        st.session_state.user_data = user_data
+                        start_session(user_data)
                         st.success(f"¡Bienvenido {user_data['username']}!")
                         st.rerun()
                     else:
@@ -92,21 +109,27 @@ def login_page():
             )
 def logout():
     """Logout function"""
+    get_token_cache('bcs').revoke(st.session_state.get('auth_token'))
     st.session_state.authenticated = False
     st.session_state.user_role = None
     st.session_state.user_data = None
+    st.session_state.auth_token = None
     st.rerun()
 
 # Main application logic
-if not st.session_state.authenticated:
+if not session_active():
     login_page()
 else:
-    # Route to appropriate dashboard based on role
+    # Route to appropriate dashboard based on role. Dashboards (and pandas/plotly)
+    # are imported on first use so the login page stays light.
     if st.session_state.user_role == 'admin':
+        from BCS_dashboards.admin_dashboard import admin_dashboard
         admin_dashboard()
     elif st.session_state.user_role == 'partner':
+        from BCS_dashboards.partner_dashboard import partner_dashboard
         partner_dashboard()
     elif st.session_state.user_role == 'cliente':
+        from BCS_dashboards.user_dashboard import user_dashboard
         user_dashboard()
 
 # Footer
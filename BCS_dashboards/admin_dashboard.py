@@ -1,8 +1,17 @@
 import streamlit as st
 import sqlite3
-import pandas as pd
 from .cruds.partner_crud import render_partner_crud
 from .cruds.user_crud import render_user_crud
+from BCSDBconfig import get_database
+from utils.connection_pool import get_connection
+from services.sub_bcs import SubBcsRepository
+from services.users import UserRepository
+from utils.passwords import hash_password
+from utils.session_tokens import get_token_cache
+
+# Sub-BCS data access and user deletion (see services/); the rest of user administration keeps its CRUD classes
+sub_bcs_repo = SubBcsRepository('bcs_system.db')
+user_repo = UserRepository('bcs_system.db')
 
 def admin_dashboard():
     """Admin dashboard with modular sidebar navigation"""
@@ -61,28 +70,8 @@ def render_user_management():
     """Render user management interface"""
     st.subheader("👤 Gestión de Usuarios")
     
-    # Get all users WITHOUT filtering by role_id
-    conn = get_db_connection()
-    
-    # Modified query to show ALL users including those created by partners
-    users = pd.read_sql_query('''
-        SELECT 
-            u.id,
-            u.username,
-            u.email,
-            u.role_id,
-            u.role,
-            u.status,
-            u.is_active,
-            u.created_at,
-            u.created_by_partner_id,
-            p.username as created_by_partner
-        FROM users u
-        LEFT JOIN users p ON u.created_by_partner_id = p.id
-        ORDER BY u.created_at DESC
-    ''', conn)
-    
-    conn.close()
+    # All users, including those created by partners
+    users = user_repo.list_with_creator()
     
     if users.empty:
         st.warning("⚠️ No hay usuarios en el sistema")
@@ -226,8 +215,9 @@ def render_user_management():
                 with col3:
                     if user['id'] != 1:  # Protect admin user
                         if st.button(f"🗑️ Eliminar", key=f"delete_user_{user['id']}"):
-                            if delete_user(user['id']):
-                                st.success("Usuario eliminado")
+                            deleted = delete_user(user['id'])
+                            if deleted.users:
+                                st.success("Usuario eliminado; sus contactos, Sub-BCS y actividades se conservan")
                                 st.rerun()
                     else:
                         st.caption("👑 Usuario protegido")
@@ -285,13 +275,11 @@ def render_add_user_form():
 
 def create_user(username, email, password, role_id, status, is_active):
     """Create a new user"""
-    import hashlib
-    
     conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
-        hashed_password = hashlib.sha256(password.encode()).hexdigest()
+        hashed_password = hash_password(password)
         
         cursor.execute('''
             INSERT INTO users (username, password_hash, email, role_id, role, status, is_active, created_at)
@@ -316,26 +304,19 @@ def update_user_status(user_id, new_status):
     cursor.execute("UPDATE users SET is_active = ? WHERE id = ?", (new_status, user_id))
     conn.commit()
     conn.close()
+    if not new_status:
+        get_token_cache('bcs').revoke_user(user_id)
 
 def delete_user(user_id):
-    """Delete a user"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
-    conn.commit()
-    conn.close()
-    return True
+    """Delete a user; the data they own is kept (see services/users.py)"""
+    get_token_cache('bcs').revoke_user(user_id)
+    return user_repo.delete(user_id)
 
 def render_partner_management():
     """Render partner management interface"""
     st.subheader("🤝 Gestión de Partners")
     
-    # Import database from session state or initialize
-    if 'db' not in st.session_state:
-        from BCSDBconfig import BCSDatabase
-        st.session_state.db = BCSDatabase()
-    
-    render_partner_crud(st.session_state.db)
+    render_partner_crud(get_database())
 
 def render_sub_bcs_config():
     """Render Sub BCS configuration interface"""
@@ -377,29 +358,8 @@ def render_client_sub_bcs_monitoring():
     st.markdown("### 🏢 Sub-BCS de Clientes")
     st.caption("Aplicaciones y plataformas asignadas a usuarios clientes")
     
-    conn = get_db_connection()
-    
     # Get all client Sub-BCS with user info
-    client_bcs = pd.read_sql_query('''
-        SELECT 
-            ubs.id,
-            ubs.app_name,
-            ubs.app_type,
-            ubs.app_url,
-            ubs.status,
-            ubs.access_count,
-            ubs.last_accessed,
-            ubs.created_at,
-            u.username as client_username,
-            u.email as client_email,
-            p.username as partner_name
-        FROM user_sub_bcs ubs
-        JOIN users u ON ubs.user_id = u.id
-        LEFT JOIN users p ON ubs.partner_id = p.id
-        ORDER BY ubs.created_at DESC
-    ''', conn)
-    
-    conn.close()
+    client_bcs = sub_bcs_repo.all_user_apps()
     
     if client_bcs.empty:
         st.warning("⚠️ No hay Sub-BCS de clientes registrados en el sistema")
@@ -542,27 +502,8 @@ def render_partner_sub_bcs_monitoring():
     st.markdown("### 🔧 Sub-BCS de Partners")
     st.caption("Sub-BCS propios creados por los partners para uso interno")
     
-    conn = get_db_connection()
-    
     # Get all partner Sub-BCS with partner info
-    partner_bcs = pd.read_sql_query('''
-        SELECT 
-            pbs.id,
-            pbs.bcs_name,
-            pbs.bcs_type,
-            pbs.description,
-            pbs.modules,
-            pbs.status,
-            pbs.created_at,
-            pbs.notes,
-            u.username as partner_username,
-            u.email as partner_email
-        FROM partner_sub_bcs pbs
-        JOIN users u ON pbs.partner_id = u.id
-        ORDER BY pbs.created_at DESC
-    ''', conn)
-    
-    conn.close()
+    partner_bcs = sub_bcs_repo.all_partner_sub_bcs()
     
     if partner_bcs.empty:
         st.warning("⚠️ No hay Sub-BCS de partners registrados en el sistema")
@@ -704,23 +645,14 @@ def render_assign_client_sub_bcs():
     st.markdown("### 📱 Asignar Aplicación a Cliente")
     st.caption("Crea un link a una aplicación Streamlit para un cliente específico")
     
-    conn = get_db_connection()
-    
     # Get all clients (role = 3)
-    clients = pd.read_sql_query(
-        "SELECT id, username, email FROM users WHERE role_id = 3 ORDER BY username",
-        conn
-    )
+    clients = sub_bcs_repo.users_with_role(3)
     
     # Get all partners for optional assignment
-    partners = pd.read_sql_query(
-        "SELECT id, username FROM users WHERE role_id = 2 ORDER BY username",
-        conn
-    )
+    partners = sub_bcs_repo.users_with_role(2)
     
     if clients.empty:
         st.warning("⚠️ No hay clientes registrados en el sistema")
-        conn.close()
         return
     
     st.markdown("---")
@@ -809,43 +741,17 @@ def render_assign_client_sub_bcs():
                 partner_id = partner_options[selected_partner]
                 
                 try:
-                    cursor = conn.cursor()
-                    cursor.execute('''
-                        INSERT INTO user_sub_bcs 
-                        (user_id, partner_id, app_name, app_description, app_url, app_icon, app_type, status, created_at, access_count)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), 0)
-                    ''', (client_id, partner_id, app_name, app_description, app_url, app_icon, app_type, status))
-                    conn.commit()
+                    sub_bcs_repo.assign_user_app(client_id, partner_id, app_name, app_description, app_url, app_icon, app_type, status)
                     st.success(f"✅ Aplicación '{app_name}' asignada exitosamente a {selected_client.split(' (')[0]}")
                     st.rerun()
                 except Exception as e:
                     st.error(f"❌ Error al asignar aplicación: {str(e)}")
     
-    conn.close()
-    
     # Show existing assignments
     st.markdown("---")
     st.markdown("### 📋 Asignaciones Existentes")
     
-    conn = get_db_connection()
-    existing_apps = pd.read_sql_query('''
-        SELECT 
-            ubs.id,
-            ubs.app_name,
-            ubs.app_type,
-            ubs.app_url,
-            ubs.status,
-            ubs.access_count,
-            ubs.created_at,
-            u.username as client_username,
-            p.username as partner_name
-        FROM user_sub_bcs ubs
-        JOIN users u ON ubs.user_id = u.id
-        LEFT JOIN users p ON ubs.partner_id = p.id
-        ORDER BY ubs.created_at DESC
-        LIMIT 10
-    ''', conn)
-    conn.close()
+    existing_apps = sub_bcs_repo.all_user_apps(limit=10)
     
     if not existing_apps.empty:
         st.caption(f"Mostrando las últimas {len(existing_apps)} asignaciones")
@@ -876,17 +782,11 @@ def render_assign_partner_sub_bcs():
     st.markdown("### 🔧 Asignar Sub-BCS a Partner")
     st.caption("Registra un Sub-BCS propio del partner (herramientas internas)")
     
-    conn = get_db_connection()
-    
     # Get all partners (role = 2)
-    partners = pd.read_sql_query(
-        "SELECT id, username, email FROM users WHERE role_id = 2 ORDER BY username",
-        conn
-    )
+    partners = sub_bcs_repo.users_with_role(2)
     
     if partners.empty:
         st.warning("⚠️ No hay partners registrados en el sistema")
-        conn.close()
         return
     
     st.markdown("---")
@@ -963,41 +863,17 @@ def render_assign_partner_sub_bcs():
                 partner_id = partner_options[selected_partner]
                 
                 try:
-                    cursor = conn.cursor()
-                    cursor.execute('''
-                        INSERT INTO partner_sub_bcs 
-                        (partner_id, bcs_name, bcs_type, description, modules, status, created_at, notes)
-                        VALUES (?, ?, ?, ?, ?, ?, datetime('now'), ?)
-                    ''', (partner_id, bcs_name, bcs_type, description, modules, status, notes))
-                    conn.commit()
+                    sub_bcs_repo.add_partner_sub_bcs(partner_id, bcs_name, bcs_type, description, modules, status, notes)
                     st.success(f"✅ Sub-BCS '{bcs_name}' asignado exitosamente a {selected_partner.split(' (')[0]}")
                     st.rerun()
                 except Exception as e:
                     st.error(f"❌ Error al asignar Sub-BCS: {str(e)}")
     
-    conn.close()
-    
     # Show existing assignments
     st.markdown("---")
     st.markdown("### 📋 Sub-BCS de Partners Existentes")
     
-    conn = get_db_connection()
-    existing_bcs = pd.read_sql_query('''
-        SELECT 
-            pbs.id,
-            pbs.bcs_name,
-            pbs.bcs_type,
-            pbs.description,
-            pbs.modules,
-            pbs.status,
-            pbs.created_at,
-            u.username as partner_username
-        FROM partner_sub_bcs pbs
-        JOIN users u ON pbs.partner_id = u.id
-        ORDER BY pbs.created_at DESC
-        LIMIT 10
-    ''', conn)
-    conn.close()
+    existing_bcs = sub_bcs_repo.all_partner_sub_bcs(limit=10)
     
     if not existing_bcs.empty:
         st.caption(f"Mostrando los últimos {len(existing_bcs)} Sub-BCS")
@@ -1024,52 +900,32 @@ def render_assign_partner_sub_bcs():
 
 # Helper functions
 def get_db_connection():
-    """Get database connection"""
-    return sqlite3.connect('bcs_system.db')
+    """Get pooled database connection"""
+    return get_connection('bcs_system.db')
 
 def update_client_bcs_status(bcs_id, new_status):
     """Update status of client Sub-BCS"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE user_sub_bcs SET status = ? WHERE id = ?",
-        (new_status, bcs_id)
-    )
-    conn.commit()
-    conn.close()
+    sub_bcs_repo.set_user_app_status(bcs_id, new_status)
 
 def delete_client_bcs(bcs_id):
     """Delete client Sub-BCS"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM user_sub_bcs WHERE id = ?", (bcs_id,))
-    conn.commit()
-    conn.close()
+    sub_bcs_repo.delete_user_app(bcs_id)
     return True
 
 def update_partner_bcs_status(bcs_id, new_status):
     """Update status of partner Sub-BCS"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE partner_sub_bcs SET status = ? WHERE id = ?",
-        (new_status, bcs_id)
-    )
-    conn.commit()
-    conn.close()
+    sub_bcs_repo.set_partner_sub_bcs_status(bcs_id, new_status)
 
 def delete_partner_bcs(bcs_id):
     """Delete partner Sub-BCS"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM partner_sub_bcs WHERE id = ?", (bcs_id,))
-    conn.commit()
-    conn.close()
+    sub_bcs_repo.delete_partner_sub_bcs(bcs_id)
     return True
 
 def logout():
     """Logout function"""
+    get_token_cache('bcs').revoke(st.session_state.get('auth_token'))
     st.session_state.authenticated = False
     st.session_state.user_role = None
     st.session_state.user_data = None
+    st.session_state.auth_token = None
     st.rerun()
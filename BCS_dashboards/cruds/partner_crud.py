@@ -5,53 +5,8 @@ from datetime import datetime
 
 class PartnerCRUD:
     def __init__(self, db_connection):
+        # The partners table comes from the bcs_system.db migrations (see BCSDBconfig.get_database)
         self.db = db_connection
-        self.init_partner_table()
-    
-    def init_partner_table(self):
-        """Initialize partners table if it doesn't exist"""
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
-        # Check if table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='partners'")
-        table_exists = cursor.fetchone()
-        
-        if table_exists:
-            # Check if user_id column exists
-            cursor.execute("PRAGMA table_info(partners)")
-            columns = [column[1] for column in cursor.fetchall()]
-            
-            if 'user_id' not in columns:
-                # Add user_id column to existing table
-                try:
-                    cursor.execute('ALTER TABLE partners ADD COLUMN user_id INTEGER')
-                    cursor.execute('ALTER TABLE partners ADD FOREIGN KEY (user_id) REFERENCES users (id)')
-                    conn.commit()
-                except Exception as e:
-                    # SQLite doesn't support adding foreign keys to existing tables easily
-                    # So we just add the column
-                    pass
-        else:
-            # Create new table with all columns
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS partners (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    nombre TEXT NOT NULL,
-                    empresa TEXT NOT NULL,
-                    email TEXT UNIQUE NOT NULL,
-                    telefono TEXT,
-                    direccion TEXT,
-                    estado TEXT DEFAULT 'activo',
-                    fecha_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    notas TEXT,
-                    user_id INTEGER,
-                    FOREIGN KEY (user_id) REFERENCES users (id)
-                )
-            ''')
-            conn.commit()
-        
-        conn.close()
     
     def create_partner(self, nombre, empresa, email, telefono=None, direccion=None, notas=None, username=None, password=None):
         """Create a new partner with optional user account"""
@@ -3,6 +3,8 @@ import sqlite3
 import pandas as pd
 from datetime import datetime
 
+from utils.table_view import select_row, detail_panel
+
 class UserCRUD:
     def __init__(self, db_connection):
         self.db = db_connection
@@ -248,16 +250,17 @@ def render_user_list(user_crud, db):
         # Display count
         st.markdown(f"**Mostrando {len(filtered_df)} de {len(df)} usuarios**")
         
-        # Display dataframe (without internal columns)
-        display_df = filtered_df[['ID', 'Usuario', 'Email', 'Rol', 'Origen', 'Fecha Registro', 'Activo']]
-        st.dataframe(display_df, use_container_width=True)
-        
-        # Expandable details for each user
-        st.markdown("---")
-        st.subheader("🔍 Detalles de Usuarios")
+        # Display dataframe (without internal columns); details for the selected row only
+        user = select_row(
+            filtered_df,
+            key="users_table",
+            columns=['ID', 'Usuario', 'Email', 'Rol', 'Origen', 'Fecha Registro', 'Activo'],
+        )
         
-        for _, user in filtered_df.iterrows():
-            with st.expander(f"{'✅' if user['Activo'] else '❌'} {user['Usuario']} - {user['Rol']} | {user['Origen']}"):
+        if user is None:
+            st.caption("👆 Selecciona un usuario para ver sus detalles y acciones")
+        else:
+            with detail_panel(f"{'✅' if user['Activo'] else '❌'} {user['Usuario']} - {user['Rol']} | {user['Origen']}"):
                 col1, col2, col3 = st.columns(3)
                 
                 with col1:
@@ -304,8 +307,8 @@ def render_user_list(user_crud, db):
                         st.success(f"Usuario {status_text.lower()}do")
                         st.rerun()
         
-        # Delete functionality (legacy - now in expanders)
-        if False:  # Disabled, now in expanders
+        # Delete functionality (legacy - now in the detail panel)
+        if False:  # Disabled, now in the detail panel
             st.markdown("---")
             st.subheader("🗑️ Eliminar Usuario")
             
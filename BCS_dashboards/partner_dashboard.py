@@ -1,10 +1,12 @@
 import streamlit as st
-import sqlite3
-import pandas as pd
-from datetime import datetime, date, timedelta
+import secrets
+from datetime import date
 import plotly.express as px
-import plotly.graph_objects as go
-import hashlib
+from utils.session_tokens import get_token_cache
+from utils.connection_pool import get_connection
+from utils.table_view import select_row, detail_panel
+from services.contacts import ContactRepository, PartnerActivityRepository, CONTACT_INDUSTRIES, VALIDATION_ACTIVITY
+from services.sub_bcs import SubBcsRepository, USER_APPS_SOURCE
 
 # --- STYLES ---
 def load_custom_css():
@@ -38,52 +40,16 @@ def load_custom_css():
 
 # --- DATABASE FUNCTIONS ---
 def get_db_connection():
-    return sqlite3.connect('bcs_system.db')
+    return get_connection('bcs_system.db')
+
+# Data access (see services/): the views below only call these repositories
+contact_repo = ContactRepository('bcs_system.db')
+partner_activity_repo = PartnerActivityRepository('bcs_system.db')
+sub_bcs_repo = SubBcsRepository('bcs_system.db')
 
 def get_partner_stats(partner_id):
-    """Get statistics for partner dashboard"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Total contacts
-    cursor.execute('SELECT COUNT(*) FROM contacts WHERE partner_id = ? AND status = "active"', (partner_id,))
-    total_contacts = cursor.fetchone()[0]
-    
-    # Validated contacts pending conversion
-    cursor.execute('SELECT COUNT(*) FROM contacts WHERE partner_id = ? AND status = "active" AND validated = 1 AND converted_to_user = 0', (partner_id,))
-    validated_pending = cursor.fetchone()[0]
-    
-    # Total client Sub-BCS (from both tables)
-    cursor.execute('SELECT COUNT(*) FROM client_sub_bcs WHERE partner_id = ? AND status = "active"', (partner_id,))
-    client_bcs_crm = cursor.fetchone()[0]
-    
-    cursor.execute('SELECT COUNT(*) FROM user_sub_bcs WHERE partner_id = ? AND status = "active"', (partner_id,))
-    client_bcs_apps = cursor.fetchone()[0]
-    
-    total_client_bcs = client_bcs_crm + client_bcs_apps
-    
-    # Total partner Sub-BCS
-    cursor.execute('SELECT COUNT(*) FROM partner_sub_bcs WHERE partner_id = ? AND status = "active"', (partner_id,))
-    total_partner_bcs = cursor.fetchone()[0]
-    
-    # Monthly revenue from clients
-    cursor.execute('SELECT COALESCE(SUM(monthly_value), 0) FROM client_sub_bcs WHERE partner_id = ? AND status = "active"', (partner_id,))
-    monthly_revenue = cursor.fetchone()[0]
-    
-    # Pending activities
-    cursor.execute('SELECT COUNT(*) FROM partner_activities WHERE partner_id = ? AND completed = 0', (partner_id,))
-    pending_activities = cursor.fetchone()[0]
-    
-    conn.close()
-    
-    return {
-        'total_contacts': total_contacts,
-        'validated_pending': validated_pending,
-        'total_client_bcs': total_client_bcs,
-        'total_partner_bcs': total_partner_bcs,
-        'monthly_revenue': monthly_revenue,
-        'pending_activities': pending_activities
-    }
+    """Get statistics for partner dashboard (single round trip)"""
+    return sub_bcs_repo.partner_stats(partner_id)
 
 # --- MAIN DASHBOARD ---
 def partner_dashboard():
@@ -110,17 +76,17 @@ def partner_dashboard():
     col1, col2, col3, col4, col5, col6 = st.columns(6)
     
     with col1:
-        st.metric("👥 Contactos", stats['total_contacts'])
+        st.metric("👥 Contactos", stats.total_contacts)
     with col2:
-        st.metric("✅ Validados", stats['validated_pending'], help="Contactos validados pendientes de conversión")
+        st.metric("✅ Validados", stats.validated_pending, help="Contactos validados pendientes de conversión")
     with col3:
-        st.metric("🏢 Sub-BCS Clientes", stats['total_client_bcs'])
+        st.metric("🏢 Sub-BCS Clientes", stats.total_client_bcs)
     with col4:
-        st.metric("🔧 Sub-BCS Propios", stats['total_partner_bcs'])
+        st.metric("🔧 Sub-BCS Propios", stats.total_partner_bcs)
     with col5:
-        st.metric("💰 Ingresos Mes", f"${stats['monthly_revenue']:,.0f}")
+        st.metric("💰 Ingresos Mes", f"${stats.monthly_revenue:,.0f}")
     with col6:
-        st.metric("📋 Actividades", stats['pending_activities'])
+        st.metric("📋 Actividades", stats.pending_activities)
     
     st.divider()
     
@@ -152,21 +118,12 @@ def partner_dashboard():
 def show_dashboard_overview(partner_id):
     st.subheader("📊 Resumen General")
     
-    conn = get_db_connection()
-    
     # Recent activities
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("### 📝 Actividades Recientes")
-        activities = pd.read_sql_query('''
-            SELECT pa.*, c.name as contact_name
-            FROM partner_activities pa
-            LEFT JOIN contacts c ON pa.contact_id = c.id
-            WHERE pa.partner_id = ?
-            ORDER BY pa.activity_date DESC
-            LIMIT 5
-        ''', conn, params=(partner_id,))
+        activities = partner_activity_repo.recent(partner_id, limit=5)
         
         if not activities.empty:
             for _, activity in activities.iterrows():
@@ -179,12 +136,7 @@ def show_dashboard_overview(partner_id):
     
     with col2:
         st.markdown("### 💼 Sub-BCS Activos")
-        client_bcs = pd.read_sql_query('''
-            SELECT bcs_type, COUNT(*) as count
-            FROM client_sub_bcs
-            WHERE partner_id = ? AND status = 'active'
-            GROUP BY bcs_type
-        ''', conn, params=(partner_id,))
+        client_bcs = sub_bcs_repo.active_by_type(partner_id)
         
         if not client_bcs.empty:
             fig = px.pie(client_bcs, values='count', names='bcs_type', 
@@ -195,13 +147,7 @@ def show_dashboard_overview(partner_id):
     
     # Revenue chart
     st.markdown("### 📈 Ingresos Mensuales por Cliente")
-    revenue_data = pd.read_sql_query('''
-        SELECT client_name, monthly_value
-        FROM client_sub_bcs
-        WHERE partner_id = ? AND status = 'active' AND monthly_value > 0
-        ORDER BY monthly_value DESC
-        LIMIT 10
-    ''', conn, params=(partner_id,))
+    revenue_data = sub_bcs_repo.top_revenue(partner_id, limit=10)
     
     if not revenue_data.empty:
         fig = px.bar(revenue_data, x='client_name', y='monthly_value',
@@ -210,8 +156,6 @@ def show_dashboard_overview(partner_id):
         st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("No hay datos de ingresos")
-    
-    conn.close()
 
 # --- CONTACTS MANAGEMENT ---
 def show_contacts_management(partner_id):
@@ -236,10 +180,7 @@ def show_contacts_management(partner_id):
             with col2:
                 company = st.text_input("Empresa")
                 position = st.text_input("Cargo")
-                industry = st.selectbox("Industria", [
-                    "Hospitalaria", "Pesquera", "Industrial", "Comercial", 
-                    "Tecnología", "Educación", "Otro"
-                ])
+                industry = st.selectbox("Industria", CONTACT_INDUSTRIES)
             
             notes = st.text_area("Notas")
             
@@ -251,14 +192,7 @@ def show_contacts_management(partner_id):
             
             if submitted:
                 if name:
-                    conn = get_db_connection()
-                    cursor = conn.cursor()
-                    cursor.execute('''
-                        INSERT INTO contacts (partner_id, name, company, email, phone, position, industry, notes)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (partner_id, name, company, email, phone, position, industry, notes))
-                    conn.commit()
-                    conn.close()
+                    contact_repo.create(partner_id, name, company, email, phone, position, industry, notes)
                     st.success("✅ Contacto agregado exitosamente")
                     st.session_state.show_add_contact = False
                     st.rerun()
@@ -270,14 +204,11 @@ def show_contacts_management(partner_id):
                 st.rerun()
     
     # List contacts
-    conn = get_db_connection()
-    contacts = pd.read_sql_query('''
-        SELECT * FROM contacts 
-        WHERE partner_id = ?
-        ORDER BY validated DESC, created_at DESC
-    ''', conn, params=(partner_id,))
+    contacts = contact_repo.list_for_partner(partner_id)
     
     if not contacts.empty:
+        show_bulk_conversion(partner_id, contacts)
+        
         # Filter options
         col1, col2, col3, col4 = st.columns(4)
         with col1:
@@ -311,8 +242,26 @@ def show_contacts_management(partner_id):
         
         st.markdown(f"**Total: {len(filtered_contacts)} contactos**")
         
-        # Display contacts
-        for _, contact in filtered_contacts.iterrows():
+        # Display contacts: one table, one detail panel for the selected row
+        validation_labels = [
+            "👥 Convertido" if converted else ("✅ Validado" if validated else "⏳ Pendiente")
+            for validated, converted in zip(filtered_contacts['validated'], filtered_contacts['converted_to_user'])
+        ]
+        filtered_contacts = filtered_contacts.assign(validation_label=validation_labels)
+        
+        contact = select_row(
+            filtered_contacts,
+            key="contacts_table",
+            columns=['name', 'company', 'email', 'phone', 'industry', 'status', 'validation_label'],
+            column_config={
+                'name': "Nombre", 'company': "Empresa", 'email': "Email", 'phone': "Teléfono",
+                'industry': "Industria", 'status': "Estado", 'validation_label': "Validación",
+            },
+        )
+        
+        if contact is None:
+            st.caption("👆 Selecciona un contacto para ver el detalle y las acciones")
+        else:
             # Status badges
             validated_badge = "✅ VALIDADO" if contact['validated'] else "⏳ Pendiente"
             converted_badge = "👤 CONVERTIDO" if contact['converted_to_user'] else ""
@@ -323,7 +272,7 @@ def show_contacts_management(partner_id):
             if contact['converted_to_user']:
                 title = f"👥 {title} (Usuario creado)"
             
-            with st.expander(title):
+            with detail_panel(title):
                 col1, col2, col3 = st.columns(3)
                 
                 with col1:
@@ -345,13 +294,11 @@ def show_contacts_management(partner_id):
                         
                         # Show username of created user
                         if contact['converted_user_id']:
-                            cursor = conn.cursor()
-                            cursor.execute('SELECT username, role, status FROM users WHERE id = ?', (contact['converted_user_id'],))
-                            user_info = cursor.fetchone()
+                            user_info = contact_repo.converted_user(int(contact['converted_user_id']))
                             if user_info:
-                                st.write(f"**👤 Usuario:** {user_info[0]}")
-                                st.write(f"**🔐 Rol:** {user_info[1]}")
-                                st.write(f"**📊 Estado:** {user_info[2]}")
+                                st.write(f"**👤 Usuario:** {user_info.username}")
+                                st.write(f"**🔐 Rol:** {user_info.role}")
+                                st.write(f"**📊 Estado:** {user_info.status}")
                             else:
                                 st.warning("⚠️ Usuario no encontrado en la base de datos")
                 
@@ -367,45 +314,30 @@ def show_contacts_management(partner_id):
                     
                     # Show user credentials info
                     if contact['converted_user_id']:
-                        cursor = conn.cursor()
-                        cursor.execute('SELECT username, email FROM users WHERE id = ?', (contact['converted_user_id'],))
-                        user_creds = cursor.fetchone()
+                        user_creds = contact_repo.converted_user(int(contact['converted_user_id']))
                         if user_creds:
-                            st.success(f"**Credenciales de acceso:**\n\n👤 Usuario: `{user_creds[0]}`\n\n📧 Email: `{user_creds[1]}`")
+                            st.success(f"**Credenciales de acceso:**\n\n👤 Usuario: `{user_creds.username}`\n\n📧 Email: `{user_creds.email}`")
                     
                     col1, col2 = st.columns(2)
                     with col1:
                         if st.button(f"👁️ Ver Usuario Completo", key=f"view_user_{contact['converted_user_id']}"):
                             # Show detailed user info
-                            cursor = conn.cursor()
-                            cursor.execute('SELECT * FROM users WHERE id = ?', (contact['converted_user_id'],))
-                            full_user = cursor.fetchone()
-                            cursor.execute("PRAGMA table_info(users)")
-                            columns = [col[1] for col in cursor.fetchall()]
-                            
-                            if full_user:
+                            if contact_repo.converted_user(int(contact['converted_user_id'])):
                                 st.session_state[f'show_user_detail_{contact["converted_user_id"]}'] = True
                     with col2:
                         if st.button(f"🗑️ Eliminar Contacto", key=f"delete_contact_{contact['id']}"):
-                            cursor = conn.cursor()
-                            cursor.execute('DELETE FROM contacts WHERE id = ?', (contact['id'],))
-                            conn.commit()
+                            contact_repo.delete(int(contact['id']))
                             st.success("Contacto eliminado")
                             st.rerun()
                     
                     # Show detailed user info if requested
                     if st.session_state.get(f'show_user_detail_{contact["converted_user_id"]}', False):
                         with st.expander("📋 Información Completa del Usuario", expanded=True):
-                            cursor = conn.cursor()
-                            cursor.execute('SELECT * FROM users WHERE id = ?', (contact['converted_user_id'],))
-                            full_user = cursor.fetchone()
-                            cursor.execute("PRAGMA table_info(users)")
-                            columns = [col[1] for col in cursor.fetchall()]
+                            full_user = contact_repo.user_details(int(contact['converted_user_id']))
                             
                             if full_user:
-                                for i, col in enumerate(columns):
-                                    if col not in ['password', 'password_hash']:
-                                        st.write(f"**{col}:** {full_user[i]}")
+                                for col, value in full_user.items():
+                                    st.write(f"**{col}:** {value}")
                             
                             if st.button("✖️ Cerrar", key=f"close_detail_{contact['converted_user_id']}"):
                                 del st.session_state[f'show_user_detail_{contact["converted_user_id"]}']
@@ -484,9 +416,7 @@ def show_contacts_management(partner_id):
                             st.rerun()
                     with col2:
                         if st.button(f"🗑️ Eliminar", key=f"delete_contact_{contact['id']}"):
-                            cursor = conn.cursor()
-                            cursor.execute('DELETE FROM contacts WHERE id = ?', (contact['id'],))
-                            conn.commit()
+                            contact_repo.delete(int(contact['id']))
                             st.success("Contacto eliminado")
                             st.rerun()
                 
@@ -503,24 +433,18 @@ def show_contacts_management(partner_id):
                     
                     with col2:
                         if st.button(f"🗑️ Eliminar", key=f"delete_contact_{contact['id']}"):
-                            cursor = conn.cursor()
-                            cursor.execute('DELETE FROM contacts WHERE id = ?', (contact['id'],))
-                            conn.commit()
+                            contact_repo.delete(int(contact['id']))
                             st.success("Contacto eliminado")
                             st.rerun()
                     
                     with col3:
                         new_status = "inactive" if contact['status'] == "active" else "active"
                         if st.button(f"🔄 {new_status}", key=f"toggle_contact_{contact['id']}"):
-                            cursor = conn.cursor()
-                            cursor.execute('UPDATE contacts SET status = ? WHERE id = ?', (new_status, contact['id']))
-                            conn.commit()
+                            contact_repo.set_status(int(contact['id']), new_status)
                             st.success(f"Estado actualizado a {new_status}")
                             st.rerun()
     else:
         st.info("No tienes contactos registrados. ¡Agrega tu primer contacto!")
-    
-    conn.close()
 
 def convert_contact_to_user(contact_id, partner_id):
     """Convert a validated contact to a user/client"""
@@ -545,178 +469,86 @@ def convert_contact_to_user(contact_id, partner_id):
     return True, contact
 
 def create_user_from_contact(contact_id, username, password, partner_id):
-    """Create a new user from validated contact"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    try:
-        # Get contact info
-        cursor.execute('SELECT name, email, company FROM contacts WHERE id = ?', (contact_id,))
-        contact = cursor.fetchone()
-        
-        if not contact:
-            conn.close()
-            return False, "Contacto no encontrado"
-        
-        # Check if username already exists
-        cursor.execute('SELECT id FROM users WHERE username = ?', (username,))
-        if cursor.fetchone():
-            conn.close()
-            return False, f"El username '{username}' ya está en uso. Intenta con otro nombre de usuario."
-        
-        # Check if email already exists (if email column exists)
-        cursor.execute("PRAGMA table_info(users)")
-        columns = [column[1] for column in cursor.fetchall()]
-        if 'email' in columns and contact[1]:
-            cursor.execute('SELECT id FROM users WHERE email = ?', (contact[1],))
-            if cursor.fetchone():
-                conn.close()
-                return False, f"El email '{contact[1]}' ya está registrado en otro usuario."
-        
-        # Check if contact is validated
-        cursor.execute('SELECT validated, converted_to_user FROM contacts WHERE id = ?', (contact_id,))
-        validation_status = cursor.fetchone()
-        
-        if not validation_status or validation_status[0] != 1:
-            conn.close()
-            return False, "El contacto debe estar validado antes de convertirlo a usuario"
-        
-        if validation_status[1] == 1:
-            conn.close()
-            return False, "Este contacto ya fue convertido a usuario"
-        
-        # Hash password
-        hashed_password = hashlib.sha256(password.encode()).hexdigest()
-        
-        # Get the 'cliente' role_id for the new user
-        cursor.execute("SELECT id FROM roles WHERE name = 'cliente'")
-        cliente_role = cursor.fetchone()
-        cliente_role_id = cliente_role[0] if cliente_role else None
-        
-        # Build dynamic INSERT query based on available columns
-        insert_columns = ['username']
-        insert_values = [username]
-        
-        # Add password (check for both 'password' and 'password_hash')
-        if 'password' in columns:
-            insert_columns.append('password')
-            insert_values.append(hashed_password)
-            print("DEBUG: Adding password column")
-        elif 'password_hash' in columns:
-            insert_columns.append('password_hash')
-            insert_values.append(hashed_password)
-            print("DEBUG: Adding password_hash column")
-        else:
-            print("WARNING: No password column found in users table")
-        
-        # Add email if column exists
-        if 'email' in columns and contact[1]:
-            insert_columns.append('email')
-            insert_values.append(contact[1])
-            print(f"DEBUG: Adding email: {contact[1]}")
-        
-        # Add role_id if column exists (CRITICAL for authentication)
-        if 'role_id' in columns and cliente_role_id:
-            insert_columns.append('role_id')
-            insert_values.append(cliente_role_id)
-            print(f"DEBUG: Adding role_id: {cliente_role_id}")
-        
-        # Add role if column exists
-        if 'role' in columns:
-            insert_columns.append('role')
-            insert_values.append('cliente')
-            print("DEBUG: Adding role: cliente")
-        
-        # Add status if column exists
-        if 'status' in columns:
-            insert_columns.append('status')
-            insert_values.append('active')
-            print("DEBUG: Adding status: active")
-        
-        # Add is_active if column exists
-        if 'is_active' in columns:
-            insert_columns.append('is_active')
-            insert_values.append(1)
-            print("DEBUG: Adding is_active: 1")
-        
-        # Add created_by_partner_id if column exists
-        if 'created_by_partner_id' in columns:
-            insert_columns.append('created_by_partner_id')
-            insert_values.append(partner_id)
-            print(f"DEBUG: Adding created_by_partner_id: {partner_id}")
-        
-        # Build and execute INSERT query
-        columns_str = ', '.join(insert_columns)
-        placeholders = ', '.join(['?' for _ in insert_values])
-        query = f'INSERT INTO users ({columns_str}) VALUES ({placeholders})'
-        
-        print(f"DEBUG: Executing query: {query}")
-        print(f"DEBUG: With values: {insert_values}")
-        
-        cursor.execute(query, insert_values)
-        new_user_id = cursor.lastrowid
-        
-        print(f"DEBUG: User created with ID: {new_user_id}")
-        
-        if new_user_id == 0:
-            conn.rollback()
-            conn.close()
-            return False, "Error: No se pudo crear el usuario (ID = 0)"
-        
-        # Update contact as converted
-        cursor.execute('''
-            UPDATE contacts 
-            SET converted_to_user = 1, converted_user_id = ?, conversion_date = ?
-            WHERE id = ?
-        ''', (new_user_id, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), contact_id))
-        
-        print(f"DEBUG: Contact updated as converted")
-        
-        # Verify the user was created
-        cursor.execute('SELECT username, email FROM users WHERE id = ?', (new_user_id,))
-        created_user = cursor.fetchone()
-        
-        if not created_user:
-            conn.rollback()
-            conn.close()
-            return False, "Error: El usuario no se encontró después de crearlo"
-        
-        print(f"DEBUG: User verified - Username: {created_user[0]}, Email: {created_user[1]}")
-        
-        conn.commit()
-        print(f"DEBUG: Transaction committed successfully")
-        conn.close()
-        
-        success_message = f"""✅ Usuario creado exitosamente!
+    """Create a new user from a validated contact; returns (success, message)"""
+    result = contact_repo.convert_to_users(partner_id, [(contact_id, username, password)])[0]
+    if result.user_id is None:
+        return False, result.message
+
+    success_message = f"""✅ Usuario creado exitosamente!
 
 **Credenciales de acceso:**
-- 👤 Usuario: `{username}`
-- 📧 Email: `{created_user[1] if len(created_user) > 1 else 'N/A'}`
-- 🆔 ID: {new_user_id}
+- 👤 Usuario: `{result.username}`
+- 📧 Email: `{result.email or 'N/A'}`
+- 🆔 ID: {result.user_id}
 - 🔐 Contraseña: (la que ingresaste)
 
 El usuario ya puede iniciar sesión con estas credenciales."""
-        
-        return True, success_message
-    
-    except sqlite3.IntegrityError as e:
-        conn.rollback()
-        conn.close()
-        error_msg = str(e).lower()
-        print(f"ERROR IntegrityError: {e}")
-        if 'username' in error_msg or 'unique' in error_msg:
-            return False, f"El nombre de usuario '{username}' ya existe. Intenta con otro."
-        elif 'email' in error_msg:
-            return False, f"El email '{contact[1]}' ya está registrado."
-        else:
-            return False, f"Error de integridad: {str(e)}"
-    except Exception as e:
-        conn.rollback()
-        conn.close()
-        print(f"ERROR Exception: {e}")
-        import traceback
-        traceback.print_exc()
-        return False, f"Error al crear usuario: {str(e)}"
+
+    return True, success_message
+
+def show_bulk_conversion(partner_id, contacts):
+    """Convert several validated contacts at once, each with a generated temporary password"""
+    ready = contacts[(contacts['validated'] == 1) & (contacts['converted_to_user'] == 0)]
+    results = st.session_state.get('bulk_conversion_results')
+    if ready.empty and not results:
+        return
+    
+    with st.expander(f"👥 Convertir contactos validados en bloque ({len(ready)} pendientes)", expanded=bool(results)):
+        if results:
+            # Temporary passwords are shown only once: they are not stored in clear anywhere
+            created = [r for r in results if r['user_id'] is not None]
+            if created:
+                st.success(f"✅ {len(created)} usuarios creados. Comparte las contraseñas temporales ahora: no se volverán a mostrar.")
+            failed = len(results) - len(created)
+            if failed:
+                st.warning(f"⚠️ {failed} contactos no se convirtieron (ver motivo)")
+            st.dataframe(results, use_container_width=True, hide_index=True, column_config={
+                'contact': "Contacto", 'username': "Usuario", 'email': "Email", 'password': "Contraseña temporal",
+                'user_id': "ID usuario", 'message': "Resultado",
+            })
+            if st.button("✔️ Hecho", key="bulk_conversion_done"):
+                del st.session_state['bulk_conversion_results']
+                st.rerun()
+            return
+        
+        selection = st.data_editor(
+            ready[['id', 'name', 'company', 'email']].assign(
+                convert=True,
+                username=[email.split('@')[0] if email else "" for email in ready['email']],
+            ),
+            key="bulk_conversion_editor",
+            hide_index=True,
+            use_container_width=True,
+            disabled=['id', 'name', 'company', 'email'],
+            column_order=['convert', 'name', 'company', 'email', 'username'],
+            column_config={
+                'convert': "Convertir", 'name': "Nombre", 'company': "Empresa",
+                'email': "Email", 'username': "Usuario",
+            },
+        )
+        selected = selection[selection['convert']]
+        
+        if st.button(f"🔄 Convertir {len(selected)} contactos", disabled=selected.empty, type="primary"):
+            passwords = {int(contact_id): secrets.token_urlsafe(9) for contact_id in selected['id']}
+            with st.spinner("Creando usuarios..."):
+                outcomes = contact_repo.convert_to_users(partner_id, [
+                    (contact_id, username, passwords[int(contact_id)])
+                    for contact_id, username in zip(selected['id'], selected['username'])
+                ])
+            names = dict(zip(selected['id'].astype(int), selected['name']))
+            st.session_state.bulk_conversion_results = [
+                {
+                    'contact': names[outcome.contact_id],
+                    'username': outcome.username,
+                    'email': outcome.email,
+                    'password': passwords[outcome.contact_id] if outcome.user_id is not None else None,
+                    'user_id': outcome.user_id,
+                    'message': outcome.message,
+                }
+                for outcome in outcomes
+            ]
+            st.rerun()
+
 
 # --- CLIENT SUB-BCS MANAGEMENT ---
 def show_client_bcs_management(partner_id):
@@ -733,12 +565,7 @@ def show_client_bcs_management(partner_id):
             st.markdown("### Registrar Sub-BCS de Cliente")
             
             # Get contacts for selection
-            conn = get_db_connection()
-            contacts = pd.read_sql_query('''
-                SELECT id, name, company FROM contacts 
-                WHERE partner_id = ? AND status = 'active'
-            ''', conn, params=(partner_id,))
-            conn.close()
+            contacts = contact_repo.active_options(partner_id)
             
             col1, col2 = st.columns(2)
             
@@ -776,17 +603,8 @@ def show_client_bcs_management(partner_id):
             
             if submitted and contact_id:
                 if client_name and company_name and bcs_type:
-                    conn = get_db_connection()
-                    cursor = conn.cursor()
-                    cursor.execute('''
-                        INSERT INTO client_sub_bcs 
-                        (partner_id, contact_id, client_name, company_name, bcs_type, modules, 
-                         users_count, status, start_date, monthly_value, notes)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (partner_id, contact_id, client_name, company_name, bcs_type, modules,
-                          users_count, status, start_date, monthly_value, notes))
-                    conn.commit()
-                    conn.close()
+                    sub_bcs_repo.add_client_sub_bcs(partner_id, int(contact_id), client_name, company_name, bcs_type, modules,
+                                                    users_count, status, start_date, monthly_value, notes)
                     st.success("✅ Sub-BCS registrado exitosamente")
                     st.session_state.show_add_client_bcs = False
                     st.rerun()
@@ -797,46 +615,8 @@ def show_client_bcs_management(partner_id):
                 st.session_state.show_add_client_bcs = False
                 st.rerun()
     
-    # List client BCS from both tables
-    conn = get_db_connection()
-    
-    # Get from client_sub_bcs (CRM managed)
-    client_bcs = pd.read_sql_query('''
-        SELECT cb.*, c.name as contact_name, 'CRM' as source
-        FROM client_sub_bcs cb
-        LEFT JOIN contacts c ON cb.contact_id = c.id
-        WHERE cb.partner_id = ?
-        ORDER BY cb.created_at DESC
-    ''', conn, params=(partner_id,))
-    
-    # Get from user_sub_bcs (apps assigned by admin)
-    user_apps = pd.read_sql_query('''
-        SELECT 
-            ubs.id,
-            ubs.app_name as client_name,
-            u.username as company_name,
-            ubs.app_type as bcs_type,
-            ubs.status,
-            ubs.created_at,
-            ubs.app_url as modules,
-            ubs.app_description as notes,
-            NULL as contact_name,
-            0 as monthly_value,
-            0 as users_count,
-            NULL as start_date,
-            'User Apps' as source
-        FROM user_sub_bcs ubs
-        JOIN users u ON ubs.user_id = u.id
-        WHERE ubs.partner_id = ?
-        ORDER BY ubs.created_at DESC
-    ''', conn, params=(partner_id,))
-    
-    # Combine both sources
-    if not user_apps.empty:
-        if not client_bcs.empty:
-            client_bcs = pd.concat([client_bcs, user_apps], ignore_index=True)
-        else:
-            client_bcs = user_apps
+    # List client BCS from both tables (CRM managed + apps assigned by admin)
+    client_bcs = sub_bcs_repo.client_sub_bcs_for_partner(partner_id)
     
     if not client_bcs.empty:
         # Filters
@@ -865,10 +645,10 @@ def show_client_bcs_management(partner_id):
         # Display BCS
         for _, bcs in filtered_bcs.iterrows():
             status_emoji = {"active": "✅", "inactive": "❌", "trial": "🔄"}.get(bcs['status'], "❓")
-            source_emoji = "📱" if bcs['source'] == 'User Apps' else "📊"
+            source_emoji = "📱" if bcs['source'] == USER_APPS_SOURCE else "📊"
             
             # Different display based on source
-            if bcs['source'] == 'User Apps':
+            if bcs['source'] == USER_APPS_SOURCE:
                 title = f"{status_emoji} {source_emoji} {bcs['client_name']} - {bcs['bcs_type']} | Usuario: {bcs['company_name']}"
             else:
                 title = f"{status_emoji} {source_emoji} {bcs['client_name']} - {bcs['bcs_type']} | ${bcs['monthly_value']:,.0f}/mes"
@@ -882,7 +662,7 @@ def show_client_bcs_management(partner_id):
                     st.write(f"**Tipo:** {bcs['bcs_type'] or 'N/A'}")
                 
                 with col2:
-                    if bcs['source'] == 'User Apps':
+                    if bcs['source'] == USER_APPS_SOURCE:
                         st.write(f"**👤 Usuario:** {bcs['company_name']}")
                         st.write(f"**🔗 URL:** {bcs['modules']}")
                     else:
@@ -892,7 +672,7 @@ def show_client_bcs_management(partner_id):
                 
                 with col3:
                     st.write(f"**📊 Estado:** {bcs['status']}")
-                    if bcs['source'] != 'User Apps':
+                    if bcs['source'] != USER_APPS_SOURCE:
                         st.write(f"**💰 Valor Mensual:** ${bcs['monthly_value']:,.0f}")
                         st.write(f"**📅 Inicio:** {bcs['start_date'] or 'N/A'}")
                     st.write(f"**🕐 Creado:** {bcs['created_at'][:10]}")
@@ -900,36 +680,24 @@ def show_client_bcs_management(partner_id):
                 if bcs['notes']:
                     st.write(f"**📝 Notas:** {bcs['notes']}")
                 
-                if bcs['source'] != 'User Apps' and bcs['modules']:
+                if bcs['source'] != USER_APPS_SOURCE and bcs['modules']:
                     st.write(f"**⚙️ Módulos:** {bcs['modules']}")
                 
                 col1, col2 = st.columns(2)
                 with col1:
                     if st.button(f"🗑️ Eliminar", key=f"delete_client_bcs_{bcs['source']}_{bcs['id']}"):
-                        cursor = conn.cursor()
-                        if bcs['source'] == 'User Apps':
-                            cursor.execute('DELETE FROM user_sub_bcs WHERE id = ?', (bcs['id'],))
-                        else:
-                            cursor.execute('DELETE FROM client_sub_bcs WHERE id = ?', (bcs['id'],))
-                        conn.commit()
+                        sub_bcs_repo.delete_client(bcs['source'], int(bcs['id']))
                         st.success("Sub-BCS eliminado")
                         st.rerun()
                 
                 with col2:
                     new_status = "inactive" if bcs['status'] == "active" else "active"
                     if st.button(f"🔄 Cambiar a {new_status}", key=f"toggle_client_bcs_{bcs['source']}_{bcs['id']}"):
-                        cursor = conn.cursor()
-                        if bcs['source'] == 'User Apps':
-                            cursor.execute('UPDATE user_sub_bcs SET status = ? WHERE id = ?', (new_status, bcs['id']))
-                        else:
-                            cursor.execute('UPDATE client_sub_bcs SET status = ? WHERE id = ?', (new_status, bcs['id']))
-                        conn.commit()
+                        sub_bcs_repo.set_client_status(bcs['source'], int(bcs['id']), new_status)
                         st.success(f"Estado actualizado")
                         st.rerun()
     else:
         st.info("No tienes Sub-BCS de clientes registrados.")
-    
-    conn.close()
 
 # --- PARTNER SUB-BCS MANAGEMENT ---
 def show_partner_bcs_management(partner_id):
@@ -968,15 +736,7 @@ def show_partner_bcs_management(partner_id):
             
             if submitted:
                 if bcs_name and bcs_type:
-                    conn = get_db_connection()
-                    cursor = conn.cursor()
-                    cursor.execute('''
-                        INSERT INTO partner_sub_bcs 
-                        (partner_id, bcs_name, bcs_type, description, modules, status, notes)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''', (partner_id, bcs_name, bcs_type, description, modules, status, notes))
-                    conn.commit()
-                    conn.close()
+                    sub_bcs_repo.add_partner_sub_bcs(partner_id, bcs_name, bcs_type, description, modules, status, notes)
                     st.success("✅ Sub-BCS propio creado exitosamente")
                     st.session_state.show_add_partner_bcs = False
                     st.rerun()
@@ -988,12 +748,7 @@ def show_partner_bcs_management(partner_id):
                 st.rerun()
     
     # List partner BCS
-    conn = get_db_connection()
-    partner_bcs = pd.read_sql_query('''
-        SELECT * FROM partner_sub_bcs
-        WHERE partner_id = ?
-        ORDER BY created_at DESC
-    ''', conn, params=(partner_id,))
+    partner_bcs = sub_bcs_repo.partner_sub_bcs(partner_id)
     
     if not partner_bcs.empty:
         # Filters
@@ -1037,9 +792,7 @@ def show_partner_bcs_management(partner_id):
                 col1, col2 = st.columns(2)
                 with col1:
                     if st.button(f"🗑️ Eliminar", key=f"delete_partner_bcs_{bcs['id']}"):
-                        cursor = conn.cursor()
-                        cursor.execute('DELETE FROM partner_sub_bcs WHERE id = ?', (bcs['id'],))
-                        conn.commit()
+                        sub_bcs_repo.delete_partner_sub_bcs(int(bcs['id']))
                         st.success("Sub-BCS eliminado")
                         st.rerun()
                 
@@ -1048,8 +801,6 @@ def show_partner_bcs_management(partner_id):
                         st.session_state[f'edit_bcs_{bcs["id"]}'] = True
     else:
         st.info("No tienes Sub-BCS propios registrados.")
-    
-    conn.close()
 
 # --- ACTIVITIES MANAGEMENT ---
 def show_activities_management(partner_id):
@@ -1066,18 +817,13 @@ def show_activities_management(partner_id):
             st.markdown("### Registrar Nueva Actividad")
             
             # Get contacts for selection
-            conn = get_db_connection()
-            contacts = pd.read_sql_query('''
-                SELECT id, name, company, validated FROM contacts 
-                WHERE partner_id = ? AND status = 'active'
-            ''', conn, params=(partner_id,))
-            conn.close()
+            contacts = contact_repo.active_options(partner_id)
             
             col1, col2 = st.columns(2)
             
             with col1:
                 activity_type = st.selectbox("Tipo de Actividad *", [
-                    "Validación de Cliente",
+                    VALIDATION_ACTIVITY,
                     "Llamada", 
                     "Reunión", 
                     "Email", 
@@ -1093,7 +839,7 @@ def show_activities_management(partner_id):
                         label = f"{row['name']} - {row['company']}"
                         if row['validated']:
                             label += " ✅"
-                        contact_options[label] = row['id']
+                        contact_options[label] = int(row['id'])
                     contact_options["Ninguno"] = None
                     selected_contact = st.selectbox("Contacto", list(contact_options.keys()))
                     contact_id = contact_options[selected_contact]
@@ -1110,7 +856,7 @@ def show_activities_management(partner_id):
             
             # Show validation option if activity is "Validación de Cliente"
             validation_successful = False
-            if activity_type == "Validación de Cliente":
+            if activity_type == VALIDATION_ACTIVITY:
                 st.info("🔔 Esta actividad puede validar al contacto para convertirlo en usuario")
                 validation_successful = st.checkbox("✅ Validación exitosa (el contacto aceptó por email)")
             
@@ -1122,27 +868,15 @@ def show_activities_management(partner_id):
             
             if submitted:
                 if activity_type and subject:
-                    conn = get_db_connection()
-                    cursor = conn.cursor()
-                    cursor.execute('''
-                        INSERT INTO partner_activities 
-                        (partner_id, contact_id, activity_type, subject, description, 
-                         activity_date, follow_up_date, completed)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (partner_id, contact_id, activity_type, subject, description,
-                          activity_date, follow_up_date, 1 if completed else 0))
-                    
-                    # If validation successful, update contact
-                    if validation_successful and contact_id and completed:
-                        cursor.execute('''
-                            UPDATE contacts 
-                            SET validated = 1, validation_date = ?
-                            WHERE id = ?
-                        ''', (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), contact_id))
+                    # A successful, completed validation also validates the contact
+                    validated = partner_activity_repo.log(
+                        partner_id, contact_id, activity_type, subject, description,
+                        activity_date, follow_up_date, completed,
+                        validates_contact=validation_successful
+                    )
+                    if validated:
                         st.success("✅ Contacto validado exitosamente - Ahora puedes convertirlo a usuario")
                     
-                    conn.commit()
-                    conn.close()
                     st.success("✅ Actividad registrada exitosamente")
                     st.session_state.show_add_activity = False
                     st.rerun()
@@ -1154,14 +888,7 @@ def show_activities_management(partner_id):
                 st.rerun()
     
     # List activities
-    conn = get_db_connection()
-    activities = pd.read_sql_query('''
-        SELECT pa.*, c.name as contact_name, c.company as contact_company, c.validated
-        FROM partner_activities pa
-        LEFT JOIN contacts c ON pa.contact_id = c.id
-        WHERE pa.partner_id = ?
-        ORDER BY pa.activity_date DESC
-    ''', conn, params=(partner_id,))
+    activities = partner_activity_repo.list_for_partner(partner_id)
     
     if not activities.empty:
         # Filters
@@ -1193,7 +920,7 @@ def show_activities_management(partner_id):
         # Display activities
         for _, activity in filtered_activities.iterrows():
             status_emoji = "✅" if activity['completed'] else "⏳"
-            validation_emoji = "🔔" if activity['activity_type'] == "Validación de Cliente" else ""
+            validation_emoji = "🔔" if activity['activity_type'] == VALIDATION_ACTIVITY else ""
             validated_emoji = "✅" if activity.get('validated', 0) == 1 else ""
             
             with st.expander(f"{status_emoji} {validation_emoji} {activity['activity_type']} - {activity['subject']} | {activity['activity_date']}"):
@@ -1214,15 +941,13 @@ def show_activities_management(partner_id):
                 if activity['description']:
                     st.write(f"**Descripción:** {activity['description']}")
                 
-                if activity['activity_type'] == "Validación de Cliente" and activity.get('validated', 0) == 1:
+                if activity['activity_type'] == VALIDATION_ACTIVITY and activity.get('validated', 0) == 1:
                     st.success("✅ Esta actividad validó al contacto para conversión a usuario")
                 
                 col1, col2 = st.columns(2)
                 with col1:
                     if st.button(f"🗑️ Eliminar", key=f"delete_activity_{activity['id']}"):
-                        cursor = conn.cursor()
-                        cursor.execute('DELETE FROM partner_activities WHERE id = ?', (activity['id'],))
-                        conn.commit()
+                        partner_activity_repo.delete(int(activity['id']))
                         st.success("Actividad eliminada")
                         st.rerun()
                 
@@ -1230,20 +955,17 @@ def show_activities_management(partner_id):
                     new_status = 0 if activity['completed'] else 1
                     status_text = "Pendiente" if activity['completed'] else "Completada"
                     if st.button(f"✓ Marcar como {status_text}", key=f"toggle_activity_{activity['id']}"):
-                        cursor = conn.cursor()
-                        cursor.execute('UPDATE partner_activities SET completed = ? WHERE id = ?', 
-                                     (new_status, activity['id']))
-                        conn.commit()
+                        partner_activity_repo.set_completed(int(activity['id']), new_status)
                         st.success(f"Actividad marcada como {status_text}")
                         st.rerun()
     else:
         st.info("No tienes actividades registradas.")
-    
-    conn.close()
 
 def logout():
     """Logout function"""
+    get_token_cache('bcs').revoke(st.session_state.get('auth_token'))
     st.session_state.authenticated = False
     st.session_state.user_role = None
     st.session_state.user_data = None
+    st.session_state.auth_token = None
     st.rerun()
@@ -1,8 +1,10 @@
 import streamlit as st
-import sqlite3
-import pandas as pd
-from datetime import datetime
-import webbrowser
+from utils.connection_pool import get_connection
+from utils.session_tokens import get_token_cache
+from services.sub_bcs import SubBcsRepository
+
+# App data access (see services/)
+sub_bcs_repo = SubBcsRepository('bcs_system.db')
 
 # --- STYLES ---
 def load_custom_css():
@@ -64,81 +66,20 @@ def load_custom_css():
 
 # --- DATABASE FUNCTIONS ---
 def get_db_connection():
-    return sqlite3.connect('bcs_system.db')
+    return get_connection('bcs_system.db')
 
 def get_user_apps(user_id):
     """Get all Sub-BCS apps for a specific user"""
-    conn = get_db_connection()
-    apps = pd.read_sql_query('''
-        SELECT 
-            ubs.*,
-            p.username as partner_name
-        FROM user_sub_bcs ubs
-        LEFT JOIN users p ON ubs.partner_id = p.id
-        WHERE ubs.user_id = ? AND ubs.status = 'active'
-        ORDER BY ubs.app_name
-    ''', conn, params=(user_id,))
-    conn.close()
-    return apps
+    return sub_bcs_repo.user_apps(user_id)
 
 def update_app_access(app_id):
     """Update access count and last accessed timestamp"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        UPDATE user_sub_bcs 
-        SET access_count = access_count + 1,
-            last_accessed = ?
-        WHERE id = ?
-    ''', (datetime.now(), app_id))
-    conn.commit()
-    conn.close()
+    sub_bcs_repo.record_app_access(app_id)
 
 def get_user_stats(user_id):
-    """Get statistics for user dashboard"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Total apps
-    cursor.execute('SELECT COUNT(*) FROM user_sub_bcs WHERE user_id = ? AND status = "active"', (user_id,))
-    total_apps = cursor.fetchone()[0]
-    
-    # Total accesses
-    cursor.execute('SELECT COALESCE(SUM(access_count), 0) FROM user_sub_bcs WHERE user_id = ?', (user_id,))
-    total_accesses = cursor.fetchone()[0]
-    
-    # Most used app
-    cursor.execute('''
-        SELECT app_name, access_count 
-        FROM user_sub_bcs 
-        WHERE user_id = ? AND access_count > 0
-        ORDER BY access_count DESC 
-        LIMIT 1
-    ''', (user_id,))
-    most_used = cursor.fetchone()
-    most_used_app = most_used[0] if most_used else "N/A"
-    
-    # Last accessed
-    cursor.execute('''
-        SELECT app_name, last_accessed 
-        FROM user_sub_bcs 
-        WHERE user_id = ? AND last_accessed IS NOT NULL
-        ORDER BY last_accessed DESC 
-        LIMIT 1
-    ''', (user_id,))
-    last_accessed = cursor.fetchone()
-    last_app = last_accessed[0] if last_accessed else "N/A"
-    
-    conn.close()
-    
-    return {
-        'total_apps': total_apps,
-        'total_accesses': total_accesses,
-        'most_used_app': most_used_app,
-        'last_app': last_app
-    }
+    """Get statistics for user dashboard (single round trip)"""
+    return sub_bcs_repo.user_stats(user_id)._asdict()
 
-# --- MAIN DASHBOARD ---
 def user_dashboard():
     """User dashboard - Client portal for accessing Sub-BCS apps"""
     load_custom_css()
@@ -443,7 +384,9 @@ def show_help_section():
 
 def logout():
     """Logout function"""
+    get_token_cache('bcs').revoke(st.session_state.get('auth_token'))
     st.session_state.authenticated = False
     st.session_state.user_role = None
     st.session_state.user_data = None
+    st.session_state.auth_token = None
     st.rerun()
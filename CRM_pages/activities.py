@@ -0,0 +1,128 @@
+# CRM_pages/activities.py - Gestión de actividades
+import streamlit as st
+from datetime import datetime, timedelta
+from services.activities import ACTIVITY_TYPES
+from CRM_pages.common import lead_repo, opportunity_repo, activity_repo, get_current_partner, load_keyset_pages, show_load_more, log_activity, update_activity_status
+
+# --- ACTIVITIES MANAGEMENT ---
+def show_activities():
+    st.header("📝 Gestión de Actividades")
+    
+    tab1, tab2 = st.tabs(["📋 Lista de Actividades", "➕ Nueva Actividad"])
+    
+    with tab1:
+        show_activities_list()
+    
+    with tab2:
+        show_add_activity()
+
+def show_activities_list():
+    partner = get_current_partner()
+    
+    # Filtros
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        activity_filter = st.selectbox("Tipo", ["Todas", "call", "email", "demo", "meeting", "follow_up", "proposal"])
+    
+    with col2:
+        status_filter = st.selectbox("Estado", ["Todas", "Pendientes", "Completadas"])
+    
+    with col3:
+        date_filter = st.date_input("Desde fecha", datetime.now() - timedelta(days=7))
+    
+    # Query activities
+    completed = {"Pendientes": False, "Completadas": True}.get(status_filter)
+    activities_query = activity_repo.page_query(
+        partner['id'],
+        activity_type=None if activity_filter == "Todas" else activity_filter,
+        completed=completed,
+        since=date_filter,
+    )
+    activities, next_cursor = load_keyset_pages(activities_query, 'activities_list_pages')
+    
+    if not activities.empty:
+        for _, activity in activities.iterrows():
+            status_icon = "✅" if activity['completed'] else "⏳"
+            
+            with st.expander(f"{status_icon} {activity['activity_type']} - {activity['activity_date']}"):
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.write(f"**Descripción:** {activity['description']}")
+                    if activity['company_name']:
+                        st.write(f"**Lead:** {activity['company_name']}")
+                    if activity['opportunity_name']:
+                        st.write(f"**Oportunidad:** {activity['opportunity_name']}")
+                
+                with col2:
+                    st.write(f"**Fecha:** {activity['activity_date']}")
+                    if activity['follow_up_date']:
+                        st.write(f"**Seguimiento:** {activity['follow_up_date']}")
+                    st.write(f"**Estado:** {'Completada' if activity['completed'] else 'Pendiente'}")
+                
+                if not activity['completed']:
+                    if st.button(f"Marcar como Completada", key=f"complete_{activity['id']}"):
+                        update_activity_status(activity['id'], True)
+                        st.success("Actividad marcada como completada")
+                        st.rerun()
+        
+        show_load_more(activities_query, 'activities_list_pages', len(activities), next_cursor)
+    else:
+        st.info("No hay actividades con los filtros aplicados")
+
+def show_add_activity():
+    st.subheader("➕ Nueva Actividad")
+    
+    partner = get_current_partner()
+    
+    # Get leads and opportunities
+    leads = lead_repo.options(partner['id'])
+    opportunities = opportunity_repo.options(partner['id'])
+    
+    with st.form("add_activity_form"):
+        activity_type = st.selectbox("Tipo de Actividad", ACTIVITY_TYPES)
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            if not leads.empty:
+                lead_options = ["Ninguno"] + [f"{row['company_name']}" for _, row in leads.iterrows()]
+                selected_lead_idx = st.selectbox("Lead Relacionado", range(len(lead_options)), format_func=lambda x: lead_options[x])
+                selected_lead_id = None if selected_lead_idx == 0 else int(leads.iloc[selected_lead_idx - 1]['id'])
+            else:
+                st.info("No hay leads disponibles")
+                selected_lead_id = None
+        
+        with col2:
+            if not opportunities.empty:
+                opp_options = ["Ninguna"] + [f"{row['opportunity_name']}" for _, row in opportunities.iterrows()]
+                selected_opp_idx = st.selectbox("Oportunidad Relacionada", range(len(opp_options)), format_func=lambda x: opp_options[x])
+                selected_opp_id = None if selected_opp_idx == 0 else int(opportunities.iloc[selected_opp_idx - 1]['id'])
+            else:
+                st.info("No hay oportunidades disponibles")
+                selected_opp_id = None
+        
+        description = st.text_area("Descripción de la Actividad", placeholder="Describe la actividad realizada o planificada...")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            activity_date = st.date_input("Fecha de la Actividad", value=datetime.now().date())
+        
+        with col2:
+            follow_up_date = st.date_input("Fecha de Seguimiento (opcional)", value=None)
+        
+        submitted = st.form_submit_button("💾 Guardar Actividad", type="primary")
+        
+        if submitted and description:
+            log_activity(
+                partner['id'], 
+                selected_lead_id, 
+                selected_opp_id, 
+                activity_type, 
+                description,
+                activity_date,
+                follow_up_date
+            )
+            st.success("✅ Actividad registrada exitosamente!")
@@ -0,0 +1,300 @@
+# CRM_pages/admin.py - Panel de administración: dashboard general, gestión de partners y configuración
+import streamlit as st
+import plotly.express as px
+from utils.connection_pool import pool_stats
+from utils.query_cache import cache_stats
+from utils.write_queue import write_queue_stats
+from utils.table_view import select_row, detail_panel
+from utils.passwords import hash_password
+from services.partners import SPECIALIZATIONS, PARTNER_STATUSES
+from CRM_pages.common import partner_repo, lead_repo, activity_repo, session_tokens, format_currency
+
+# --- ADMIN FUNCTIONS ---
+def show_admin_dashboard():
+    st.header("📊 Dashboard General del Sistema")
+    
+    # Métricas globales (totales sumados sobre partner_kpis)
+    kpis = partner_repo.admin_kpis()
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("👥 Total Partners", kpis.total_partners, delta="+2 este mes")
+    
+    with col2:
+        st.metric("📋 Total Leads", kpis.total_leads, delta="+15 esta semana")
+    
+    with col3:
+        st.metric("💼 Oportunidades Activas", kpis.total_opportunities, delta="+8")
+    
+    with col4:
+        st.metric("💰 Revenue Mensual", format_currency(kpis.total_revenue), delta="+25%")
+    
+    st.markdown("---")
+    
+    # Gráficos de performance
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📈 Partners más Activos")
+        top_partners = partner_repo.top(limit=10)
+        
+        if not top_partners.empty:
+            fig = px.bar(top_partners, x='name', y='leads_count', title="Leads por Partner")
+            fig.update_xaxes(tickangle=45)
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No hay datos de partners disponibles")
+    
+    with col2:
+        st.subheader("🏭 Distribución por Industria")
+        industry_distribution = lead_repo.industry_distribution()
+        
+        if not industry_distribution.empty:
+            fig = px.pie(industry_distribution, values='count', names='industry', title="Leads por Industria")
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No hay datos de industrias disponibles")
+    
+    # Actividad reciente del sistema
+    st.subheader("📝 Actividad Reciente del Sistema")
+    recent_activities = activity_repo.recent_system(limit=10)
+    
+    if not recent_activities.empty:
+        st.dataframe(recent_activities[['partner_name', 'activity_type', 'company_name', 'activity_date']], use_container_width=True)
+    else:
+        st.info("No hay actividades recientes")
+
+def show_partners_management():
+    st.header("👥 Gestión de Partners")
+    
+    tab1, tab2, tab3 = st.tabs(["📋 Lista Partners", "➕ Nuevo Partner", "📊 Performance"])
+    
+    with tab1:
+        show_partners_list()
+    
+    with tab2:
+        show_add_partner()
+    
+    with tab3:
+        show_partners_performance()
+
+def show_partners_list():
+    st.subheader("📋 Lista de Partners")
+    
+    partners = partner_repo.list_with_totals()
+    
+    if not partners.empty:
+        partner = select_row(
+            partners,
+            key="partners_table",
+            columns=['name', 'email', 'region', 'specialization', 'status', 'leads_count', 'opportunities_count', 'total_commissions'],
+            column_config={
+                'name': "Nombre", 'email': "Email", 'region': "Región", 'specialization': "Especialización",
+                'status': "Estado", 'leads_count': "Leads", 'opportunities_count': "Oportunidades",
+                'total_commissions': st.column_config.NumberColumn("Comisiones", format="$%.2f"),
+            },
+        )
+        
+        if partner is None:
+            st.caption("👆 Selecciona un partner para ver el detalle y las acciones")
+        else:
+            status_color = "🟢" if partner['status'] == 'active' else "🔴"
+            
+            with detail_panel(f"{status_color} {partner['name']} - {partner['email']}"):
+                col1, col2, col3 = st.columns(3)
+                
+                with col1:
+                    st.write(f"**📧 Email:** {partner['email']}")
+                    st.write(f"**📱 Teléfono:** {partner['phone']}")
+                    st.write(f"**🌍 Región:** {partner['region']}")
+                    st.write(f"**🏭 Especialización:** {partner['specialization']}")
+                
+                with col2:
+                    st.write(f"**📊 Estado:** {partner['status']}")
+                    st.write(f"**📅 Creado:** {partner['created_date']}")
+                    st.write(f"**👥 Leads:** {partner['leads_count']}")
+                    st.write(f"**💼 Oportunidades:** {partner['opportunities_count']}")
+                
+                with col3:
+                    st.write(f"**💰 Comisiones Mensuales:** {format_currency(partner['total_commissions'])}")
+                    
+                    if st.button(f"✏️ Editar", key=f"edit_partner_{partner['id']}"):
+                        st.session_state['editing_partner_id'] = partner['id']
+                        st.rerun()
+                    
+                    if partner['status'] == 'active':
+                        if st.button(f"⏸️ Suspender", key=f"suspend_{partner['id']}"):
+                            update_partner_status(partner['id'], 'suspended')
+                            st.success("Partner suspendido")
+                            st.rerun()
+                    else:
+                        if st.button(f"▶️ Activar", key=f"activate_{partner['id']}"):
+                            update_partner_status(partner['id'], 'active')
+                            st.success("Partner activado")
+                            st.rerun()
+    else:
+        st.info("No hay partners registrados")
+    
+    # Mostrar formulario de edición si hay un partner seleccionado
+    if 'editing_partner_id' in st.session_state:
+        show_edit_partner_form(st.session_state['editing_partner_id'])
+
+def show_add_partner():
+    st.subheader("➕ Crear Nuevo Partner")
+    
+    with st.form("add_partner_form"):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            name = st.text_input("Nombre Completo *", placeholder="Juan Pérez")
+            email = st.text_input("Email *", placeholder="juan@email.com")
+            password = st.text_input("Contraseña Temporal *", type="password", placeholder="Contraseña inicial")
+            phone = st.text_input("Teléfono", placeholder="+56 9 1234 5678")
+        
+        with col2:
+            region = st.text_input("Región/País", placeholder="Chile, Colombia, México")
+            specialization = st.selectbox("Especialización", SPECIALIZATIONS)
+            status = st.selectbox("Estado Inicial", ["active", "pending"])
+        
+        submitted = st.form_submit_button("💾 Crear Partner", type="primary")
+        
+        if submitted:
+            if name and email and password:
+                if partner_repo.email_taken(email):
+                    st.error("❌ Este email ya está registrado")
+                else:
+                    partner_repo.create(name, email, hash_password(password), phone, region, specialization, status)
+                    st.success(f"✅ Partner '{name}' creado exitosamente!")
+                    st.info(f"📧 Credenciales: {email} / {password}")
+            else:
+                st.error("⚠️ Por favor completa los campos obligatorios")
+
+def show_edit_partner_form(partner_id):
+    """Muestra el formulario de edición de partner"""
+    st.markdown("---")
+    st.subheader("✏️ Editar Partner")
+    
+    # Obtener datos actuales del partner
+    partner = partner_repo.get(partner_id)
+    
+    if partner is None:
+        st.error("Partner no encontrado")
+        del st.session_state['editing_partner_id']
+        st.rerun()
+        return
+    
+    with st.form("edit_partner_form"):
+        st.info(f"Editando: **{partner.name}** - {partner.email}")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            name = st.text_input("Nombre Completo *", value=partner.name)
+            email = st.text_input("Email *", value=partner.email)
+            phone = st.text_input("Teléfono", value=partner.phone or "")
+            new_password = st.text_input("Nueva Contraseña (dejar vacío para no cambiar)", type="password")
+        
+        with col2:
+            region = st.text_input("Región/País", value=partner.region or "")
+            specialization = st.selectbox("Especialización", SPECIALIZATIONS,
+                                        index=SPECIALIZATIONS.index(partner.specialization) if partner.specialization in SPECIALIZATIONS else 0)
+            status = st.selectbox("Estado", PARTNER_STATUSES,
+                                index=PARTNER_STATUSES.index(partner.status) if partner.status in PARTNER_STATUSES else 0)
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            submitted = st.form_submit_button("💾 Actualizar Partner", type="primary")
+        
+        with col2:
+            cancelled = st.form_submit_button("❌ Cancelar")
+        
+        if cancelled:
+            del st.session_state['editing_partner_id']
+            st.rerun()
+        
+        if submitted:
+            if name and email:
+                update_partner(partner_id, name, email, phone, region, specialization, status, new_password)
+                st.success(f"✅ Partner '{name}' actualizado exitosamente!")
+                del st.session_state['editing_partner_id']
+                st.rerun()
+            else:
+                st.error("⚠️ Por favor completa los campos obligatorios (marcados con *)")
+
+def update_partner(partner_id, name, email, phone, region, specialization, status, new_password=None):
+    """Actualiza un partner en la base de datos"""
+    try:
+        if partner_repo.email_taken(email, exclude_id=partner_id):
+            st.error("❌ Este email ya está registrado para otro partner")
+            return
+        
+        previous = partner_repo.get(partner_id)
+        password_hash = hash_password(new_password) if new_password else None
+        partner_repo.update(partner_id, name, email, phone, region, specialization, status, password_hash)
+        if new_password or leaves_active(previous, status):
+            # Las sesiones abiertas no deben sobrevivir al cambio de contraseña o a la suspensión
+            session_tokens.revoke_user(partner_id)
+        if new_password:
+            st.info(f"📧 Nueva contraseña establecida: {new_password}")
+        
+    except Exception as e:
+        st.error(f"Error al actualizar el partner: {str(e)}")
+
+def show_partners_performance():
+    st.subheader("📊 Performance de Partners")
+    
+    # Métricas de performance (cada tabla hija agregada por separado)
+    performance_data = partner_repo.performance()
+    
+    if not performance_data.empty:
+        # Tabla de performance
+        st.dataframe(performance_data, use_container_width=True)
+        
+        # Gráfico de revenue por partner
+        fig = px.bar(performance_data, x='name', y='total_revenue', 
+                     title="Revenue Total por Partner", color='region')
+        fig.update_xaxes(tickangle=45)
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("No hay datos de performance disponibles")
+
+def show_global_analytics():
+    st.header("📈 Analytics Globales")
+    # Implementar analytics globales del sistema
+    st.info("Sección de analytics globales en desarrollo")
+
+def show_global_commissions():
+    st.header("💰 Gestión Global de Comisiones")
+    # Implementar gestión de comisiones globales
+    st.info("Sección de comisiones globales en desarrollo")
+
+def show_system_settings():
+    st.header("⚙️ Configuración del Sistema")
+    # Implementar configuraciones del sistema
+    st.info("Configuraciones del sistema en desarrollo")
+    
+    # Métricas de la caché de lecturas y del pool de conexiones
+    st.subheader("⚡ Rendimiento")
+    stats = cache_stats()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("🎯 Hit rate caché", f"{stats['hit_rate'] * 100:.1f}%")
+    with col2:
+        st.metric("📦 Entradas en caché", f"{stats['entries']}/{stats['max_entries']}")
+    with col3:
+        st.metric("♻️ Invalidaciones", stats['invalidations'])
+    
+    with st.expander("Detalle"):
+        st.json({'query_cache': stats, 'connection_pools': pool_stats(),
+                 'write_queues': write_queue_stats()})
+
+def leaves_active(previous, new_status):
+    """True si el partner guardado (previous) estaba activo y new_status ya no lo es"""
+    return previous is not None and previous.status == 'active' and new_status != 'active'
+
+def update_partner_status(partner_id, new_status):
+    previous = partner_repo.get(partner_id)
+    partner_repo.set_status(partner_id, new_status)
+    if leaves_active(previous, new_status):
+        session_tokens.revoke_user(partner_id)
@@ -0,0 +1,116 @@
+# CRM_pages/commissions.py - Comisiones
+import streamlit as st
+import plotly.express as px
+from utils.table_view import select_row, detail_panel
+from CRM_pages.common import commission_repo, get_current_partner, format_currency, load_keyset_pages, show_load_more
+
+# --- COMMISSIONS MANAGEMENT ---
+def show_commissions():
+    st.header("💰 Gestión de Comisiones")
+    
+    tab1, tab2 = st.tabs(["📊 Dashboard de Comisiones", "📋 Historial"])
+    
+    with tab1:
+        show_commissions_dashboard()
+    
+    with tab2:
+        show_commissions_history()
+
+def show_commissions_dashboard():
+    partner = get_current_partner()
+    
+    # Métricas principales (una sola consulta)
+    stats = commission_repo.stats(partner['id'])
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("💰 MRR (Monthly Recurring Revenue)", format_currency(stats.monthly_recurring))
+    
+    with col2:
+        this_year_total = stats.this_year_monthly * 12  # Proyección anual
+        st.metric("📅 Proyección Anual", format_currency(this_year_total))
+    
+    with col3:
+        st.metric("👥 Clientes Activos", stats.active_clients)
+    
+    with col4:
+        avg_commission = stats.monthly_recurring / stats.active_clients if stats.active_clients > 0 else 0
+        st.metric("📊 Comisión Promedio/Cliente", format_currency(avg_commission))
+    
+    # Gráfico de tendencia
+    st.subheader("📈 Evolución de Comisiones")
+    
+    commissions_trend = commission_repo.monthly_trend(partner['id'])
+    
+    if not commissions_trend.empty:
+        fig = px.line(
+            commissions_trend, 
+            x='month', 
+            y='total_commission',
+            title="Evolución Mensual de Comisiones (Últimos 12 meses)"
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    # Top clientes por comisión
+    st.subheader("🏆 Top Clientes por Comisión")
+    
+    top_clients = commission_repo.top_clients(partner['id'], limit=10)
+    
+    if not top_clients.empty:
+        st.dataframe(top_clients, use_container_width=True)
+    else:
+        st.info("Aún no tienes comisiones registradas")
+
+def show_commissions_history():
+    partner = get_current_partner()
+    
+    commissions_query = commission_repo.page_query(partner['id'])
+    commissions, next_cursor = load_keyset_pages(commissions_query, 'commissions_history_pages')
+    
+    if not commissions.empty:
+        comm = select_row(
+            commissions,
+            key="commissions_table",
+            columns=['client_name', 'opportunity_name', 'commission_amount', 'monthly_value', 'start_date', 'status'],
+            column_config={
+                'client_name': "Cliente", 'opportunity_name': "Oportunidad",
+                'commission_amount': st.column_config.NumberColumn("Comisión/mes", format="$%.2f"),
+                'monthly_value': st.column_config.NumberColumn("Valor Mensual", format="$%.2f"),
+                'start_date': "Inicio", 'status': "Estado",
+            },
+        )
+        
+        show_load_more(commissions_query, 'commissions_history_pages', len(commissions), next_cursor)
+        
+        if comm is None:
+            st.caption("👆 Selecciona una comisión para ver el detalle")
+        else:
+            status_color = "🟢" if comm['status'] == 'active' else "🔴"
+            
+            with detail_panel(f"{status_color} {comm['client_name']} - {format_currency(comm['commission_amount'])}/mes"):
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.write(f"**Cliente:** {comm['client_name']}")
+                    st.write(f"**Oportunidad:** {comm['opportunity_name']}")
+                    st.write(f"**Valor Mensual:** {format_currency(comm['monthly_value'])}")
+                    st.write(f"**Tasa de Comisión:** {comm['commission_rate'] * 100}%")
+                
+                with col2:
+                    st.write(f"**Comisión Mensual:** {format_currency(comm['commission_amount'])}")
+                    st.write(f"**Fecha Inicio:** {comm['start_date']}")
+                    st.write(f"**Estado:** {comm['status']}")
+                    if comm['payment_date']:
+                        st.write(f"**Último Pago:** {comm['payment_date']}")
+                
+                if comm['notes']:
+                    st.write(f"**Notas:** {comm['notes']}")
+    else:
+        st.info("No hay comisiones registradas")
+        st.markdown("""
+        ### ¿Cómo generar comisiones?
+        1. 🎯 Crear leads calificados
+        2. 💼 Convertir leads en oportunidades
+        3. 🤝 Cerrar oportunidades como "ganadas"
+        4. 💰 Las comisiones se generan automáticamente
+        """)
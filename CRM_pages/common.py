@@ -0,0 +1,104 @@
+# CRM_pages/common.py - Repositorios y utilidades compartidas por las páginas del CRM
+import os
+import streamlit as st
+from utils.connection_pool import get_connection
+from utils.pagination import PAGE_SIZE
+from utils.session_tokens import get_token_cache
+from services.activities import ActivityRepository
+from services.commissions import CommissionRepository
+from services.exports import ExportRepository
+from services.leads import LeadRepository
+from services.opportunities import OpportunityRepository
+from services.partners import PartnerRepository
+
+# --- DATABASE SETUP ---
+DB_PATH = 'crm_partner_bcs.db'
+
+# Acceso a datos (ver services/): las páginas sólo llaman a estos repositorios
+partner_repo = PartnerRepository(DB_PATH)
+lead_repo = LeadRepository(DB_PATH)
+opportunity_repo = OpportunityRepository(DB_PATH)
+activity_repo = ActivityRepository(DB_PATH)
+commission_repo = CommissionRepository(DB_PATH)
+export_repo = ExportRepository(DB_PATH)
+
+# Sesiones abiertas: el KDF sólo se ejecuta en el login (ver utils/session_tokens.py)
+session_tokens = get_token_cache('crm')
+
+# Volcados guardados en el servidor (sólo administradores)
+EXPORT_DIR = os.environ.get("BCS_EXPORT_DIR", "exports")
+# La descarga desde el navegador se genera entera en memoria (st.download_button no admite
+# generadores) y Streamlit la guarda en la sesión: por encima de esto no se ofrece descarga
+DOWNLOAD_MAX_ROWS = int(os.environ.get("BCS_EXPORT_DOWNLOAD_ROWS", 50000))
+
+# --- UTILITY FUNCTIONS ---
+def get_db_connection():
+    return get_connection(DB_PATH)
+
+def get_current_partner():
+    if 'user' in st.session_state:
+        return st.session_state['user']
+    else:
+        # Fallback for demo purposes
+        return {"id": 999, "name": "Demo Partner", "email": "demo@partner.com"}
+
+def format_currency(amount):
+    return f"${amount:,.2f}"
+
+def get_stage_color(stage):
+    colors = {
+        'discovery': '#059669',
+        'demo': '#0891b2', 
+        'proposal': '#7c3aed',
+        'negotiation': '#dc2626',
+        'closed-won': '#16a34a',
+        'closed-lost': '#dc2626'
+    }
+    return colors.get(stage, '#6b7280')
+
+def load_keyset_pages(query, state_key, page_size=PAGE_SIZE):
+    """
+    Carga las páginas ya pedidas de un KeysetQuery. Los cursores se guardan
+    en session_state y se reinician cuando cambian los filtros.
+    Devuelve (filas, cursor de la página siguiente o None).
+    """
+    signature = (query.signature(), page_size)
+    state = st.session_state.get(state_key)
+    if state is None or state['signature'] != signature:
+        state = {'signature': signature, 'cursors': [None]}
+        st.session_state[state_key] = state
+    
+    pages = []
+    next_cursor = None
+    conn = get_db_connection()
+    for cursor in state['cursors']:
+        page = query.fetch_page(conn, cursor, page_size)
+        pages.append(page.rows)
+        next_cursor = page.next_cursor
+        if next_cursor is None:
+            break
+    conn.close()
+    
+    import pandas as pd
+    return pd.concat(pages, ignore_index=True), next_cursor
+
+def show_load_more(query, state_key, shown, next_cursor):
+    """Contador de filas y botón 'Cargar más' bajo un listado paginado"""
+    conn = get_db_connection()
+    total, exact = query.count_estimate(conn)
+    conn.close()
+    st.caption(f"Mostrando {shown} de {total}{'' if exact else '+'}")
+    
+    if next_cursor is not None:
+        if st.button("⬇️ Cargar más", key=f"{state_key}_more"):
+            st.session_state[state_key]['cursors'].append(next_cursor)
+            st.rerun()
+
+def log_activity(partner_id, lead_id, opportunity_id, activity_type, description, activity_date=None, follow_up_date=None):
+    activity_repo.log(partner_id, lead_id, opportunity_id, activity_type, description, activity_date, follow_up_date)
+
+def update_lead_status(lead_id, new_status):
+    lead_repo.set_status(lead_id, new_status)
+
+def update_activity_status(activity_id, completed):
+    activity_repo.set_completed(activity_id, completed)
@@ -0,0 +1,81 @@
+# CRM_pages/dashboard.py - Dashboard del partner
+import streamlit as st
+import plotly.express as px
+from CRM_pages.common import partner_repo, lead_repo, opportunity_repo, activity_repo, get_current_partner, format_currency
+
+# --- DASHBOARD ---
+def show_dashboard():
+    st.header("📊 Dashboard de Performance")
+    
+    partner = get_current_partner()
+    
+    # KPIs Row (una sola consulta para las cuatro tarjetas)
+    kpis = partner_repo.kpis(partner['id'])
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("👥 Total Leads", kpis.leads_count, delta="+5 este mes")
+    
+    with col2:
+        st.metric("💼 Oportunidades Abiertas", kpis.opportunities_count, delta="+2 esta semana")
+    
+    with col3:
+        st.metric("💵 Pipeline Value", format_currency(kpis.pipeline_value), delta="+15%")
+    
+    with col4:
+        st.metric("💰 Comisiones Mensuales", format_currency(kpis.monthly_commissions), delta="+$1,250")
+    
+    st.markdown("---")
+    
+    # Charts Row
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📈 Pipeline por Etapa")
+        
+        pipeline_data = opportunity_repo.stage_summary(partner['id'])
+        
+        if not pipeline_data.empty:
+            fig = px.funnel(
+                pipeline_data, 
+                x='count', 
+                y='stage',
+                title="Oportunidades por Etapa"
+            )
+            fig.update_layout(height=400)
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No hay datos de pipeline disponibles")
+    
+    with col2:
+        st.subheader("📊 Leads por Fuente")
+        
+        leads_source = lead_repo.by_source(partner['id'])
+        
+        if not leads_source.empty:
+            fig = px.pie(
+                leads_source, 
+                values='count', 
+                names='lead_source',
+                title="Distribución de Fuentes"
+            )
+            fig.update_layout(height=400)
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No hay datos de fuentes disponibles")
+    
+    # Activities Summary
+    st.subheader("📝 Actividades Recientes")
+    
+    recent_activities = activity_repo.recent(partner['id'], limit=5)
+    
+    if not recent_activities.empty:
+        for _, activity in recent_activities.iterrows():
+            with st.expander(f"{activity['activity_type']} - {activity['activity_date']}"):
+                st.write(f"**Descripción:** {activity['description']}")
+                if activity['company_name']:
+                    st.write(f"**Lead:** {activity['company_name']}")
+                if activity['opportunity_name']:
+                    st.write(f"**Oportunidad:** {activity['opportunity_name']}")
+    else:
+        st.info("No hay actividades recientes")
@@ -0,0 +1,321 @@
+# CRM_pages/leads.py - Gestión de leads
+import streamlit as st
+import plotly.express as px
+from datetime import datetime, timedelta
+from utils.table_view import select_row, detail_panel
+from services.leads import LEAD_STATUSES, INITIAL_LEAD_STATUSES, INDUSTRIES, LEAD_SOURCES
+from CRM_pages.common import lead_repo, get_current_partner, format_currency, load_keyset_pages, show_load_more, log_activity, update_lead_status
+
+# --- LEADS MANAGEMENT ---
+def show_leads():
+    st.header("👥 Gestión de Leads")
+    
+    tab1, tab2, tab3 = st.tabs(["📋 Lista de Leads", "➕ Nuevo Lead", "📊 Analytics"])
+    
+    with tab1:
+        show_leads_list()
+    
+    with tab2:
+        show_add_lead()
+    
+    with tab3:
+        show_leads_analytics()
+
+def show_leads_list():
+    partner = get_current_partner()
+    
+    # Filtros
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        status_filter = st.selectbox("Estado", ["Todos"] + LEAD_STATUSES)
+    
+    with col2:
+        industry_filter = st.selectbox("Industria", ["Todas", "Pesca", "Salud", "Restauración", "Retail", "Marketing", "Legal"])
+    
+    with col3:
+        source_filter = st.selectbox("Fuente", ["Todas"] + LEAD_SOURCES)
+    
+    with col4:
+        date_filter = st.date_input("Desde fecha", datetime.now() - timedelta(days=30))
+    
+    page_size = st.selectbox("Leads por página", [10, 25, 50, 100], index=1)
+    
+    leads_query = lead_repo.page_query(
+        partner['id'],
+        status=None if status_filter == "Todos" else status_filter,
+        industry=None if industry_filter == "Todas" else industry_filter,
+        source=None if source_filter == "Todas" else source_filter,
+        since=date_filter,
+    )
+    leads_df, next_cursor = load_keyset_pages(leads_query, 'leads_list_pages', page_size)
+    
+    if not leads_df.empty:
+        # Display leads
+        lead = select_row(
+            leads_df,
+            key="leads_table",
+            columns=['company_name', 'contact_name', 'status', 'industry', 'lead_source', 'opportunities_count', 'total_value', 'created_date'],
+            column_config={
+                'company_name': "Empresa", 'contact_name': "Contacto", 'status': "Estado", 'industry': "Industria",
+                'lead_source': "Fuente", 'opportunities_count': "Oportunidades",
+                'total_value': st.column_config.NumberColumn("Valor Total", format="$%.2f"),
+                'created_date': "Creado",
+            },
+        )
+        
+        show_load_more(leads_query, 'leads_list_pages', len(leads_df), next_cursor)
+        
+        if lead is None:
+            st.caption("👆 Selecciona un lead para ver el detalle y las acciones")
+        else:
+            with detail_panel(f"🏢 {lead['company_name']} - {lead['contact_name']} ({lead['status']})"):
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.write(f"**📧 Email:** {lead['contact_email']}")
+                    st.write(f"**📱 Teléfono:** {lead['contact_phone']}")
+                    st.write(f"**🏭 Industria:** {lead['industry']}")
+                    st.write(f"**👥 Tamaño:** {lead['company_size']} empleados")
+                    st.write(f"**📅 Creado:** {lead['created_date']}")
+                
+                with col2:
+                    st.write(f"**📊 Estado:** {lead['status']}")
+                    st.write(f"**📍 Fuente:** {lead['lead_source']}")
+                    st.write(f"**💼 Oportunidades:** {lead['opportunities_count']}")
+                    st.write(f"**💵 Valor Total:** {format_currency(lead['total_value'])}")
+                    st.write(f"**🗒️ Pain Points:** {(lead['pain_points'] or '')[:100]}...")
+                
+                # Action buttons
+                col1, col2, col3, col4, col5 = st.columns(5)
+                
+                with col1:
+                    if st.button(f"📞 Contactar", key=f"contact_{lead['id']}"):
+                        log_activity(partner['id'], lead['id'], None, "call", f"Llamada a {lead['contact_name']}")
+                        st.success("Actividad registrada")
+                        st.rerun()
+                
+                with col2:
+                    if st.button(f"💼 Crear Oportunidad", key=f"opp_{lead['id']}"):
+                        st.session_state['create_opp_lead'] = lead['id']
+                        st.rerun()
+                
+                with col3:
+                    new_status = st.selectbox(
+                        "Cambiar Estado", 
+                        LEAD_STATUSES,
+                        index=LEAD_STATUSES.index(lead['status']),
+                        key=f"status_{lead['id']}"
+                    )
+                    if new_status != lead['status']:
+                        update_lead_status(lead['id'], new_status)
+                        st.success("Estado actualizado")
+                        st.rerun()
+                
+                with col4:
+                    if st.button(f"✏️ Editar", key=f"edit_{lead['id']}"):
+                        st.session_state['edit_lead'] = lead['id']
+                        st.rerun()
+                
+                with col5:
+                    # Verificar si el lead tiene oportunidades asociadas
+                    has_opportunities = lead['opportunities_count'] > 0
+                    
+                    # Mostrar información sobre oportunidades pero permitir eliminación
+                    button_text = f"🗑️ Eliminar" if not has_opportunities else f"🗑️ Eliminar (+{lead['opportunities_count']} opp.)"
+                    button_help = None if not has_opportunities else f"También eliminará {lead['opportunities_count']} oportunidad(es) asociada(s)"
+                    
+                    if st.button(button_text, key=f"delete_{lead['id']}", type="secondary", help=button_help):
+                        # Confirmar eliminación con mensaje apropiado
+                        if f"confirm_delete_{lead['id']}" not in st.session_state:
+                            st.session_state[f"confirm_delete_{lead['id']}"] = True
+                            warning_msg = f"⚠️ ¿Estás seguro de eliminar el lead '{lead['company_name']}'?"
+                            if has_opportunities:
+                                warning_msg += f" Esto también eliminará {lead['opportunities_count']} oportunidad(es) asociada(s)."
+                            warning_msg += " Haz clic nuevamente para confirmar."
+                            st.warning(warning_msg)
+                            st.rerun()
+                        else:
+                            delete_lead(lead['id'])
+                            st.success(f"✅ Lead '{lead['company_name']}' eliminado exitosamente")
+                            del st.session_state[f"confirm_delete_{lead['id']}"]
+                            st.rerun()
+    else:
+        st.info("No se encontraron leads con los filtros aplicados")
+    
+    # Mostrar formulario de edición si hay un lead seleccionado para editar
+    if 'edit_lead' in st.session_state:
+        show_edit_lead_form(st.session_state['edit_lead'], partner['id'])
+
+def show_add_lead():
+    st.subheader("➕ Agregar Nuevo Lead")
+    
+    with st.form("add_lead_form"):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            company_name = st.text_input("Nombre de la Empresa *", placeholder="Ej: Pescados del Pacífico SA")
+            contact_name = st.text_input("Nombre del Contacto *", placeholder="Ej: Juan Pérez")
+            contact_email = st.text_input("Email del Contacto", placeholder="juan.perez@empresa.com")
+            contact_phone = st.text_input("Teléfono", placeholder="+56 9 1234 5678")
+        
+        with col2:
+            industry = st.selectbox("Industria *", INDUSTRIES)
+            company_size = st.number_input("Número de Empleados", min_value=1, max_value=10000, value=10)
+            lead_source = st.selectbox("Fuente del Lead", LEAD_SOURCES)
+            status = st.selectbox("Estado Inicial", INITIAL_LEAD_STATUSES, index=0)
+        
+        pain_points = st.text_area("Pain Points / Problemas Identificados", 
+                                  placeholder="Describe los principales problemas o necesidades del cliente...")
+        
+        notes = st.text_area("Notas Adicionales", 
+                            placeholder="Información adicional sobre el lead...")
+        
+        submitted = st.form_submit_button("💾 Guardar Lead", type="primary")
+        
+        if submitted:
+            if company_name and contact_name:
+                partner = get_current_partner()
+                
+                lead_repo.create(
+                    partner['id'], company_name, contact_name, contact_email,
+                    contact_phone, industry, company_size, pain_points,
+                    lead_source, status, notes
+                )
+                
+                st.success(f"✅ Lead '{company_name}' creado exitosamente!")
+                st.balloons()
+            else:
+                st.error("⚠️ Por favor completa los campos obligatorios (marcados con *)")
+
+def show_edit_lead_form(lead_id, partner_id):
+    """Muestra el formulario de edición de lead en un modal"""
+    st.markdown("---")
+    st.subheader("✏️ Editar Lead")
+    
+    # Obtener datos actuales del lead
+    lead = lead_repo.get(lead_id, partner_id)
+    
+    if lead is None:
+        st.error("Lead no encontrado")
+        del st.session_state['edit_lead']
+        st.rerun()
+        return
+    
+    with st.form("edit_lead_form"):
+        st.info(f"Editando: **{lead.company_name}** - {lead.contact_name}")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            company_name = st.text_input("Nombre de la Empresa *", value=lead.company_name)
+            contact_name = st.text_input("Nombre del Contacto *", value=lead.contact_name)
+            contact_email = st.text_input("Email del Contacto", value=lead.contact_email or "")
+            contact_phone = st.text_input("Teléfono", value=lead.contact_phone or "")
+        
+        with col2:
+            industry = st.selectbox(
+                "Industria *", 
+                INDUSTRIES,
+                index=INDUSTRIES.index(lead.industry) if lead.industry in INDUSTRIES else 0
+            )
+            company_size = st.number_input("Número de Empleados", min_value=1, max_value=10000, value=int(lead.company_size) if lead.company_size else 10)
+            lead_source = st.selectbox(
+                "Fuente del Lead", 
+                LEAD_SOURCES,
+                index=LEAD_SOURCES.index(lead.lead_source) if lead.lead_source in LEAD_SOURCES else 0
+            )
+            status = st.selectbox(
+                "Estado", 
+                LEAD_STATUSES,
+                index=LEAD_STATUSES.index(lead.status)
+            )
+        
+        pain_points = st.text_area(
+            "Pain Points / Problemas Identificados", 
+            value=lead.pain_points or "",
+            placeholder="Describe los principales problemas o necesidades del cliente...",
+            height=100
+        )
+        
+        notes = st.text_area(
+            "Notas Adicionales", 
+            value=lead.notes or "",
+            placeholder="Información adicional sobre el lead...",
+            height=100
+        )
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            submitted = st.form_submit_button("💾 Actualizar Lead", type="primary")
+        
+        with col2:
+            cancelled = st.form_submit_button("❌ Cancelar")
+        
+        if cancelled:
+            del st.session_state['edit_lead']
+            st.rerun()
+        
+        if submitted:
+            if company_name and contact_name:
+                update_lead(
+                    lead_id, company_name, contact_name, contact_email, contact_phone,
+                    industry, company_size, lead_source, status, pain_points, notes, partner_id
+                )
+                st.success(f"✅ Lead '{company_name}' actualizado exitosamente!")
+                del st.session_state['edit_lead']
+                st.rerun()
+            else:
+                st.error("⚠️ Por favor completa los campos obligatorios (marcados con *)")
+
+def update_lead(lead_id, company_name, contact_name, contact_email, contact_phone, 
+                industry, company_size, lead_source, status, pain_points, notes, partner_id):
+    """Actualiza un lead en la base de datos"""
+    try:
+        lead_repo.update(
+            lead_id, partner_id, company_name, contact_name, contact_email, contact_phone,
+            industry, company_size, lead_source, status, pain_points, notes
+        )
+    except Exception as e:
+        st.error(f"Error al actualizar el lead: {str(e)}")
+
+def show_leads_analytics():
+    st.subheader("📊 Analytics de Leads")
+    
+    partner = get_current_partner()
+    
+    # Métricas de conversión (una sola consulta para las tres)
+    stats = lead_repo.stats(partner['id'])
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("📈 Tasa de Calificación", f"{stats.qualification_rate:.1f}%")
+    
+    with col2:
+        st.metric("⏱️ Tiempo Promedio a Contacto", f"{stats.avg_days_to_contact:.1f} días")
+    
+    with col3:
+        st.metric("📅 Leads Este Mes", stats.leads_this_month)
+    
+    # Gráfico de tendencia
+    st.subheader("📈 Tendencia de Leads")
+    
+    leads_trend = lead_repo.daily_trend(partner['id'])
+    
+    if not leads_trend.empty:
+        fig = px.line(leads_trend, x='date', y='leads_count', title="Leads Creados por Día (Últimos 30 días)")
+        st.plotly_chart(fig, use_container_width=True)
+
+def delete_lead(lead_id):
+    """Elimina un lead y todas sus oportunidades y actividades asociadas"""
+    try:
+        deleted = lead_repo.delete(lead_id)
+        
+        # Mensaje informativo sobre lo que se eliminó
+        opp_count = len(deleted.opportunity_names)
+        if opp_count > 0:
+            st.info(f"📋 También se eliminaron {opp_count} oportunidad(es): {', '.join(deleted.opportunity_names)}")
+        
+    except Exception as e:
+        st.error(f"Error al eliminar el lead: {str(e)}")
@@ -0,0 +1,321 @@
+# CRM_pages/opportunities.py - Gestión de oportunidades
+import streamlit as st
+import plotly.express as px
+from datetime import datetime, timedelta
+from services.opportunities import OPPORTUNITY_STAGES
+from CRM_pages.common import lead_repo, opportunity_repo, get_current_partner, format_currency
+
+# --- OPPORTUNITIES MANAGEMENT ---
+def show_opportunities():
+    st.header("💼 Gestión de Oportunidades")
+    
+    tab1, tab2, tab3 = st.tabs(["📋 Pipeline", "➕ Nueva Oportunidad", "📊 Analytics"])
+    
+    with tab1:
+        show_opportunities_pipeline()
+    
+    with tab2:
+        show_add_opportunity()
+    
+    with tab3:
+        show_opportunities_analytics()
+
+def show_opportunities_pipeline():
+    partner = get_current_partner()
+    
+    # Stage columns
+    stages = OPPORTUNITY_STAGES
+    stage_names = ['🔍 Discovery', '🎯 Demo', '📋 Propuesta', '🤝 Negociación', '✅ Ganada', '❌ Perdida']
+    
+    opportunities = opportunity_repo.pipeline(partner['id'])
+    
+    cols = st.columns(len(stages))
+    
+    for i, (stage, stage_name) in enumerate(zip(stages, stage_names)):
+        with cols[i]:
+            st.markdown(f"### {stage_name}")
+            
+            stage_opps = opportunities[opportunities['stage'] == stage]
+            stage_value = stage_opps['total_value'].sum()
+            
+            st.markdown(f"**💵 Valor:** {format_currency(stage_value)}")
+            st.markdown(f"**📊 Cantidad:** {len(stage_opps)}")
+            st.markdown("---")
+            
+            for _, opp in stage_opps.iterrows():
+                with st.container():
+                    st.markdown(f"""
+                    <div style="border: 1px solid #e5e7eb; border-radius: 8px; padding: 12px; margin-bottom: 8px; background-color: white;">
+                        <strong>{opp['opportunity_name']}</strong><br>
+                        <small>🏢 {opp['company_name']}</small><br>
+                        <small>💰 {format_currency(opp['total_value'])}</small><br>
+                        <small>📊 {opp['probability']}% prob.</small>
+                    </div>
+                    """, unsafe_allow_html=True)
+                    
+                    col1, col2, col3 = st.columns(3)
+                    
+                    with col1:
+                        if st.button(f"📋 Detalles", key=f"view_opp_{opp['id']}"):
+                            st.session_state['show_details'] = opp['id']
+                            st.rerun()
+                    
+                    with col2:
+                        if st.button(f"✏️ Editar", key=f"edit_opp_{opp['id']}"):
+                            st.session_state['edit_opportunity'] = opp['id']
+                            st.rerun()
+                    
+                    with col3:
+                        if st.button(f"🗑️ Eliminar", key=f"delete_opp_{opp['id']}", type="secondary"):
+                            # Confirmar eliminación
+                            if f"confirm_delete_opp_{opp['id']}" not in st.session_state:
+                                st.session_state[f"confirm_delete_opp_{opp['id']}"] = True
+                                st.warning(f"⚠️ ¿Estás seguro de eliminar la oportunidad '{opp['opportunity_name']}'? Haz clic nuevamente para confirmar.")
+                                st.rerun()
+                            else:
+                                delete_opportunity(opp['id'])
+                                st.success(f"✅ Oportunidad '{opp['opportunity_name']}' eliminada exitosamente")
+                                del st.session_state[f"confirm_delete_opp_{opp['id']}"]
+                                st.rerun()
+    
+    # Mostrar detalles si hay una oportunidad seleccionada
+    if 'show_details' in st.session_state:
+        show_opportunity_details(st.session_state['show_details'])
+    
+    # Mostrar formulario de edición si hay una oportunidad seleccionada para editar
+    if 'edit_opportunity' in st.session_state:
+        show_edit_opportunity_form(st.session_state['edit_opportunity'])
+
+def show_add_opportunity():
+    st.subheader("➕ Nueva Oportunidad")
+    
+    partner = get_current_partner()
+    
+    # Get leads for selection
+    leads = lead_repo.qualified_options(partner['id'])
+    
+    if leads.empty:
+        st.warning("⚠️ No tienes leads calificados. Primero crea y califica algunos leads.")
+        return
+    
+    with st.form("add_opportunity_form"):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            lead_options = [f"{row['company_name']} - {row['contact_name']}" for _, row in leads.iterrows()]
+            selected_lead_idx = st.selectbox("Seleccionar Lead *", range(len(lead_options)), format_func=lambda x: lead_options[x])
+            selected_lead = leads.iloc[selected_lead_idx]
+            
+            opportunity_name = st.text_input("Nombre de la Oportunidad *", 
+                                           value=f"{selected_lead['company_name']} - BCS Implementation")
+            
+            bcs_solutions = [
+                "FleetCore - Pesca & Flotas",
+                "MedCare Pro - Hospitales & Clínicas", 
+                "SmartChef - Restaurantes & Delivery",
+                "PetCore - Veterinarias",
+                "TravelCore - Hoteles & Turismo",
+                "LawFlow - Bufetes Legales",
+                "RetailFlow - Comercio & Retail",
+                "Consultix - Consultoras"
+            ]
+            bcs_solution = st.selectbox("Solución BCS *", bcs_solutions)
+            
+            estimated_users = st.number_input("Usuarios Estimados *", min_value=1, max_value=1000, value=10)
+        
+        with col2:
+            price_per_user = st.number_input("Precio por Usuario (USD/mes) *", min_value=50.0, max_value=200.0, value=100.0, step=10.0)
+            
+            total_value = estimated_users * price_per_user * 12  # Annual value
+            st.metric("💵 Valor Anual Total", format_currency(total_value))
+            
+            probability = st.slider("Probabilidad de Cierre (%)", 0, 100, 25)
+            
+            stage = st.selectbox("Etapa Inicial", ['discovery', 'demo', 'proposal', 'negotiation'])
+            
+            expected_close_date = st.date_input("Fecha Esperada de Cierre", 
+                                              value=datetime.now() + timedelta(days=30))
+        
+        notes = st.text_area("Notas de la Oportunidad", 
+                            placeholder="Detalles sobre la oportunidad, próximos pasos, etc.")
+        
+        submitted = st.form_submit_button("💾 Crear Oportunidad", type="primary")
+        
+        if submitted:
+            opportunity_repo.create(
+                int(selected_lead['id']), partner['id'], opportunity_name, bcs_solution,
+                estimated_users, price_per_user, total_value, probability,
+                stage, expected_close_date, notes
+            )
+            st.success(f"✅ Oportunidad '{opportunity_name}' creada exitosamente!")
+            st.balloons()
+
+def show_opportunities_analytics():
+    st.subheader("📊 Analytics de Oportunidades")
+    
+    partner = get_current_partner()
+    
+    # Métricas clave (una sola consulta para las cuatro)
+    stats = opportunity_repo.stats(partner['id'])
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("💼 Pipeline Total", format_currency(stats.total_pipeline))
+    
+    with col2:
+        st.metric("⚖️ Pipeline Ponderado", format_currency(stats.weighted_pipeline))
+    
+    with col3:
+        st.metric("🎯 Tasa de Cierre", f"{stats.win_rate:.1f}%")
+    
+    with col4:
+        st.metric("💰 Deal Promedio", format_currency(stats.avg_deal_size))
+    
+    # Pipeline por solución
+    st.subheader("📊 Pipeline por Solución BCS")
+    
+    pipeline_by_solution = opportunity_repo.by_solution(partner['id'])
+    
+    if not pipeline_by_solution.empty:
+        fig = px.bar(
+            pipeline_by_solution, 
+            x='bcs_solution', 
+            y='total_value',
+            title="Valor de Pipeline por Solución BCS"
+        )
+        fig.update_xaxes(tickangle=45)
+        st.plotly_chart(fig, use_container_width=True)
+
+def show_opportunity_details(opp_id):
+    opp = opportunity_repo.get(opp_id)
+    
+    if opp is not None:
+        with st.container():
+            st.markdown("---")
+            st.subheader("📋 Detalles de la Oportunidad")
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.write(f"**Oportunidad:** {opp.opportunity_name}")
+                st.write(f"**Cliente:** {opp.company_name}")
+                st.write(f"**Contacto:** {opp.contact_name}")
+                st.write(f"**Solución:** {opp.bcs_solution}")
+            
+            with col2:
+                st.write(f"**Valor Total:** {format_currency(opp.total_value)}")
+                st.write(f"**Etapa:** {opp.stage}")
+                st.write(f"**Probabilidad:** {opp.probability}%")
+            
+            if opp.notes:
+                st.write(f"**Notas:** {opp.notes}")
+            
+            if st.button("❌ Cerrar Detalles", key="close_details"):
+                if 'show_details' in st.session_state:
+                    del st.session_state['show_details']
+                st.rerun()
+            
+            st.markdown("---")
+
+def delete_opportunity(opp_id):
+    """Elimina una oportunidad y todas sus actividades asociadas"""
+    try:
+        opportunity_repo.delete(opp_id)
+    except Exception as e:
+        st.error(f"Error al eliminar la oportunidad: {str(e)}")
+
+def show_edit_opportunity_form(opp_id):
+    """Muestra el formulario de edición de oportunidad"""
+    st.markdown("---")
+    st.subheader("✏️ Editar Oportunidad")
+    
+    partner = get_current_partner()
+    
+    # Obtener datos actuales de la oportunidad (debe seguir teniendo su lead)
+    opp = opportunity_repo.get(opp_id)
+    
+    if opp is None or opp.company_name is None:
+        st.error("Oportunidad no encontrada")
+        del st.session_state['edit_opportunity']
+        st.rerun()
+        return
+    
+    # Obtener leads disponibles
+    leads = lead_repo.qualified_options(partner['id'], include_id=opp.lead_id)
+    
+    with st.form("edit_opportunity_form"):
+        st.info(f"Editando: **{opp.opportunity_name}** - {opp.company_name}")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            opportunity_name = st.text_input("Nombre de la Oportunidad *", value=opp.opportunity_name)
+            
+            # Lead selection
+            lead_options = {f"{lead['company_name']} - {lead['contact_name']}": lead['id'] for _, lead in leads.iterrows()}
+            current_lead_key = f"{opp.company_name} - {opp.contact_name}"
+            lead_index = list(lead_options.keys()).index(current_lead_key) if current_lead_key in lead_options else 0
+            
+            selected_lead = st.selectbox("Cliente Asociado *", options=list(lead_options.keys()), index=lead_index)
+            lead_id = lead_options[selected_lead]
+            
+            bcs_solution = st.selectbox(
+                "Solución BCS *", 
+                ["Procesamiento de Datos", "Análisis Predictivo", "Automatización", "IA/ML", "Consultoría", "Otros"],
+                index=["Procesamiento de Datos", "Análisis Predictivo", "Automatización", "IA/ML", "Consultoría", "Otros"].index(opp.bcs_solution) if opp.bcs_solution in ["Procesamiento de Datos", "Análisis Predictivo", "Automatización", "IA/ML", "Consultoría", "Otros"] else 0
+            )
+            
+            total_value = st.number_input("Valor Total (EUR) *", min_value=100.0, max_value=1000000.0, value=float(opp.total_value), step=100.0)
+        
+        with col2:
+            stage = st.selectbox(
+                "Etapa *", 
+                ["prospecting", "qualification", "proposal", "negotiation", "closed_won", "closed_lost"],
+                index=["prospecting", "qualification", "proposal", "negotiation", "closed_won", "closed_lost"].index(opp.stage)
+            )
+            
+            probability = st.slider("Probabilidad de Cierre (%)", min_value=0, max_value=100, value=int(opp.probability), step=5)
+            
+            expected_close_date = st.date_input("Fecha Esperada de Cierre", value=datetime.strptime(opp.expected_close_date, '%Y-%m-%d').date())
+        
+        notes = st.text_area(
+            "Notas", 
+            value=opp.notes or "",
+            placeholder="Información adicional sobre la oportunidad...",
+            height=100
+        )
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            submitted = st.form_submit_button("💾 Actualizar Oportunidad", type="primary")
+        
+        with col2:
+            cancelled = st.form_submit_button("❌ Cancelar")
+        
+        if cancelled:
+            del st.session_state['edit_opportunity']
+            st.rerun()
+        
+        if submitted:
+            if opportunity_name and lead_id and bcs_solution and total_value > 0:
+                update_opportunity(
+                    opp_id, opportunity_name, lead_id, bcs_solution, 
+                    total_value, stage, probability, expected_close_date, notes, partner['id']
+                )
+                st.success(f"✅ Oportunidad '{opportunity_name}' actualizada exitosamente!")
+                del st.session_state['edit_opportunity']
+                st.rerun()
+            else:
+                st.error("⚠️ Por favor completa los campos obligatorios (marcados con *)")
+
+def update_opportunity(opp_id, opportunity_name, lead_id, bcs_solution, total_value, 
+                      stage, probability, expected_close_date, notes, partner_id):
+    """Actualiza una oportunidad en la base de datos"""
+    try:
+        opportunity_repo.update(
+            opp_id, partner_id, opportunity_name, lead_id, bcs_solution,
+            total_value, stage, probability, expected_close_date, notes
+        )
+    except Exception as e:
+        st.error(f"Error al actualizar la oportunidad: {str(e)}")
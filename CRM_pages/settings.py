@@ -0,0 +1,220 @@
+# CRM_pages/settings.py - Configuración y gestión de datos (exportar, importar, leads de las landings)
+import streamlit as st
+from datetime import datetime
+import io
+import os
+from services.exports import FORMATS as EXPORT_FORMATS
+from services.lead_import import import_leads, errors_csv, RowError
+from services.landing_leads import sync_status as landing_sync_status, sync_to_crm as sync_landing_leads
+from CRM_pages.common import DB_PATH, partner_repo, lead_repo, export_repo, EXPORT_DIR, DOWNLOAD_MAX_ROWS, get_current_partner
+
+# --- SETTINGS ---
+def show_settings():
+    st.header("⚙️ Configuración")
+    
+    tab1, tab2, tab3 = st.tabs(["👤 Perfil", "🔧 Preferencias", "📊 Datos"])
+    
+    with tab1:
+        show_profile_settings()
+    
+    with tab2:
+        show_app_preferences()
+    
+    with tab3:
+        show_data_management()
+
+def show_profile_settings():
+    st.subheader("👤 Información del Partner")
+    
+    partner = get_current_partner()
+    
+    with st.form("profile_form"):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            name = st.text_input("Nombre Completo", value=partner['name'])
+            email = st.text_input("Email", value=partner['email'])
+            phone = st.text_input("Teléfono", value="")
+        
+        with col2:
+            region = st.text_input("Región/País", value="")
+            specialization = st.selectbox("Especialización", 
+                                        ["Todas las industrias", "Pesca", "Salud", "Restauración", "Retail", "Legal"])
+            timezone = st.selectbox("Zona Horaria", ["UTC-3 (Chile)", "UTC-5 (Colombia)", "UTC-6 (México)"])
+        
+        bio = st.text_area("Bio/Experiencia", placeholder="Describe tu experiencia y fortalezas como partner...")
+        
+        if st.form_submit_button("💾 Actualizar Perfil"):
+            st.success("✅ Perfil actualizado exitosamente!")
+
+def show_app_preferences():
+    st.subheader("🔧 Preferencias de la Aplicación")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.write("**Notificaciones:**")
+        email_notifications = st.checkbox("Notificaciones por email", value=True)
+        lead_alerts = st.checkbox("Alertas de nuevos leads", value=True)
+        follow_up_reminders = st.checkbox("Recordatorios de seguimiento", value=True)
+    
+    with col2:
+        st.write("**Visualización:**")
+        currency = st.selectbox("Moneda", ["USD", "CLP", "EUR", "MXN"])
+        date_format = st.selectbox("Formato de fecha", ["DD/MM/YYYY", "MM/DD/YYYY", "YYYY-MM-DD"])
+        theme = st.selectbox("Tema", ["Claro", "Oscuro", "Automático"])
+    
+    if st.button("💾 Guardar Preferencias"):
+        st.success("✅ Preferencias guardadas!")
+
+def show_data_management():
+    st.subheader("📊 Gestión de Datos")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.write("**Exportar Datos:**")
+        show_export_panel()
+    
+    with col2:
+        st.write("**Importar Datos:**")
+        show_lead_import_panel()
+        
+        if st.session_state.get('user_type') == 'admin':
+            st.write("**Leads de las landings:**")
+            show_landing_sync_panel()
+        
+        st.write("**⚠️ Zona de Peligro:**")
+        if st.button("🗑️ Limpiar Datos de Prueba", type="secondary"):
+            if st.checkbox("Confirmo que quiero eliminar datos de prueba"):
+                st.warning("Esta acción eliminará todos los datos de prueba.")
+
+def show_export_panel():
+    """Exporta leads, oportunidades o comisiones por bloques (ver services/exports.py)"""
+    is_admin = st.session_state.get('user_type') == 'admin'
+    labels = {"leads": "Leads", "opportunities": "Oportunidades", "commissions": "Comisiones"}
+    
+    dataset = st.selectbox("Datos", list(labels), format_func=labels.get, key="export_dataset")
+    fmt = st.radio("Formato", EXPORT_FORMATS, format_func=str.upper, horizontal=True, key="export_format")
+    
+    # Un partner sólo exporta lo suyo; el administrador elige partner o todos
+    if is_admin:
+        partners = partner_repo.list_with_totals()
+        partner_options = {"Todos los partners": None}
+        partner_options.update({f"{row['name']} ({row['email']})": int(row['id']) for _, row in partners.iterrows()})
+        partner_id = partner_options[st.selectbox("Partner", list(partner_options), key="export_partner")]
+    else:
+        partner_id = get_current_partner()['id']
+    
+    date_range = st.date_input("Rango de fechas (opcional)", value=[], key="export_dates")
+    date_from = date_range[0] if len(date_range) > 0 else None
+    date_to = date_range[1] if len(date_range) > 1 else None
+    
+    to_server = is_admin and st.checkbox("💾 Guardar en el servidor (volcados grandes)", key="export_to_server")
+    
+    if st.button("📥 Exportar", key="export_run"):
+        file_name = f"{dataset}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+        try:
+            total = export_repo.count(dataset, partner_id, date_from, date_to)
+            too_big = total > DOWNLOAD_MAX_ROWS
+            if to_server or (is_admin and too_big):
+                # Del cursor al disco por bloques; nada queda en la sesión
+                os.makedirs(EXPORT_DIR, exist_ok=True)
+                path = os.path.join(EXPORT_DIR, file_name)
+                rows = export_repo.write_file(dataset, path, fmt, partner_id, date_from, date_to)
+                st.success(f"✅ {rows:,} filas exportadas a {path}")
+                if not to_server:
+                    st.info(f"Más de {DOWNLOAD_MAX_ROWS:,} filas: se ha guardado en el servidor en lugar de descargarse")
+            elif too_big:
+                st.warning(
+                    f"⚠️ {total:,} filas superan el máximo de {DOWNLOAD_MAX_ROWS:,} para descargar desde el navegador. "
+                    "Acota el rango de fechas o pide el volcado completo al administrador."
+                )
+            else:
+                st.download_button(
+                    f"⬇️ Descargar {file_name} ({total:,} filas)",
+                    data=export_bytes(dataset, fmt, partner_id, date_from, date_to),
+                    file_name=file_name,
+                    mime="text/csv" if fmt == 'csv' else "application/octet-stream",
+                    key="export_download"
+                )
+        except Exception as e:
+            st.error(f"Error al exportar: {str(e)}")
+
+def export_bytes(dataset, fmt, partner_id, date_from, date_to):
+    """
+    Export entero en memoria como bytes, que es lo que acepta st.download_button:
+    no se transmite por bloques. El llamador lo limita a DOWNLOAD_MAX_ROWS filas;
+    los volcados mayores van a disco con write_file.
+    """
+    if fmt == 'csv':
+        return b"".join(export_repo.iter_csv(dataset, partner_id, date_from, date_to))
+    buffer = io.BytesIO()
+    export_repo.write(dataset, buffer, fmt, partner_id, date_from, date_to)
+    return buffer.getvalue()
+
+def show_lead_import_panel():
+    """Importa leads desde un CSV por lotes (ver services/lead_import.py)"""
+    uploaded_file = st.file_uploader("Subir archivo CSV de leads", type=['csv'])
+    st.caption(
+        "Columnas: company_name y contact_name (obligatorias), contact_email, contact_phone, "
+        "industry, company_size, pain_points, lead_source, status, notes. "
+        "También se aceptan Empresa, Contacto, Email, Teléfono, Industria, Fuente, Estado, Notas."
+    )
+    
+    if not uploaded_file:
+        return
+    
+    # El administrador importa en nombre de un partner
+    if st.session_state.get('user_type') == 'admin':
+        partners = partner_repo.list_with_totals()
+        partner_options = {f"{row['name']} ({row['email']})": int(row['id']) for _, row in partners.iterrows()}
+        if not partner_options:
+            st.warning("No hay partners a los que asignar los leads")
+            return
+        partner_id = partner_options[st.selectbox("Asignar leads a", list(partner_options), key="import_partner")]
+    else:
+        partner_id = get_current_partner()['id']
+    
+    dry_run = st.checkbox("Sólo validar (no insertar)", key="import_dry_run")
+    
+    if st.button("📤 Importar Leads", type="primary", key="import_run"):
+        uploaded_file.seek(0)
+        try:
+            with st.spinner("Importando leads..."):
+                report = import_leads(lead_repo, partner_id, uploaded_file, dry_run=dry_run)
+        except (ValueError, UnicodeDecodeError) as e:
+            st.error(f"No se pudo leer el CSV: {str(e)}")
+            return
+        
+        invalid = len(report.errors) - report.duplicates
+        verb = "válidos para insertar" if dry_run else "insertados"
+        st.success(f"✅ {report.inserted:,} de {report.total_rows:,} leads {verb}")
+        if report.duplicates:
+            st.warning(f"⚠️ {report.duplicates:,} duplicados por email omitidos")
+        if invalid:
+            st.error(f"❌ {invalid:,} filas con errores")
+        
+        if report.errors:
+            import pandas as pd
+            st.dataframe(pd.DataFrame(report.errors[:100], columns=RowError._fields), use_container_width=True, hide_index=True)
+            st.download_button(
+                "⬇️ Descargar informe de errores",
+                data=errors_csv(report),
+                file_name="errores_importacion_leads.csv",
+                mime="text/csv",
+                key="import_errors_download"
+            )
+
+def show_landing_sync_panel():
+    """Pasa al CRM los leads nuevos de los formularios públicos (ver services/landing_leads.py)"""
+    status = landing_sync_status(DB_PATH)
+    st.caption(f"Última sincronización: {status.synced_at or 'nunca'} · pendientes: {status.pending:,}")
+    if status.pending and st.button("🔄 Sincronizar leads de las landings", key="landing_sync_run"):
+        try:
+            with st.spinner("Sincronizando leads..."):
+                report = sync_landing_leads(DB_PATH)
+        except ValueError as e:
+            st.error(str(e))
+            return
+        st.success(f"✅ {report.synced:,} leads sincronizados")
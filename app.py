@@ -1,7 +1,6 @@
 # app.py — Landing Page Interactiva de BCS Technologies
 import streamlit as st
-import base64
-from pathlib import Path
+from utils.assets import data_uri, html_fragment, image_source
 
 # --- CONFIGURACIÓN DE LA PÁGINA ---
 st.set_page_config(
@@ -13,7 +12,7 @@ st.set_page_config(
 # --- ENCABEZADO PRINCIPAL ---
 col1, col2 = st.columns([1,4])
 with col1:
-    st.image("assets/BCS_logo.png", width=120)
+    st.image(image_source("assets/BCS_logo.png", 120), width=120)
 with col2:
     
     st.markdown("""
@@ -49,9 +48,9 @@ with tab1:
         - Bases de datos y módulos centrales.
         """)
     with col2:    
-        st.image("assets/image1.jpg", caption="Estructura del BCS Principal", width=300)
+        st.image(image_source("assets/image1.jpg", 300), caption="Estructura del BCS Principal", width=300)
     with col3:
-        st.image("assets/image4.jpg", caption="Base de datos cloud", width=260)
+        st.image(image_source("assets/image4.jpg", 260), caption="Base de datos cloud", width=260)
 with tab2:
     col1, col2,col3 = st.columns(3)
     with col1:
@@ -60,9 +59,9 @@ with tab2:
         Tiene su propio dashboard, base de datos y módulos personalizados.
         """)
     with col2:
-        st.image("assets/image3.jpg", caption="Ejemplo de Sub–BCS", width=300)
+        st.image(image_source("assets/image3.jpg", 300), caption="Ejemplo de Sub–BCS", width=300)
     with col3:
-        st.image("assets/image5.jpg", caption="Sistema modular", width=300)
+        st.image(image_source("assets/image5.jpg", 300), caption="Sistema modular", width=300)
 st.divider()
 
 # --- SECCIÓN: CASOS DE USO ---
@@ -76,16 +75,16 @@ if industria == "Hospitalaria":
     st.info("🏥 **BCS Hospitalario:** gestiona pacientes, quirófanos, admisiones y personal médico.")
     col1,col2 = st.columns(2)
     with col1:
-        st.image("assets/doctor_dashboard.jpg", caption="Dashboard de BCS Hospitalario", width=300)
+        st.image(image_source("assets/doctor_dashboard.jpg", 300), caption="Dashboard de BCS Hospitalario", width=300)
     with col2:
-        st.image("assets/historial_paciente.jpg", caption="Historial de pacientes inteligente", width=300)
+        st.image(image_source("assets/historial_paciente.jpg", 300), caption="Historial de pacientes inteligente", width=300)
 elif industria == "Pesquera":
     st.info("⚓ **BCS Pesquero:** controla la flota, GPS marino, producción y mantenimiento de embarcaciones.")
     col1, col2 = st.columns(2)
     with col1:
-        st.image("assets/image2.jpg", caption="Dashboard de BCS Pesquero", width=300)
+        st.image(image_source("assets/image2.jpg", 300), caption="Dashboard de BCS Pesquero", width=300)
     with col2:
-        st.image("assets/descarga_atun.jpg", caption="Control de descargas", width=350)
+        st.image(image_source("assets/descarga_atun.jpg", 350), caption="Control de descargas", width=350)
 elif industria == "Industrial":
     st.info("🏭 **BCS Industrial:** optimiza stock, lotes, mantenimiento y calidad de producción.")
 else:
@@ -109,21 +108,17 @@ st.divider()
 # --- SECCIÓN: POR QUÉ BCS ES DIFERENTE ---
 st.subheader("💫 Ejemplos BCS")
 
+CAROUSEL_IMAGES = ["assets/image1.jpg", "assets/image2.jpg", "assets/image3.jpg"]
+CAROUSEL_WIDTH = 500
+
 def img_to_data_uri(img_path: str) -> str:
-    p = Path(img_path)
-    if not p.exists():
-        return ""
-    ext = p.suffix.lower().lstrip(".")
-    mime = "jpeg" if ext in ("jpg", "jpeg") else ext
-    data = p.read_bytes()
-    return f"data:image/{mime};base64," + base64.b64encode(data).decode()
-
-img1 = img_to_data_uri("assets/image1.jpg")
-img2 = img_to_data_uri("assets/image2.jpg")
-img3 = img_to_data_uri("assets/image3.jpg")
-
-# Carrusel con menor altura y margen inferior reducido para acercar la siguiente sección
-html_code = f"""
+    # Codificada una vez por proceso; el doble del ancho del carrusel para pantallas HiDPI
+    return data_uri(img_path, width=CAROUSEL_WIDTH * 2)
+
+def build_carousel_html() -> str:
+    img1, img2, img3 = (img_to_data_uri(path) for path in CAROUSEL_IMAGES)
+    # Carrusel con menor altura y margen inferior reducido para acercar la siguiente sección
+    return f"""
 <style>
 .carousel {{
   position: relative;
@@ -193,13 +188,15 @@ function moveSlide(direction) {{
 </script>
 """
 
+# El HTML (con las imágenes en base64) se construye una vez por proceso, no en cada rerun
+html_code = html_fragment("carousel", build_carousel_html, *CAROUSEL_IMAGES)
 st.components.v1.html(html_code, height=240)
 
 # --- SECCIÓN: EQUIPO ---
 st.subheader("👥 Nuestro equipo")
 col1, col2 = st.columns(2)
 with col1:
-    st.image("assets/foto imanol.jpg", width=180)
+    st.image(image_source("assets/foto imanol.jpg", 180), width=180)
     st.markdown("### **Imanol Asolo**")
     st.caption("Presidente & CTO — Desarrollador de ecosistemas SaaS y AI Tools Developer")
 with col2:
@@ -0,0 +1,123 @@
+"""
+Benchmark de las consultas por partner del panel de administración.
+
+Compara la consulta anterior (JOIN de leads × oportunidades × comisiones
+y GROUP BY) con las subconsultas preagregadas de utils.admin_analytics
+sobre una base en memoria con el esquema de crm_partner_bcs.db.
+
+Uso:
+    python -m benchmarks.admin_analytics [--partners 20] [--sizes 30 100 300 1000 3000]
+"""
+import argparse
+import random
+import sqlite3
+import time
+
+from utils.admin_analytics import PARTNERS_PERFORMANCE_SQL
+
+SCHEMA_SOURCE = 'crm_partner_bcs.db'
+
+LEGACY_PERFORMANCE_SQL = """
+    SELECT
+        p.name,
+        p.region,
+        COUNT(DISTINCT l.id) as total_leads,
+        COUNT(DISTINCT CASE WHEN o.stage = 'closed-won' THEN o.id END) as won_deals,
+        COUNT(DISTINCT CASE WHEN o.stage = 'closed-lost' THEN o.id END) as lost_deals,
+        COALESCE(SUM(CASE WHEN o.stage = 'closed-won' THEN o.total_value END), 0) as total_revenue,
+        COALESCE(SUM(c.commission_amount), 0) as monthly_commissions
+    FROM partners p
+    LEFT JOIN leads l ON p.id = l.partner_id
+    LEFT JOIN opportunities o ON p.id = o.partner_id
+    LEFT JOIN commissions c ON p.id = c.partner_id AND c.status = 'active'
+    WHERE p.status != 'admin'
+    GROUP BY p.id
+    ORDER BY total_revenue DESC
+"""
+
+# Filas intermedias por partner a partir de las cuales la consulta anterior no se ejecuta
+LEGACY_ROW_LIMIT = 2_000_000
+
+STAGES = ['discovery', 'demo', 'proposal', 'negotiation', 'closed-won', 'closed-lost']
+
+
+def build_database(partners, leads_per_partner, seed=42):
+    """Base en memoria con el esquema real (tablas e índices) y datos sintéticos"""
+    source = sqlite3.connect(f"file:{SCHEMA_SOURCE}?mode=ro", uri=True)
+    schema = source.execute("""
+        SELECT sql FROM sqlite_master
+        WHERE type IN ('table', 'index') AND sql IS NOT NULL AND name NOT LIKE 'sqlite_%'
+        ORDER BY type = 'index'
+    """).fetchall()
+    source.close()
+
+    conn = sqlite3.connect(':memory:')
+    for (sql,) in schema:
+        conn.execute(sql)
+
+    rng = random.Random(seed)
+    opportunities_per_partner = leads_per_partner // 2
+    commissions_per_partner = max(1, leads_per_partner // 10)
+    with conn:
+        for partner_id in range(1, partners + 1):
+            conn.execute(
+                "INSERT INTO partners (id, name, email, region, status) VALUES (?, ?, ?, ?, 'active')",
+                (partner_id, f"Partner {partner_id}", f"partner{partner_id}@example.com", "LATAM"),
+            )
+            conn.executemany(
+                "INSERT INTO leads (partner_id, company_name, status) VALUES (?, ?, 'new')",
+                ((partner_id, f"Empresa {i}") for i in range(leads_per_partner)),
+            )
+            conn.executemany(
+                "INSERT INTO opportunities (partner_id, opportunity_name, total_value, probability, stage, status) "
+                "VALUES (?, ?, ?, 50, ?, 'open')",
+                ((partner_id, f"Oportunidad {i}", rng.randint(500, 5000), rng.choice(STAGES))
+                 for i in range(opportunities_per_partner)),
+            )
+            conn.executemany(
+                "INSERT INTO commissions (partner_id, client_name, commission_amount, status) "
+                "VALUES (?, ?, ?, 'active')",
+                ((partner_id, f"Cliente {i}", rng.randint(10, 200)) for i in range(commissions_per_partner)),
+            )
+        conn.execute("ANALYZE")
+    return conn, leads_per_partner * opportunities_per_partner * commissions_per_partner
+
+
+def best_time(conn, sql, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = conn.execute(sql).fetchall()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de agregados por partner (fan-out vs preagregado)")
+    parser.add_argument('--partners', type=int, default=20)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[30, 100, 300, 1000, 3000],
+                        help="leads por partner en cada ronda")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'leads/partner':>14} {'fan-out/partner':>15} {'anterior (ms)':>14} {'preagregado (ms)':>17}  SUM comisiones")
+    for size in args.sizes:
+        conn, fanout_rows = build_database(args.partners, size)
+        new_time, new_rows = best_time(conn, PARTNERS_PERFORMANCE_SQL, args.repeat)
+
+        if fanout_rows <= LEGACY_ROW_LIMIT:
+            legacy_time, legacy_rows = best_time(conn, LEGACY_PERFORMANCE_SQL, 1)
+            legacy_ms = f"{legacy_time * 1000:.1f}"
+            new_total = sum(row[6] for row in new_rows)
+            inflation = sum(row[6] for row in legacy_rows) / new_total if new_total else 0
+            note = f"anterior inflada x{inflation:.0f}"
+        else:
+            legacy_ms = "omitida"
+            note = "correcta"
+        print(f"{size:>14} {fanout_rows:>15,} {legacy_ms:>14} {new_time * 1000:>17.2f}  {note}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
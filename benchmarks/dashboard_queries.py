@@ -0,0 +1,246 @@
+"""
+Benchmark sin Streamlit de las consultas de los dashboards.
+
+Ejecuta cada consulta de las páginas del CRM y de los dashboards de
+bcs_system.db sobre las bases sintéticas de benchmarks.synthetic_data y
+mide:
+
+    p50_ms / p95_ms   tiempo de ejecución + fetchall, sin caché de consultas
+    rows              filas devueltas
+    vm_steps          instrucciones de la VM de SQLite (aprox., en bloques de
+                      PROGRESS_STEP): crece con las filas recorridas
+    full_scans        pasos del plan que recorren una tabla sin índice
+
+El SQL no se copia aquí: se graba llamando a los métodos de repositorio
+(y a los StatsQuery) que usan las páginas, con utils.query_plans.record,
+así que se mide exactamente lo que ejecutan.
+
+El resultado es JSON para comparar entre commits:
+
+    python -m benchmarks.dashboard_queries --scale 100k --output bench.json
+    python -m benchmarks.dashboard_queries --scale 100k --baseline bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import time
+from collections import namedtuple
+from datetime import date, timedelta
+
+from benchmarks.synthetic_data import DAYS, ensure_dataset, parse_scale
+from services.contacts import ContactRepository, PartnerActivityRepository
+from services.sub_bcs import SubBcsRepository
+from services.users import UserRepository
+from utils.connection_pool import get_connection
+from utils.query_plans import ADMIN_CALLS, DASHBOARD_CALLS, full_scans, recorded_queries
+
+# Granularidad del contador de instrucciones (el callback cada N pasos)
+PROGRESS_STEP = 100
+# Una consulta es regresión si empeora más que esto respecto a la línea base
+REGRESSION_RATIO = 1.25
+REGRESSION_MIN_MS = 1.0
+
+# db es 'crm' o 'bcs'; call(repo, ctx) es la llamada de la página con el contexto del conjunto de datos
+QuerySpec = namedtuple('QuerySpec', ['name', 'db', 'repository', 'call'])
+
+# Lecturas del CRM: las mismas llamadas que comprueba utils.query_plans más los listados del administrador
+CRM_QUERIES = [
+    QuerySpec(name, 'crm', repository, call)
+    for name, repository, call in DASHBOARD_CALLS + ADMIN_CALLS
+    # Los borrados sólo se comprueban en el plan; aquí se mide lectura
+    if not name.startswith('delete_')
+]
+
+# Lecturas principales de BCS_dashboards (partner, admin y cliente)
+BCS_QUERIES = [
+    QuerySpec("partner_dashboard: estadísticas", 'bcs', SubBcsRepository,
+              lambda repo, ctx: repo.partner_stats(ctx['partner_user_id'])),
+    QuerySpec("partner_dashboard: actividades recientes", 'bcs', PartnerActivityRepository,
+              lambda repo, ctx: repo.recent(ctx['partner_user_id'], limit=5)),
+    QuerySpec("partner_dashboard: Sub-BCS activos por tipo", 'bcs', SubBcsRepository,
+              lambda repo, ctx: repo.active_by_type(ctx['partner_user_id'])),
+    QuerySpec("partner_dashboard: top ingresos", 'bcs', SubBcsRepository,
+              lambda repo, ctx: repo.top_revenue(ctx['partner_user_id'], limit=10)),
+    QuerySpec("show_contacts_management", 'bcs', ContactRepository,
+              lambda repo, ctx: repo.list_for_partner(ctx['partner_user_id'])),
+    QuerySpec("show_client_sub_bcs", 'bcs', SubBcsRepository,
+              lambda repo, ctx: repo.client_sub_bcs_for_partner(ctx['partner_user_id'])),
+    QuerySpec("show_partner_sub_bcs", 'bcs', SubBcsRepository,
+              lambda repo, ctx: repo.partner_sub_bcs(ctx['partner_user_id'])),
+    QuerySpec("show_partner_activities", 'bcs', PartnerActivityRepository,
+              lambda repo, ctx: repo.list_for_partner(ctx['partner_user_id'])),
+    QuerySpec("admin_dashboard: usuarios", 'bcs', UserRepository,
+              lambda repo, ctx: repo.list_with_creator()),
+    QuerySpec("admin_dashboard: Sub-BCS de clientes", 'bcs', SubBcsRepository,
+              lambda repo, ctx: repo.all_user_apps()),
+    QuerySpec("admin_dashboard: Sub-BCS de partners", 'bcs', SubBcsRepository,
+              lambda repo, ctx: repo.all_partner_sub_bcs()),
+    QuerySpec("user_dashboard: apps del cliente", 'bcs', SubBcsRepository,
+              lambda repo, ctx: repo.user_apps(ctx['client_user_id'])),
+    QuerySpec("user_dashboard: estadísticas", 'bcs', SubBcsRepository,
+              lambda repo, ctx: repo.user_stats(ctx['client_user_id'])),
+]
+
+QUERIES = CRM_QUERIES + BCS_QUERIES
+
+
+def dataset_context(crm_conn, bcs_conn, anchor):
+    """Partner con más filas, un lead y un cliente reales, y un cursor a mitad del rango de fechas"""
+    partner_id = crm_conn.execute("""
+        SELECT partner_id FROM leads GROUP BY partner_id ORDER BY COUNT(*) DESC LIMIT 1
+    """).fetchone()[0]
+    lead_id = crm_conn.execute("SELECT MAX(id) FROM leads WHERE partner_id = ?", (partner_id,)).fetchone()[0]
+    partner_user_id = bcs_conn.execute("""
+        SELECT partner_id FROM contacts GROUP BY partner_id ORDER BY COUNT(*) DESC LIMIT 1
+    """).fetchone()[0]
+    client_user_id = bcs_conn.execute("SELECT MIN(user_id) FROM user_sub_bcs").fetchone()[0]
+    return {
+        'partner_id': partner_id,
+        'lead_id': lead_id,
+        'partner_user_id': partner_user_id,
+        'client_user_id': client_user_id,
+        'since': (anchor - timedelta(days=DAYS)).isoformat(),
+        'cursor_date': (anchor - timedelta(days=DAYS // 2)).isoformat(),
+        'cursor_id': 2 ** 62,
+    }
+
+
+def percentile(samples, fraction):
+    """Percentil por el método del rango más cercano"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def measure(conn, sql, params, repeat):
+    """Tiempos (s) de repeat ejecuciones, filas devueltas e instrucciones de la VM"""
+    conn.execute(sql, params).fetchall()    # calienta la caché de páginas
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = conn.execute(sql, params).fetchall()
+        samples.append(time.perf_counter() - start)
+
+    # El contador se mide aparte para no sumar su coste a los tiempos
+    steps = [0]
+
+    def count():
+        steps[0] += 1
+        return 0
+
+    conn.set_progress_handler(count, PROGRESS_STEP)
+    try:
+        conn.execute(sql, params).fetchall()
+    finally:
+        conn.set_progress_handler(None, PROGRESS_STEP)
+    return samples, len(rows), steps[0] * PROGRESS_STEP
+
+
+def run_benchmark(crm_path, bcs_path, anchor, repeat=20, queries=QUERIES):
+    crm_conn = get_connection(crm_path)
+    bcs_conn = get_connection(bcs_path)
+    try:
+        ctx = dataset_context(crm_conn, bcs_conn, anchor)
+        results = []
+        for spec in queries:
+            conn, path = (crm_conn, crm_path) if spec.db == 'crm' else (bcs_conn, bcs_path)
+            # El SQL y los parámetros que ejecuta el método del repositorio con este contexto
+            [(_, sql, params)] = recorded_queries([(spec.name, spec.repository, spec.call)], ctx, path)
+            samples, rows, vm_steps = measure(conn, sql, params, repeat)
+            results.append({
+                'name': spec.name,
+                'db': spec.db,
+                'p50_ms': round(percentile(samples, 0.50) * 1000, 3),
+                'p95_ms': round(percentile(samples, 0.95) * 1000, 3),
+                'rows': rows,
+                'vm_steps': vm_steps,
+                'full_scans': full_scans(conn, sql, params),
+            })
+    finally:
+        crm_conn.close()
+        bcs_conn.close()
+    return ctx, results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, ratio=REGRESSION_RATIO):
+    """
+    Consultas que empeoran más de ratio respecto a la línea base: [(nombre, métrica, antes, ahora)].
+
+    vm_steps es determinista para los mismos datos; el p50 se compara además
+    con un margen absoluto para no marcar el ruido de consultas de microsegundos.
+    """
+    before = {(entry['db'], entry['name']): entry for entry in baseline['queries']}
+    regressions = []
+    for entry in results:
+        old = before.get((entry['db'], entry['name']))
+        if old is None:
+            continue
+        if entry['vm_steps'] > old['vm_steps'] * ratio + PROGRESS_STEP:
+            regressions.append((entry['name'], 'vm_steps', old['vm_steps'], entry['vm_steps']))
+        if entry['p50_ms'] > old['p50_ms'] * ratio + REGRESSION_MIN_MS:
+            regressions.append((entry['name'], 'p50_ms', old['p50_ms'], entry['p50_ms']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de las consultas de los dashboards")
+    parser.add_argument('--scale', default='1k', help="1k, 100k, 1M o un número de leads/contactos")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--data-dir', default='benchmark_data',
+                        help="directorio de las bases sintéticas (se generan si no existen)")
+    parser.add_argument('--anchor', type=date.fromisoformat, default=None,
+                        help="fecha más reciente de los datos al generarlos (por defecto hoy)")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', help="archivo JSON de resultados (por defecto, salida estándar)")
+    parser.add_argument('--baseline', help="JSON de una ejecución anterior; falla si alguna consulta empeora")
+    args = parser.parse_args()
+
+    scale = parse_scale(args.scale)
+    anchor = args.anchor or date.today()
+    crm_path, bcs_path = ensure_dataset(args.data_dir, scale, args.seed, anchor)
+    ctx, results = run_benchmark(crm_path, bcs_path, anchor, args.repeat)
+
+    report = {
+        'meta': {
+            'commit': _git_commit(),
+            'scale': scale,
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'context': ctx,
+            'sqlite': sqlite3.sqlite_version,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'queries': results,
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline)
+        for name, metric, before, after in regressions:
+            print(f"REGRESIÓN en {name}: {metric} {before} -> {after}")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Perfil de importación en frío de las aplicaciones (python -X importtime).
+
+Cada escenario se ejecuta en un intérprete nuevo, que es lo que paga un
+proceso de Streamlit recién desplegado antes de pintar la primera página:
+
+    crm_login           CRM_partnerBCS: login y navegación
+    crm_<página>        login + el módulo de CRM_pages que abre la página
+    blackbox_login      BCS_Blackbox sin sesión
+    blackbox_<rol>      + el dashboard del rol
+    landing_main        main.py
+
+y mide:
+
+    import_ms     suma del tiempo acumulado de las importaciones de primer nivel
+                  (la mejor de --repeat ejecuciones)
+    heavy         paquetes pesados cargados (pandas, plotly, numpy, pyarrow, PIL)
+    top           los paquetes de primer nivel que más tardan
+
+Los escenarios de login y las landings no deben cargar pandas ni plotly:
+si lo hacen, el comando falla. Lo que ya carga un "import streamlit" a
+secas (streamlit importa plotly si está instalado) se mide aparte como
+línea base y no cuenta: sólo se marcan los paquetes que añade el código
+del repositorio. Importar las páginas las ejecuta en modo
+"bare" de Streamlit, así que se lanzan en un directorio temporal para que
+las bases que abran al arrancar no sean las del repositorio.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --output imports.json
+    python -m benchmarks.import_time --baseline imports.json
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.dashboard_queries import _git_commit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_PACKAGES = ('pandas', 'plotly', 'numpy', 'pyarrow', 'PIL')
+LIGHT_FORBIDDEN = ('pandas', 'plotly')
+# Lo que cargan estos módulos por sí solos no se atribuye a las páginas
+BASELINE_MODULES = ['streamlit']
+# Un escenario es regresión si empeora más que esto respecto a la línea base
+REGRESSION_RATIO = 1.25
+REGRESSION_MIN_MS = 20.0
+TOP = 10
+
+# nombre -> (módulos a importar, paquetes prohibidos)
+SCENARIOS = {
+    'crm_login': (['CRM_partnerBCS'], LIGHT_FORBIDDEN),
+    'crm_dashboard': (['CRM_partnerBCS', 'CRM_pages.dashboard'], ()),
+    'crm_leads': (['CRM_partnerBCS', 'CRM_pages.leads'], ()),
+    'crm_admin': (['CRM_partnerBCS', 'CRM_pages.admin'], ()),
+    'crm_settings': (['CRM_partnerBCS', 'CRM_pages.settings'], ()),
+    'blackbox_login': (['BCS_Blackbox'], LIGHT_FORBIDDEN),
+    'blackbox_admin': (['BCS_Blackbox', 'BCS_dashboards.admin_dashboard'], ()),
+    'blackbox_partner': (['BCS_Blackbox', 'BCS_dashboards.partner_dashboard'], ()),
+    'landing_main': (['main'], LIGHT_FORBIDDEN),
+}
+
+# "import time:      1234 |      5678 |     paquete"; la sangría indica el nivel
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def parse_importtime(stderr):
+    """[(paquete, nivel, self_us, cumulative_us)] de la salida de -X importtime"""
+    entries = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, (len(indent) - 1) // 2, int(self_us), int(cumulative_us)))
+    return entries
+
+
+def profile(modules, workdir):
+    """Importa modules en un intérprete nuevo; devuelve (entries, wall_ms, error)"""
+    code = "; ".join(f"import {module}" for module in modules)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get('PYTHONPATH')])))
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True, cwd=workdir, env=env)
+    wall_ms = (time.perf_counter() - start) * 1000
+    error = None
+    if proc.returncode != 0:
+        lines = [line for line in proc.stderr.splitlines() if not line.startswith('import time:')]
+        error = lines[-1] if lines else f"código de salida {proc.returncode}"
+    return parse_importtime(proc.stderr), wall_ms, error
+
+
+def loaded_packages(entries):
+    """Paquetes de primer nivel importados según entries"""
+    return {entry[0].split('.')[0] for entry in entries}
+
+
+def baseline_packages(workdir):
+    """Paquetes que carga BASELINE_MODULES sin el repositorio; vacío si no se puede importar"""
+    entries, _, error = profile(BASELINE_MODULES, workdir)
+    return set() if error else loaded_packages(entries)
+
+
+def summarize(name, modules, forbidden, runs, baseline=frozenset()):
+    best_entries, best_wall, error = min(runs, key=lambda run: sum(e[3] for e in run[0] if e[1] == 0))
+    top_level = [entry for entry in best_entries if entry[1] == 0]
+    loaded = loaded_packages(best_entries)
+    heavy = [package for package in HEAVY_PACKAGES if package in loaded]
+    return {
+        'name': name,
+        'modules': modules,
+        'import_ms': round(sum(entry[3] for entry in top_level) / 1000, 1),
+        'wall_ms': round(best_wall, 1),
+        'modules_loaded': len(best_entries),
+        'heavy': heavy,
+        'violations': [package for package in forbidden if package in loaded and package not in baseline],
+        # Prohibidos pero ya cargados por BASELINE_MODULES
+        'preloaded': [package for package in forbidden if package in loaded and package in baseline],
+        'top': [
+            {'package': package, 'cumulative_ms': round(cumulative / 1000, 1)}
+            for package, _, _, cumulative in sorted(top_level, key=lambda e: -e[3])[:TOP]
+        ],
+        'error': error,
+    }
+
+
+def run_benchmark(scenarios, repeat, workdir):
+    baseline = baseline_packages(workdir)
+    results = []
+    for name, (modules, forbidden) in scenarios.items():
+        runs = [profile(modules, workdir) for _ in range(repeat)]
+        results.append(summarize(name, modules, forbidden, runs, baseline))
+    return results
+
+
+def compare(results, baseline, ratio=REGRESSION_RATIO):
+    """Escenarios que empeoran más de ratio respecto a la línea base: [(nombre, antes, ahora)]"""
+    before = {entry['name']: entry for entry in baseline['scenarios']}
+    regressions = []
+    for entry in results:
+        old = before.get(entry['name'])
+        if old is None or entry['error'] or old['error']:
+            continue
+        if entry['import_ms'] > old['import_ms'] * ratio + REGRESSION_MIN_MS:
+            regressions.append((entry['name'], old['import_ms'], entry['import_ms']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil de importación en frío de las aplicaciones")
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS),
+                        help="escenarios a medir (por defecto, todos)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workdir', help="directorio de trabajo de las páginas (por defecto, uno temporal)")
+    parser.add_argument('--output', help="guardar los resultados en JSON")
+    parser.add_argument('--baseline', help="JSON de una ejecución anterior; falla si algún escenario empeora")
+    args = parser.parse_args()
+
+    scenarios = {name: SCENARIOS[name] for name in (args.scenario or SCENARIOS)}
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or tmp
+        if not args.workdir:
+            # Las páginas leen assets/ con rutas relativas
+            os.symlink(os.path.join(REPO_ROOT, 'assets'), os.path.join(tmp, 'assets'))
+        results = run_benchmark(scenarios, args.repeat, workdir)
+
+    print(f"{'escenario':<20} {'import_ms':>10} {'wall_ms':>9} {'módulos':>8}  pesados")
+    for entry in results:
+        if entry['error']:
+            print(f"{entry['name']:<20} error: {entry['error']}")
+            continue
+        print(f"{entry['name']:<20} {entry['import_ms']:>10} {entry['wall_ms']:>9} "
+              f"{entry['modules_loaded']:>8}  {', '.join(entry['heavy']) or '-'}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {
+                    'commit': _git_commit(),
+                    'repeat': args.repeat,
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                },
+                'scenarios': results,
+            }, f, indent=2, ensure_ascii=False)
+
+    failed = any(entry['error'] for entry in results)
+    for entry in results:
+        if entry['violations']:
+            print(f"{entry['name']} carga {', '.join(entry['violations'])}: debería importarse sólo al abrir una página con gráficos")
+            failed = True
+        elif entry['preloaded']:
+            print(f"{entry['name']}: {', '.join(entry['preloaded'])} ya lo carga "
+                  f"import {', '.join(BASELINE_MODULES)}; no se cuenta")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        for name, before, after in compare(results, baseline):
+            print(f"REGRESIÓN en {name}: import_ms {before} -> {after}")
+            failed = True
+
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
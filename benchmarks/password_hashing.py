@@ -0,0 +1,114 @@
+"""
+Benchmark del hash de contraseñas para dimensionar el factor de trabajo.
+
+Para cada configuración (PBKDF2 con distintas iteraciones, scrypt con
+distintos n) mide en esta máquina:
+
+    p50_ms            lo que tarda un login (una verificación)
+    logins_per_s      logins por segundo con un solo hilo
+    parallel_per_s    logins por segundo con --workers hilos (hashlib
+                      suelta el GIL durante el KDF)
+
+y, como referencia, lo que cuesta resolver una sesión ya abierta con
+utils.session_tokens. Recomienda la configuración más cara que cumpla
+--target-ms y --min-logins; se aplica con BCS_PASSWORD_HASHER y
+BCS_PBKDF2_ITERATIONS / BCS_SCRYPT_N.
+
+    python -m benchmarks.password_hashing
+    python -m benchmarks.password_hashing --target-ms 100 --min-logins 50 --output kdf.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.passwords import Pbkdf2Hasher, ScryptHasher
+from utils.session_tokens import SessionTokenCache
+
+PBKDF2_ITERATIONS = [100_000, 210_000, 310_000, 600_000, 1_000_000]
+SCRYPT_N = [2 ** 14, 2 ** 15, 2 ** 16]
+PASSWORD = "correct horse battery staple"
+
+Result = namedtuple('Result', ['name', 'env', 'p50_ms', 'logins_per_s', 'parallel_per_s'])
+
+
+def _configs():
+    for iterations in PBKDF2_ITERATIONS:
+        yield (f"pbkdf2_sha256 {iterations:,}", Pbkdf2Hasher(iterations),
+               f"BCS_PASSWORD_HASHER=pbkdf2_sha256 BCS_PBKDF2_ITERATIONS={iterations}")
+    for n in SCRYPT_N:
+        yield (f"scrypt n=2^{n.bit_length() - 1}", ScryptHasher(n),
+               f"BCS_PASSWORD_HASHER=scrypt BCS_SCRYPT_N={n}")
+
+
+def measure(name, hasher, env, repeat, workers):
+    encoded = hasher.encode(PASSWORD)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        hasher.verify(PASSWORD, encoded)
+        timings.append(time.perf_counter() - start)
+    p50 = statistics.median(timings)
+
+    logins = repeat * workers
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda _: hasher.verify(PASSWORD, encoded), range(logins)))
+    parallel = logins / (time.perf_counter() - start)
+
+    return Result(name, env, round(p50 * 1000, 1), round(1 / p50, 1), round(parallel, 1))
+
+
+def measure_token_lookup(lookups=100_000):
+    cache = SessionTokenCache()
+    token = cache.issue(1, {'id': 1, 'name': 'Partner'})
+    start = time.perf_counter()
+    for _ in range(lookups):
+        cache.get(token)
+    return (time.perf_counter() - start) / lookups * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide el coste de login de cada configuración del KDF")
+    parser.add_argument("--repeat", type=int, default=5, help="verificaciones por configuración")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--target-ms", type=float, default=250.0, help="latencia máxima aceptable de un login")
+    parser.add_argument("--min-logins", type=float, default=20.0, help="logins/s mínimos con --workers hilos")
+    parser.add_argument("--output", help="guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'configuración':<26} {'p50_ms':>9} {'logins/s':>10} {'paralelo/s':>11}")
+    for name, hasher, env in _configs():
+        result = measure(name, hasher, env, args.repeat, args.workers)
+        results.append(result)
+        print(f"{result.name:<26} {result.p50_ms:>9} {result.logins_per_s:>10} {result.parallel_per_s:>11}")
+
+    token_us = measure_token_lookup()
+    print(f"\nSesión abierta (utils.session_tokens): {token_us:.2f} µs por petición")
+
+    eligible = [r for r in results if r.p50_ms <= args.target_ms and r.parallel_per_s >= args.min_logins]
+    # La más cara que cumple los límites: cuanto más lento el KDF, más caro un ataque offline
+    recommended = max(eligible, key=lambda r: r.p50_ms) if eligible else None
+    if recommended:
+        print(f"Recomendado (≤ {args.target_ms} ms, ≥ {args.min_logins} logins/s con {args.workers} hilos): "
+              f"{recommended.name}\n    {recommended.env}")
+    else:
+        print("Ninguna configuración cumple los límites; revisa --target-ms / --min-logins")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'machine': {'python': platform.python_version(), 'cpu_count': os.cpu_count(), 'workers': args.workers},
+                'results': [r._asdict() for r in results],
+                'token_lookup_us': round(token_us, 3),
+                'recommended': recommended._asdict() if recommended else None,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
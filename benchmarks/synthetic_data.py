@@ -0,0 +1,353 @@
+"""
+Generador de datos sintéticos para crm_partner_bcs.db y bcs_system.db.
+
+Crea bases nuevas con el esquema real (bootstrap + migraciones de
+utils.migrations) y las llena con datos deterministas a partir de una
+semilla. La escala es el número de leads del CRM y de contactos del
+sistema BCS; el resto de tablas se dimensiona en proporción:
+
+    CRM: partners = escala / 200, oportunidades = escala / 2,
+         actividades = escala, comisiones = escala / 10
+    BCS: partners = escala / 200, clientes = escala / 10, contactos = escala,
+         client_sub_bcs = escala / 10, partner_sub_bcs = 2 por partner,
+         user_sub_bcs = 1 por cliente, partner_activities = escala
+
+El primer partner de cada base concentra el 10 % de las filas: es el
+caso más caro para las páginas filtradas por partner y el que miden los
+benchmarks.
+
+Uso:
+    python -m benchmarks.synthetic_data --scale 100k --out /tmp/bcs-bench [--seed 42]
+"""
+import argparse
+import hashlib
+import os
+import random
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+
+from utils.migrations import (
+    BCS_MIGRATIONS, CRM_MIGRATIONS, bcs_bootstrap, crm_bootstrap, run_migrations,
+)
+from utils.partner_kpis import rebuild_partner_kpis
+
+SCALES = {'1k': 1_000, '100k': 100_000, '1M': 1_000_000}
+
+# Fracción de filas que van al partner "caliente" (id más bajo)
+HOT_PARTNER_SHARE = 0.10
+# Las fechas se reparten en los últimos DAYS días antes de la fecha ancla
+DAYS = 730
+BATCH = 10_000
+
+# Valores de los formularios de la app
+INDUSTRIES = ["Pesca", "Salud", "Restauración", "Retail", "Marketing", "Legal", "Otros"]
+LEAD_SOURCES = ["Referido", "Cold Call", "LinkedIn", "Website", "Email", "Otros"]
+LEAD_STATUSES = ["new", "contacted", "qualified", "unqualified"]
+BCS_SOLUTIONS = [
+    "FleetCore - Pesca & Flotas", "MedCare Pro - Hospitales & Clínicas",
+    "SmartChef - Restaurantes & Delivery", "PetCore - Veterinarias",
+    "TravelCore - Hoteles & Turismo", "LawFlow - Bufetes Legales",
+    "RetailFlow - Comercio & Retail", "Consultix - Consultoras",
+]
+STAGES = ['discovery', 'demo', 'proposal', 'negotiation', 'closed-won', 'closed-lost']
+ACTIVITY_TYPES = ["call", "email", "demo", "meeting", "follow_up", "proposal", "other"]
+COMMISSION_STATUSES = ['active', 'active', 'active', 'paused', 'cancelled']
+BCS_TYPES = ["Hospitalario", "Pesquero", "Industrial", "Comercial", "Educativo", "Logístico", "Otro"]
+SUB_BCS_STATUSES = ["active", "active", "inactive", "trial"]
+PARTNER_ACTIVITY_TYPES = ["Validación de Cliente", "Llamada", "Reunión", "Email", "Demo", "Seguimiento"]
+
+
+def parse_scale(value):
+    """'1k', '100k', '1M' o un número entero"""
+    if value in SCALES:
+        return SCALES[value]
+    return int(value)
+
+
+class _Dates:
+    """Fechas aleatorias en los DAYS días anteriores a anchor, con los formatos de la app"""
+
+    def __init__(self, rng, anchor):
+        self.rng = rng
+        self.anchor = datetime.combine(anchor, datetime.min.time())
+
+    def moment(self):
+        return self.anchor - timedelta(seconds=self.rng.randrange(DAYS * 86400))
+
+    def day(self):
+        return self.moment().strftime('%Y-%m-%d')
+
+    def timestamp(self):
+        return self.moment().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _pick_partner(rng, partner_ids):
+    if rng.random() < HOT_PARTNER_SHARE:
+        return partner_ids[0]
+    return rng.choice(partner_ids)
+
+
+def _insert(conn, sql, rows):
+    """executemany por lotes para no materializar millones de tuplas"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH:
+            conn.executemany(sql, batch)
+            batch.clear()
+    if batch:
+        conn.executemany(sql, batch)
+
+
+def _new_database(path, migrations, bootstrap):
+    if os.path.exists(path):
+        raise FileExistsError(f"{path} ya existe; el generador sólo crea bases nuevas")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    run_migrations(conn, migrations, bootstrap)
+    return conn
+
+
+def generate_crm(path, scale, seed=42, anchor=None):
+    """Crea path con el esquema del CRM y `scale` leads. Devuelve {tabla: filas}"""
+    rng = random.Random(seed)
+    dates = _Dates(rng, anchor or date.today())
+    conn = _new_database(path, CRM_MIGRATIONS, crm_bootstrap)
+
+    partner_count = max(5, scale // 200)
+    opportunity_count = scale // 2
+    commission_count = max(1, scale // 10)
+    password_hash = hashlib.sha256("123456".encode()).hexdigest()
+
+    with conn:
+        first = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM partners").fetchone()[0]
+        partner_ids = list(range(first, first + partner_count))
+        _insert(conn, """
+            INSERT INTO partners (id, name, email, password_hash, phone, region, specialization,
+                                  created_date, status, created_by)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'active', 'admin')
+        """, (
+            (pid, f"Partner {pid}", f"partner{pid}@example.com", password_hash, f"+56 9 {pid:08d}",
+             rng.choice(["LATAM", "Europa", "Norteamérica"]), rng.choice(INDUSTRIES), dates.day())
+            for pid in partner_ids
+        ))
+
+        # partner de cada lead y de cada oportunidad, para mantener la coherencia de las FK
+        lead_partner = [_pick_partner(rng, partner_ids) for _ in range(scale)]
+        _insert(conn, """
+            INSERT INTO leads (id, partner_id, company_name, contact_name, contact_email, contact_phone,
+                               industry, company_size, lead_source, status, created_date, last_contact)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            (i + 1, lead_partner[i], f"Empresa {i + 1}", f"Contacto {i + 1}", f"contacto{i + 1}@empresa.com",
+             f"+56 2 {i + 1:08d}", rng.choice(INDUSTRIES), rng.randint(1, 5000), rng.choice(LEAD_SOURCES),
+             rng.choice(LEAD_STATUSES), dates.day(), dates.day() if rng.random() < 0.5 else None)
+            for i in range(scale)
+        ))
+
+        opportunity_lead = [rng.randrange(scale) for _ in range(opportunity_count)]
+
+        def opportunities():
+            for i, lead in enumerate(opportunity_lead):
+                stage = rng.choice(STAGES)
+                users = rng.randint(1, 200)
+                price = rng.choice([15.0, 25.0, 40.0])
+                yield (i + 1, lead + 1, lead_partner[lead], f"Oportunidad {i + 1}", rng.choice(BCS_SOLUTIONS),
+                       users, price, users * price, rng.choice([10, 25, 50, 75, 90]), stage, dates.day(),
+                       dates.day())
+
+        _insert(conn, """
+            INSERT INTO opportunities (id, lead_id, partner_id, opportunity_name, bcs_solution, estimated_users,
+                                       price_per_user, total_value, probability, stage, expected_close_date,
+                                       status, created_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'open', ?)
+        """, opportunities())
+
+        def activities():
+            for i in range(scale):
+                lead = rng.randrange(scale)
+                opportunity = rng.randrange(opportunity_count) + 1 if opportunity_count and rng.random() < 0.3 else None
+                yield (i + 1, lead + 1, opportunity, lead_partner[lead], rng.choice(ACTIVITY_TYPES),
+                       f"Actividad {i + 1}", dates.day(), dates.day() if rng.random() < 0.2 else None,
+                       rng.random() < 0.6, dates.timestamp())
+
+        _insert(conn, """
+            INSERT INTO activities (id, lead_id, opportunity_id, partner_id, activity_type, description,
+                                    activity_date, follow_up_date, completed, created_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, activities())
+
+        def commissions():
+            for i in range(commission_count):
+                opportunity = rng.randrange(opportunity_count) if opportunity_count else None
+                partner_id = lead_partner[opportunity_lead[opportunity]] if opportunity is not None \
+                    else _pick_partner(rng, partner_ids)
+                monthly_value = float(rng.randint(100, 5000))
+                yield (i + 1, partner_id, opportunity + 1 if opportunity is not None else None,
+                       f"Cliente {i + 1}", monthly_value, 0.5, monthly_value * 0.5,
+                       dates.day() if rng.random() < 0.95 else None, rng.choice(COMMISSION_STATUSES))
+
+        _insert(conn, """
+            INSERT INTO commissions (id, partner_id, opportunity_id, client_name, monthly_value,
+                                     commission_rate, commission_amount, start_date, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, commissions())
+
+        # Los triggers ya mantienen partner_kpis; el recálculo corrige el redondeo acumulado
+        rebuild_partner_kpis(conn)
+        conn.execute("ANALYZE")
+
+    counts = _table_counts(conn, ['partners', 'leads', 'opportunities', 'activities', 'commissions'])
+    conn.close()
+    return counts
+
+
+def generate_bcs(path, scale, seed=42, anchor=None):
+    """Crea path con el esquema de bcs_system.db y `scale` contactos. Devuelve {tabla: filas}"""
+    rng = random.Random(seed)
+    dates = _Dates(rng, anchor or date.today())
+    conn = _new_database(path, BCS_MIGRATIONS, bcs_bootstrap)
+
+    partner_count = max(5, scale // 200)
+    client_count = max(1, scale // 10)
+    password_hash = hashlib.sha256("123456".encode()).hexdigest()
+
+    with conn:
+        roles = dict(conn.execute("SELECT name, id FROM roles"))
+        first = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM users").fetchone()[0]
+        partner_ids = list(range(first, first + partner_count))
+        client_ids = list(range(first + partner_count, first + partner_count + client_count))
+        client_partner = {client: _pick_partner(rng, partner_ids) for client in client_ids}
+
+        _insert(conn, """
+            INSERT INTO users (id, username, password_hash, role_id, email, created_at, is_active,
+                               created_by_partner_id, role, status)
+            VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?, 'active')
+        """, (
+            (uid, f"partner{uid}", password_hash, roles['partner'], f"partner{uid}@example.com",
+             dates.timestamp(), None, 'partner')
+            for uid in partner_ids
+        ))
+        _insert(conn, """
+            INSERT INTO users (id, username, password_hash, role_id, email, created_at, is_active,
+                               created_by_partner_id, role, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'active')
+        """, (
+            (uid, f"cliente{uid}", password_hash, roles['cliente'], f"cliente{uid}@example.com",
+             dates.timestamp(), rng.random() < 0.9, client_partner[uid], 'client')
+            for uid in client_ids
+        ))
+
+        def contacts():
+            converted = iter(client_ids)
+            for i in range(scale):
+                validated = rng.random() < 0.3
+                user_id = next(converted, None) if validated and rng.random() < 0.3 else None
+                partner_id = client_partner[user_id] if user_id else _pick_partner(rng, partner_ids)
+                yield (i + 1, partner_id, f"Contacto {i + 1}", f"Empresa {i + 1}", f"contacto{i + 1}@empresa.com",
+                       f"+56 9 {i + 1:08d}", rng.choice(["Gerente", "CEO", "Director", "Jefe de área"]),
+                       rng.choice(INDUSTRIES), 'active' if rng.random() < 0.85 else 'inactive',
+                       dates.timestamp(), int(validated), dates.timestamp() if validated else None,
+                       int(user_id is not None), user_id, dates.timestamp() if user_id else None)
+
+        _insert(conn, """
+            INSERT INTO contacts (id, partner_id, name, company, email, phone, position, industry, status,
+                                  created_at, validated, validation_date, converted_to_user,
+                                  converted_user_id, conversion_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, contacts())
+
+        _insert(conn, """
+            INSERT INTO client_sub_bcs (partner_id, contact_id, client_name, company_name, bcs_type, modules,
+                                        users_count, status, start_date, monthly_value, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            (_pick_partner(rng, partner_ids), rng.randrange(scale) + 1, f"Cliente {i + 1}", f"Empresa {i + 1}",
+             rng.choice(BCS_TYPES), "Inventario, Facturación", rng.randint(1, 100), rng.choice(SUB_BCS_STATUSES),
+             dates.day(), float(rng.randint(0, 3000)), dates.timestamp())
+            for i in range(client_count)
+        ))
+
+        _insert(conn, """
+            INSERT INTO partner_sub_bcs (partner_id, bcs_name, bcs_type, description, modules, status, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (
+            (pid, f"BCS {pid}-{n}", rng.choice(BCS_TYPES), "BCS interno del partner", "CRM",
+             rng.choice(SUB_BCS_STATUSES), dates.timestamp())
+            for pid in partner_ids for n in range(2)
+        ))
+
+        _insert(conn, """
+            INSERT INTO user_sub_bcs (user_id, partner_id, app_name, app_description, app_url, app_type,
+                                      status, created_at, last_accessed, access_count)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            (uid, client_partner[uid], f"App {uid}", "Aplicación del cliente", f"https://app{uid}.example.com",
+             rng.choice(BCS_TYPES), rng.choice(SUB_BCS_STATUSES), dates.timestamp(),
+             dates.timestamp() if rng.random() < 0.7 else None, rng.randint(0, 500))
+            for uid in client_ids
+        ))
+
+        _insert(conn, """
+            INSERT INTO partner_activities (partner_id, contact_id, activity_type, subject, description,
+                                            activity_date, follow_up_date, completed)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            (_pick_partner(rng, partner_ids), rng.randrange(scale) + 1, rng.choice(PARTNER_ACTIVITY_TYPES),
+             f"Actividad {i + 1}", "Seguimiento comercial", dates.timestamp(),
+             dates.day() if rng.random() < 0.2 else None, int(rng.random() < 0.6))
+            for i in range(scale)
+        ))
+        conn.execute("ANALYZE")
+
+    counts = _table_counts(conn, ['users', 'contacts', 'client_sub_bcs', 'partner_sub_bcs',
+                                  'user_sub_bcs', 'partner_activities'])
+    conn.close()
+    return counts
+
+
+def _table_counts(conn, tables):
+    return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables}
+
+
+def dataset_paths(out_dir, scale, seed):
+    """Rutas (crm, bcs) de un conjunto de datos; el nombre incluye escala y semilla"""
+    return (os.path.join(out_dir, f"crm_{scale}_s{seed}.db"),
+            os.path.join(out_dir, f"bcs_{scale}_s{seed}.db"))
+
+
+def ensure_dataset(out_dir, scale, seed=42, anchor=None):
+    """Genera el conjunto de datos si no existe y devuelve sus rutas (crm, bcs)"""
+    os.makedirs(out_dir, exist_ok=True)
+    crm_path, bcs_path = dataset_paths(out_dir, scale, seed)
+    if not os.path.exists(crm_path):
+        generate_crm(crm_path, scale, seed, anchor)
+    if not os.path.exists(bcs_path):
+        generate_bcs(bcs_path, scale, seed, anchor)
+    return crm_path, bcs_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera bases sintéticas del CRM y del sistema BCS")
+    parser.add_argument('--scale', default='1k', help="1k, 100k, 1M o un número de leads/contactos")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', default='benchmark_data', help="directorio de salida")
+    parser.add_argument('--anchor', type=date.fromisoformat, default=None,
+                        help="fecha más reciente de los datos (YYYY-MM-DD, por defecto hoy)")
+    args = parser.parse_args()
+
+    scale = parse_scale(args.scale)
+    os.makedirs(args.out, exist_ok=True)
+    crm_path, bcs_path = dataset_paths(args.out, scale, args.seed)
+
+    for path, generate in ((crm_path, generate_crm), (bcs_path, generate_bcs)):
+        start = time.perf_counter()
+        counts = generate(path, scale, args.seed, args.anchor)
+        summary = ", ".join(f"{table}={rows:,}" for table, rows in counts.items())
+        print(f"{path}: {summary} ({time.perf_counter() - start:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,11 @@
 # db_setup.py
-import sqlite3
 from pathlib import Path
+from utils.connection_pool import get_connection
 
 DB_PATH = Path("partners.db")
 
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection(DB_PATH)
     c = conn.cursor()
     c.execute("""
     CREATE TABLE IF NOT EXISTS leads (
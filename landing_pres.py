@@ -1,24 +1,15 @@
 # app.py
-import streamlit as st
 import sqlite3
+import streamlit as st
 from pathlib import Path
 from data.content import *
-from db_setup import DB_PATH
+from services.landing_leads import capture_lead
+from utils.write_queue import AckTimeout, QueueFull
 
 # ---------- Helpers DB ----------
-def get_conn():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
-
 def save_lead(nombre, email, telefono, sector, mensaje, source="landing"):
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute("""
-        INSERT INTO leads (nombre,email,telefono,sector,mensaje,source) VALUES (?,?,?,?,?,?)
-    """, (nombre, email, telefono, sector, mensaje, source))
-    conn.commit()
-    conn.close()
+    # Almacén único de las landings; vuelve cuando la fila está en disco (errores en capture_lead)
+    return capture_lead(source, nombre, email, phone=telefono, sector=sector, message=mensaje)
 
 # ---------- Secciones ----------
 def hero_section():
@@ -466,12 +457,22 @@ def formulario_registro():
             if not nombre or not email or not telefono:
                 st.error("⚠️ Por favor completa los campos obligatorios (*)")
             else:
-                save_lead(nombre, email, telefono, sector, 
-                         f"Experiencia: {experiencia}. Mensaje: {mensaje}", 
-                         source="registro_partner")
-                st.success("✅ ¡Registro exitoso! Te contactaremos en 24 horas.")
-                st.balloons()
-                st.info("📧 Revisa tu email — te enviaremos el kit de bienvenida")
+                try:
+                    save_lead(nombre, email, telefono, sector, 
+                             f"Experiencia: {experiencia}. Mensaje: {mensaje}", 
+                             source="registro_partner")
+                except QueueFull:
+                    st.error("⚠️ Estamos recibiendo muchos registros. Inténtalo de nuevo en unos segundos.")
+                except AckTimeout:
+                    st.warning("El envío está tardando más de lo normal y es posible que ya lo hayamos recibido. Espera unos minutos antes de volver a enviarlo para no duplicarlo.")
+                except sqlite3.Error:
+                    st.error("⚠️ No hemos podido guardar tu registro. Revisa los datos e inténtalo de nuevo.")
+                except Exception:
+                    st.error("⚠️ Ha ocurrido un error al guardar tu registro. Inténtalo de nuevo más tarde.")
+                else:
+                    st.success("✅ ¡Registro exitoso! Te contactaremos en 24 horas.")
+                    st.balloons()
+                    st.info("📧 Revisa tu email — te enviaremos el kit de bienvenida")
 
 # ---------- Layout Principal ----------
 st.set_page_config(
@@ -1,6 +1,8 @@
+import sqlite3
 import streamlit as st
-from utils.database import get_connection, init_leads_table
-import base64
+from services.landing_leads import SOURCE_BCS_LANDING, capture_lead
+from utils.assets import background_css, image_source
+from utils.write_queue import AckTimeout, QueueFull
 
 # Configuración de la página
 st.set_page_config(
@@ -8,60 +10,17 @@ st.set_page_config(
     layout="wide"
 )
 
-# Function to encode image as base64 to set as background
-def get_base64_of_bin_file(bin_file):
-    try:
-        with open(bin_file, 'rb') as f:
-            data = f.read()
-        return base64.b64encode(data).decode()
-    except Exception as e:
-        st.error(f"Error al leer el archivo '{bin_file}': {e}")
-        return None
-
-# Encode the background image
-img_base64 = get_base64_of_bin_file('assets/background.jpg')
-
-if img_base64:
-    # Set the background image using the encoded base64 string
-    st.markdown(
-        f"""
-        <style>
-        .stApp {{
-            background: url('data:image/jpeg;base64,{img_base64}') no-repeat center center fixed;
-            background-size: cover;
-        }}
-        </style>
-        """,
-        unsafe_allow_html=True
-    )
-
-# Inicializa la tabla de leads
-init_leads_table()
-
-
-# Background image (base64) if background.jpg exists in the same folder
-import os
-import base64
-
-bg_path = os.path.join(os.path.dirname(__file__), "background.jpg")
-if os.path.exists(bg_path):
-        with open(bg_path, "rb") as f:
-                data = f.read()
-        b64 = base64.b64encode(data).decode()
-        st.markdown(f"""
-        <style>
-        .stApp {{
-            background-image: url('data:image/jpg;base64,{b64}');
-            background-size: cover;
-            background-position: center;
-        }}
-        </style>
-        """, unsafe_allow_html=True)
+# Fondo: codificado una vez por proceso (utils/assets.py), no en cada rerun
+background = background_css('assets/background.jpg')
+if background:
+    st.markdown(background, unsafe_allow_html=True)
+else:
+    st.error("Error al leer el archivo 'assets/background.jpg'")
 
 # Título principal
 col1,col2 = st.columns([1,6])
 with col1:
-    st.image("assets/BCS_logo.png", width=100)
+    st.image(image_source("assets/BCS_logo.png", 100), width=100)
 with col2:
     st.header(":red[BCS] - Business Core Software")
 st.write("Tu núcleo digital empresarial con asistentes inteligentes IA")
@@ -123,15 +82,18 @@ with st.expander(":red-badge[Formulario de contacto]"):
         if not nombre or not email:
             st.error("Por favor, completa al menos el nombre y el correo electrónico.")
         else:
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO leads (nombre, empresa, email, sector, mensaje) 
-                VALUES (?, ?, ?, ?, ?)
-            """, (nombre, empresa, email, sector, mensaje))
-            conn.commit()
-            conn.close()
-            st.success("¡Gracias! Nos pondremos en contacto contigo pronto.")
+            try:
+                capture_lead(SOURCE_BCS_LANDING, nombre, email, company=empresa, sector=sector, message=mensaje)
+            except QueueFull:
+                st.error("Estamos recibiendo muchas solicitudes. Inténtalo de nuevo en unos segundos.")
+            except AckTimeout:
+                st.warning("El envío está tardando más de lo normal y es posible que ya lo hayamos recibido. Espera unos minutos antes de volver a enviarlo para no duplicarlo.")
+            except sqlite3.Error:
+                st.error("No hemos podido guardar tu solicitud. Revisa los datos e inténtalo de nuevo.")
+            except Exception:
+                st.error("Ha ocurrido un error al guardar tu solicitud. Inténtalo de nuevo más tarde.")
+            else:
+                st.success("¡Gracias! Nos pondremos en contacto contigo pronto.")
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,90 @@
+"""
+Actividades del CRM (llamadas, emails, cambios registrados por el sistema).
+"""
+from services.base import Repository, as_date, now, today
+from utils.pagination import KeysetQuery
+
+DB_PATH = 'crm_partner_bcs.db'
+
+ACTIVITY_TYPES = ["call", "email", "demo", "meeting", "follow_up", "proposal", "other"]
+
+
+def insert_activity(conn, partner_id, lead_id, opportunity_id, activity_type, description,
+                    activity_date=None, follow_up_date=None):
+    """INSERT en activities dentro de la transacción del llamador; devuelve el id"""
+    cursor = conn.execute("""
+        INSERT INTO activities (
+            lead_id, opportunity_id, partner_id, activity_type, description,
+            activity_date, follow_up_date, created_date
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        lead_id, opportunity_id, partner_id, activity_type, description,
+        as_date(activity_date) or today(), as_date(follow_up_date), now(),
+    ))
+    return cursor.lastrowid
+
+
+class ActivityRepository(Repository):
+    db_path = DB_PATH
+
+    def page_query(self, partner_id, activity_type=None, completed=None, since=None):
+        """KeysetQuery de show_activities_list; completed es True, False o None (todas)"""
+        where = "a.partner_id = ?"
+        params = [partner_id]
+
+        if activity_type is not None:
+            where += " AND a.activity_type = ?"
+            params.append(activity_type)
+
+        if completed is not None:
+            where += " AND a.completed = ?"
+            params.append(1 if completed else 0)
+
+        if since is not None:
+            where += " AND a.activity_date >= ?"
+            params.append(as_date(since))
+
+        return KeysetQuery(
+            columns="a.*, l.company_name, o.opportunity_name",
+            table="activities a",
+            joins="""LEFT JOIN leads l ON a.lead_id = l.id
+            LEFT JOIN opportunities o ON a.opportunity_id = o.id""",
+            where=where,
+            params=params,
+            sort_column="a.activity_date",
+            id_column="a.id",
+        )
+
+    def recent(self, partner_id, limit=5):
+        return self.read("""
+            SELECT a.*, l.company_name, o.opportunity_name
+            FROM activities a
+            LEFT JOIN leads l ON a.lead_id = l.id
+            LEFT JOIN opportunities o ON a.opportunity_id = o.id
+            WHERE a.partner_id = ?
+            ORDER BY a.created_date DESC
+            LIMIT ?
+        """, [partner_id, limit])
+
+    def recent_system(self, limit=10):
+        """Actividad reciente de todos los partners (panel de administración)"""
+        return self.read("""
+            SELECT a.*, p.name as partner_name, l.company_name
+            FROM activities a
+            LEFT JOIN partners p ON a.partner_id = p.id
+            LEFT JOIN leads l ON a.lead_id = l.id
+            ORDER BY a.created_date DESC
+            LIMIT ?
+        """, [limit])
+
+    def log(self, partner_id, lead_id, opportunity_id, activity_type, description,
+            activity_date=None, follow_up_date=None):
+        with self.transaction() as conn:
+            return insert_activity(conn, partner_id, lead_id, opportunity_id, activity_type,
+                                   description, activity_date, follow_up_date)
+
+    def set_completed(self, activity_id, completed):
+        with self.transaction() as conn:
+            return conn.execute(
+                "UPDATE activities SET completed = ? WHERE id = ?", (completed, activity_id)
+            ).rowcount
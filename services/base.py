@@ -0,0 +1,78 @@
+"""
+Base de los repositorios de datos.
+
+Cada repositorio agrupa el SQL de una entidad fuera de las páginas de
+Streamlit: las páginas llaman a sus métodos y sólo pintan el resultado,
+y los mismos métodos se pueden medir, cachear o reutilizar sin interfaz.
+
+Convenciones de los resultados:
+- listas y series para gráficos: DataFrame (vía cached_read_sql), que es
+  lo que consumen st.dataframe y plotly;
+- una fila o un conjunto de KPIs: namedtuple con campos fijos, o None si
+  la fila no existe;
+- escrituras: el id creado o el número de filas afectadas. Cada método
+  de escritura es una transacción; los errores de SQLite se propagan.
+"""
+from contextlib import contextmanager
+from datetime import date
+
+from utils.connection_pool import get_connection
+from utils.dates import to_db_date, to_db_timestamp, utc_now
+from utils.query_cache import cached_read_sql
+
+
+def today():
+    """Fecha actual en UTC, la misma que date('now') en SQLite"""
+    return to_db_date(utc_now())
+
+
+def now():
+    """Instante actual en UTC, el mismo formato que CURRENT_TIMESTAMP"""
+    return to_db_timestamp(utc_now())
+
+
+def as_date(value):
+    """date/datetime -> 'YYYY-MM-DD' (el formato de las columnas DATE); None y str se dejan igual"""
+    if isinstance(value, date):
+        return to_db_date(value)
+    return value
+
+
+class Repository:
+    """Acceso a una base SQLite a través del pool de conexiones"""
+
+    db_path = None
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or self.db_path
+
+    @contextmanager
+    def connection(self):
+        conn = get_connection(self.db_path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """Conexión con commit al salir sin error y rollback si hay excepción"""
+        with self.connection() as conn:
+            with conn:
+                yield conn
+
+    def read(self, sql, params=None):
+        """Lectura cacheada como DataFrame"""
+        with self.connection() as conn:
+            return cached_read_sql(sql, conn, params=params)
+
+    def fetch_record(self, record_type, sql, params=()):
+        """Primera fila como record_type (namedtuple con las columnas del SELECT) o None"""
+        with self.connection() as conn:
+            row = conn.execute(sql, params).fetchone()
+        return record_type(*row) if row is not None else None
+
+    def fetch_stats(self, record_type, query, params=None):
+        """Ejecuta un StatsQuery y devuelve sus KPIs como record_type"""
+        with self.connection() as conn:
+            return record_type(**query.fetch(conn, params))
@@ -0,0 +1,69 @@
+"""
+Comisiones de los partners: métricas recurrentes, evolución e historial.
+"""
+from collections import namedtuple
+
+from services.base import Repository
+from utils.pagination import KeysetQuery
+from utils.stats import StatsQuery
+
+DB_PATH = 'crm_partner_bcs.db'
+
+CommissionStats = namedtuple('CommissionStats', [
+    'monthly_recurring', 'this_year_monthly', 'active_clients',
+])
+
+# MRR, comisiones activas iniciadas este año y clientes activos en una sola pasada
+COMMISSION_STATS = StatsQuery("""
+    SELECT
+        COALESCE(SUM(commission_amount), 0) as monthly_recurring,
+        COALESCE(SUM(CASE WHEN start_date >= strftime('%Y-01-01', 'now')
+                          AND start_date < strftime('%Y-01-01', 'now', '+1 year')
+                          THEN commission_amount END), 0) as this_year_monthly,
+        COUNT(DISTINCT client_name) as active_clients
+    FROM commissions
+    WHERE partner_id = :partner_id AND status = 'active'
+""")
+
+
+class CommissionRepository(Repository):
+    db_path = DB_PATH
+
+    def stats(self, partner_id):
+        return self.fetch_stats(CommissionStats, COMMISSION_STATS, {'partner_id': partner_id})
+
+    def monthly_trend(self, partner_id):
+        """Comisiones por mes de inicio en los últimos 12 meses (serie de utils/time_series.py)"""
+        return self.read("""
+            SELECT month, total_commission
+            FROM commission_monthly_totals
+            WHERE partner_id = ?
+            AND month >= strftime('%Y-%m', 'now', '-12 months')
+            ORDER BY month
+        """, [partner_id])
+
+    def top_clients(self, partner_id, limit=10):
+        return self.read("""
+            SELECT
+                client_name,
+                commission_amount,
+                start_date,
+                status
+            FROM commissions
+            WHERE partner_id = ?
+            ORDER BY commission_amount DESC
+            LIMIT ?
+        """, [partner_id, limit])
+
+    def page_query(self, partner_id):
+        """KeysetQuery del historial (start_date puede ser NULL)"""
+        return KeysetQuery(
+            columns="c.*, o.opportunity_name",
+            table="commissions c",
+            joins="LEFT JOIN opportunities o ON c.opportunity_id = o.id",
+            where="c.partner_id = ?",
+            params=[partner_id],
+            sort_column="c.start_date",
+            id_column="c.id",
+            nullable=True,
+        )
@@ -0,0 +1,264 @@
+"""
+Contactos de los partners y sus actividades (bcs_system.db).
+
+Un contacto se valida con una actividad 'Validación de Cliente' completada
+y después se puede convertir en usuario cliente. convert_to_users convierte
+varios a la vez: calcula los hash de las contraseñas en paralelo (el KDF
+es lo que cuesta) y crea los usuarios con un INSERT estático y marca los
+contactos en una sola transacción. Las columnas de users se comprueban
+contra utils/schema.py, una vez por proceso.
+"""
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from services.base import Repository, as_date, now
+from utils.passwords import hash_password
+from utils.schema import columns, require_columns
+
+DB_PATH = 'bcs_system.db'
+
+CONTACT_INDUSTRIES = ["Hospitalaria", "Pesquera", "Industrial", "Comercial", "Tecnología", "Educación", "Otro"]
+VALIDATION_ACTIVITY = "Validación de Cliente"
+
+# Usuario creado a partir de un contacto, sin credenciales
+ConvertedUser = namedtuple('ConvertedUser', ['id', 'username', 'email', 'role', 'status'])
+
+# Resultado de convertir un contacto: user_id es None si no se convirtió (message dice por qué)
+ConversionResult = namedtuple('ConversionResult', ['contact_id', 'username', 'email', 'user_id', 'message'])
+
+CLIENT_ROLE = 'cliente'
+# Columnas de users que crean las migraciones de bcs_system.db (utils/schema.py lo comprueba)
+USER_INSERT_COLUMNS = (
+    'username', 'password_hash', 'email', 'role_id', 'role', 'status', 'is_active', 'created_by_partner_id',
+)
+INSERT_USER_SQL = (
+    f"INSERT INTO users ({', '.join(USER_INSERT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(USER_INSERT_COLUMNS))})"
+)
+# Nunca se muestran en el detalle de un usuario
+PASSWORD_COLUMNS = ('password', 'password_hash')
+# PBKDF2 y scrypt liberan el GIL: un hilo por núcleo
+HASH_WORKERS = os.cpu_count() or 1
+
+
+def _conversion_errors(conn, partner_id, requests):
+    """
+    {contact_id: motivo} de las conversiones que no se pueden hacer, con una
+    consulta por tabla para todo el lote. requests: [(contact_id, username)].
+    """
+    ids = json.dumps([contact_id for contact_id, _ in requests])
+    contacts = {row[0]: row[1:] for row in conn.execute('''
+        SELECT id, email, validated, converted_to_user FROM contacts
+        WHERE id IN (SELECT value FROM json_each(?)) AND partner_id = ?
+    ''', (ids, partner_id))}
+    usernames = json.dumps([username for _, username in requests])
+    emails = json.dumps([row[0] for row in contacts.values() if row[0]])
+    taken_usernames = {row[0] for row in conn.execute(
+        "SELECT username FROM users WHERE username IN (SELECT value FROM json_each(?))", (usernames,)
+    )}
+    taken_emails = {row[0] for row in conn.execute(
+        "SELECT email FROM users WHERE email IN (SELECT value FROM json_each(?))", (emails,)
+    )}
+
+    errors, seen_usernames, seen_emails = {}, set(), set()
+    for contact_id, username in requests:
+        if contact_id not in contacts:
+            errors[contact_id] = "Contacto no encontrado"
+            continue
+        email, validated, converted = contacts[contact_id]
+        if converted == 1:
+            errors[contact_id] = "Este contacto ya fue convertido a usuario"
+        elif validated != 1:
+            errors[contact_id] = "El contacto debe estar validado antes de convertirlo a usuario"
+        elif username in taken_usernames or username in seen_usernames:
+            errors[contact_id] = f"El username '{username}' ya está en uso"
+        elif email and (email in taken_emails or email in seen_emails):
+            errors[contact_id] = f"El email '{email}' ya está registrado en otro usuario"
+        else:
+            seen_usernames.add(username)
+            if email:
+                seen_emails.add(email)
+    return errors
+
+
+def _insert_users(conn, partner_id, rows):
+    """
+    Crea los usuarios con executemany y marca sus contactos como convertidos.
+    rows: [((contact_id, username, password), password_hash)].
+    Devuelve ({contact_id: user_id}, {contact_id: email}).
+    """
+    ids = json.dumps([contact_id for (contact_id, _, _), _ in rows])
+    emails = dict(conn.execute(
+        "SELECT id, email FROM contacts WHERE id IN (SELECT value FROM json_each(?))", (ids,)
+    ).fetchall())
+    role = conn.execute("SELECT id FROM roles WHERE name = ?", (CLIENT_ROLE,)).fetchone()
+
+    conn.executemany(INSERT_USER_SQL, [
+        (username, password_hash, emails.get(contact_id), role[0] if role else None,
+         CLIENT_ROLE, 'active', 1, partner_id)
+        for (contact_id, username, _), password_hash in rows
+    ])
+
+    # executemany no devuelve los id: se leen por username (único)
+    by_username = {username: contact_id for (contact_id, username, _), _ in rows}
+    created = {by_username[username]: user_id for user_id, username in conn.execute(
+        "SELECT id, username FROM users WHERE username IN (SELECT value FROM json_each(?))",
+        (json.dumps(list(by_username)),),
+    )}
+    conversion_date = now()
+    conn.executemany('''
+        UPDATE contacts
+        SET converted_to_user = 1, converted_user_id = ?, conversion_date = ?
+        WHERE id = ?
+    ''', [(user_id, conversion_date, contact_id) for contact_id, user_id in created.items()])
+    return created, emails
+
+
+class ContactRepository(Repository):
+    db_path = DB_PATH
+
+    def list_for_partner(self, partner_id):
+        """Todos los contactos del partner, validados primero"""
+        return self.read('''
+            SELECT * FROM contacts
+            WHERE partner_id = ?
+            ORDER BY validated DESC, created_at DESC
+        ''', (partner_id,))
+
+    def active_options(self, partner_id):
+        """Contactos activos para los selectores de formularios"""
+        return self.read('''
+            SELECT id, name, company, validated FROM contacts
+            WHERE partner_id = ? AND status = 'active'
+        ''', (partner_id,))
+
+    def create(self, partner_id, name, company, email, phone, position, industry, notes):
+        with self.transaction() as conn:
+            return conn.execute('''
+                INSERT INTO contacts (partner_id, name, company, email, phone, position, industry, notes)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (partner_id, name, company, email, phone, position, industry, notes)).lastrowid
+
+    def delete(self, contact_id):
+        with self.transaction() as conn:
+            return conn.execute('DELETE FROM contacts WHERE id = ?', (contact_id,)).rowcount
+
+    def set_status(self, contact_id, status):
+        with self.transaction() as conn:
+            return conn.execute('UPDATE contacts SET status = ? WHERE id = ?', (status, contact_id)).rowcount
+
+    def convert_to_users(self, partner_id, requests, workers=HASH_WORKERS):
+        """
+        Crea un usuario cliente por cada (contact_id, username, password) de
+        requests y marca los contactos como convertidos. Devuelve un
+        ConversionResult por petición, en el mismo orden: los que fallan no
+        impiden convertir el resto.
+        """
+        unique = {}
+        for contact_id, username, password in requests:
+            unique.setdefault(int(contact_id), (int(contact_id), (username or '').strip(), password))
+        requests = list(unique.values())
+        messages = {contact_id: "Usuario y contraseña son obligatorios"
+                    for contact_id, username, password in requests if not (username and password)}
+        pending = [request for request in requests if request[0] not in messages]
+
+        if pending:
+            with self.connection() as conn:
+                messages.update(_conversion_errors(conn, partner_id, [request[:2] for request in pending]))
+            pending = [request for request in pending if request[0] not in messages]
+
+        created, emails = {}, {}
+        if pending:
+            require_columns(self.db_path, 'users', USER_INSERT_COLUMNS)
+            # El KDF fuera de la transacción: no retiene el lock de escritura
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pending)))) as pool:
+                hashes = list(pool.map(hash_password, [password for _, _, password in pending]))
+
+            with self.transaction() as conn:
+                # Escribir primero toma el lock; luego se revalida por si otra sesión
+                # convirtió el contacto u ocupó el username mientras se calculaban los hash
+                conn.execute("UPDATE contacts SET converted_to_user = converted_to_user WHERE 0")
+                messages.update(_conversion_errors(conn, partner_id, [request[:2] for request in pending]))
+                rows = [(request, password_hash) for request, password_hash in zip(pending, hashes)
+                        if request[0] not in messages]
+                if rows:
+                    created, emails = _insert_users(conn, partner_id, rows)
+
+        return [
+            ConversionResult(contact_id, username, emails.get(contact_id), created.get(contact_id),
+                             messages.get(contact_id, "Usuario creado"))
+            for contact_id, username, _ in requests
+        ]
+
+    def converted_user(self, user_id):
+        return self.fetch_record(
+            ConvertedUser, 'SELECT id, username, email, role, status FROM users WHERE id = ?', (user_id,)
+        )
+
+    def user_details(self, user_id):
+        """Todas las columnas del usuario menos las de contraseña, como dict (o None)"""
+        visible = [column for column in columns(self.db_path, 'users') if column not in PASSWORD_COLUMNS]
+        with self.connection() as conn:
+            row = conn.execute(f"SELECT {', '.join(visible)} FROM users WHERE id = ?", (user_id,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(visible, row))
+
+
+class PartnerActivityRepository(Repository):
+    db_path = DB_PATH
+
+    def recent(self, partner_id, limit=5):
+        return self.read('''
+            SELECT pa.*, c.name as contact_name
+            FROM partner_activities pa
+            LEFT JOIN contacts c ON pa.contact_id = c.id
+            WHERE pa.partner_id = ?
+            ORDER BY pa.activity_date DESC
+            LIMIT ?
+        ''', (partner_id, limit))
+
+    def list_for_partner(self, partner_id):
+        return self.read('''
+            SELECT pa.*, c.name as contact_name, c.company as contact_company, c.validated
+            FROM partner_activities pa
+            LEFT JOIN contacts c ON pa.contact_id = c.id
+            WHERE pa.partner_id = ?
+            ORDER BY pa.activity_date DESC
+        ''', (partner_id,))
+
+    def log(self, partner_id, contact_id, activity_type, subject, description,
+            activity_date, follow_up_date, completed, validates_contact=False):
+        """
+        Registra la actividad. Si validates_contact y está completada, marca el
+        contacto como validado en la misma transacción. Devuelve True si validó.
+        """
+        validated = bool(validates_contact and contact_id and completed)
+        with self.transaction() as conn:
+            conn.execute('''
+                INSERT INTO partner_activities
+                (partner_id, contact_id, activity_type, subject, description,
+                 activity_date, follow_up_date, completed)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (partner_id, contact_id, activity_type, subject, description,
+                  as_date(activity_date), as_date(follow_up_date), 1 if completed else 0))
+
+            if validated:
+                conn.execute('''
+                    UPDATE contacts
+                    SET validated = 1, validation_date = ?
+                    WHERE id = ?
+                ''', (now(), contact_id))
+        return validated
+
+    def delete(self, activity_id):
+        with self.transaction() as conn:
+            return conn.execute('DELETE FROM partner_activities WHERE id = ?', (activity_id,)).rowcount
+
+    def set_completed(self, activity_id, completed):
+        with self.transaction() as conn:
+            return conn.execute(
+                'UPDATE partner_activities SET completed = ? WHERE id = ?', (1 if completed else 0, activity_id)
+            ).rowcount
@@ -0,0 +1,239 @@
+"""
+Exportación de leads, oportunidades y comisiones a CSV o Parquet.
+
+Las filas se leen del cursor con fetchmany(chunk_size) y cada bloque se
+escribe en cuanto llega, así que la memoria no depende del número de
+filas: sirve igual para un partner que para el volcado completo del
+administrador. Nada pasa por pandas.
+
+Filtros: partner_id (None = todos) y rango de fechas inclusivo sobre la
+columna de fecha de cada tabla (created_date o start_date).
+
+Parquet necesita pyarrow, que sólo se importa al exportar en ese formato.
+
+Uso:
+    python -m services.exports leads --out leads.csv
+    python -m services.exports commissions --format parquet --out comisiones.parquet \\
+        --partner 3 --from 2025-01-01 --to 2025-12-31 --db crm_partner_bcs.db
+"""
+import argparse
+import csv
+import io
+import os
+from collections import namedtuple
+
+from services.base import Repository, as_date
+
+DB_PATH = 'crm_partner_bcs.db'
+
+CHUNK_SIZE = int(os.environ.get("BCS_EXPORT_CHUNK", 5000))
+FORMATS = ('csv', 'parquet')
+
+# columns: (expresión SQL, nombre en el fichero, tipo) con tipo int/float/text
+ExportSpec = namedtuple('ExportSpec', ['table', 'joins', 'columns', 'date_column'])
+
+EXPORTS = {
+    'leads': ExportSpec(
+        table="leads l",
+        joins="LEFT JOIN partners p ON l.partner_id = p.id",
+        columns=[
+            ("l.id", "id", 'int'),
+            ("l.partner_id", "partner_id", 'int'),
+            ("p.name", "partner_name", 'text'),
+            ("l.company_name", "company_name", 'text'),
+            ("l.contact_name", "contact_name", 'text'),
+            ("l.contact_email", "contact_email", 'text'),
+            ("l.contact_phone", "contact_phone", 'text'),
+            ("l.industry", "industry", 'text'),
+            ("l.company_size", "company_size", 'int'),
+            ("l.pain_points", "pain_points", 'text'),
+            ("l.lead_source", "lead_source", 'text'),
+            ("l.status", "status", 'text'),
+            ("l.created_date", "created_date", 'text'),
+            ("l.last_contact", "last_contact", 'text'),
+            ("l.notes", "notes", 'text'),
+        ],
+        date_column="l.created_date",
+    ),
+    'opportunities': ExportSpec(
+        table="opportunities o",
+        joins="LEFT JOIN partners p ON o.partner_id = p.id LEFT JOIN leads l ON o.lead_id = l.id",
+        columns=[
+            ("o.id", "id", 'int'),
+            ("o.partner_id", "partner_id", 'int'),
+            ("p.name", "partner_name", 'text'),
+            ("o.lead_id", "lead_id", 'int'),
+            ("l.company_name", "company_name", 'text'),
+            ("o.opportunity_name", "opportunity_name", 'text'),
+            ("o.bcs_solution", "bcs_solution", 'text'),
+            ("o.estimated_users", "estimated_users", 'int'),
+            ("o.price_per_user", "price_per_user", 'float'),
+            ("o.total_value", "total_value", 'float'),
+            ("o.probability", "probability", 'int'),
+            ("o.stage", "stage", 'text'),
+            ("o.status", "status", 'text'),
+            ("o.expected_close_date", "expected_close_date", 'text'),
+            ("o.actual_close_date", "actual_close_date", 'text'),
+            ("o.created_date", "created_date", 'text'),
+            ("o.notes", "notes", 'text'),
+        ],
+        date_column="o.created_date",
+    ),
+    'commissions': ExportSpec(
+        table="commissions c",
+        joins="LEFT JOIN partners p ON c.partner_id = p.id LEFT JOIN opportunities o ON c.opportunity_id = o.id",
+        columns=[
+            ("c.id", "id", 'int'),
+            ("c.partner_id", "partner_id", 'int'),
+            ("p.name", "partner_name", 'text'),
+            ("c.opportunity_id", "opportunity_id", 'int'),
+            ("o.opportunity_name", "opportunity_name", 'text'),
+            ("c.client_name", "client_name", 'text'),
+            ("c.monthly_value", "monthly_value", 'float'),
+            ("c.commission_rate", "commission_rate", 'float'),
+            ("c.commission_amount", "commission_amount", 'float'),
+            ("c.start_date", "start_date", 'text'),
+            ("c.status", "status", 'text'),
+            ("c.payment_date", "payment_date", 'text'),
+            ("c.notes", "notes", 'text'),
+        ],
+        date_column="c.start_date",
+    ),
+}
+
+
+def export_sql(dataset, partner_id=None, date_from=None, date_to=None):
+    """SELECT del dataset con sus filtros; devuelve (sql, params)"""
+    spec = EXPORTS[dataset]
+    alias = spec.table.split()[-1]
+    conditions, params = [], []
+    if partner_id is not None:
+        conditions.append(f"{alias}.partner_id = ?")
+        params.append(int(partner_id))
+    if date_from:
+        conditions.append(f"{spec.date_column} >= ?")
+        params.append(as_date(date_from))
+    if date_to:
+        # Inclusivo también para valores con hora ('2025-03-31 18:00:00')
+        conditions.append(f"{spec.date_column} < date(?, '+1 day')")
+        params.append(as_date(date_to))
+
+    columns = ", ".join(f"{expr} AS {name}" for expr, name, _ in spec.columns)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = f"SELECT {columns} FROM {spec.table} {spec.joins} {where} ORDER BY {alias}.id"
+    return sql, params
+
+
+class ExportRepository(Repository):
+    db_path = DB_PATH
+
+    def iter_chunks(self, dataset, partner_id=None, date_from=None, date_to=None, chunk_size=CHUNK_SIZE):
+        """Bloques de hasta chunk_size tuplas en el orden de EXPORTS[dataset].columns"""
+        sql, params = export_sql(dataset, partner_id, date_from, date_to)
+        with self.connection() as conn:
+            cursor = conn.execute(sql, params)
+            try:
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                cursor.close()
+
+    def iter_csv(self, dataset, partner_id=None, date_from=None, date_to=None, chunk_size=CHUNK_SIZE):
+        """CSV en UTF-8 como bytes, primero la cabecera y luego un bloque por chunk"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def drain():
+            data = buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            return data
+
+        writer.writerow([name for _, name, _ in EXPORTS[dataset].columns])
+        yield drain()
+        for rows in self.iter_chunks(dataset, partner_id, date_from, date_to, chunk_size):
+            writer.writerows(rows)
+            yield drain()
+
+    def write(self, dataset, fileobj, fmt='csv', partner_id=None, date_from=None, date_to=None,
+              chunk_size=CHUNK_SIZE):
+        """Escribe el export en un fichero binario abierto (o ruta, para parquet); devuelve las filas"""
+        if fmt == 'parquet':
+            return self._write_parquet(dataset, fileobj, partner_id, date_from, date_to, chunk_size)
+        if fmt != 'csv':
+            raise ValueError(f"Formato no soportado: {fmt}")
+        text = io.TextIOWrapper(fileobj, encoding='utf-8', newline='', write_through=True)
+        writer = csv.writer(text)
+        writer.writerow([name for _, name, _ in EXPORTS[dataset].columns])
+        rows_written = 0
+        for rows in self.iter_chunks(dataset, partner_id, date_from, date_to, chunk_size):
+            writer.writerows(rows)
+            rows_written += len(rows)
+        text.flush()
+        text.detach()  # el fichero sigue siendo del llamador
+        return rows_written
+
+    def write_file(self, dataset, path, fmt='csv', partner_id=None, date_from=None, date_to=None,
+                   chunk_size=CHUNK_SIZE):
+        """Export directo a disco (volcados grandes); devuelve las filas escritas"""
+        try:
+            with open(path, 'wb') as f:
+                return self.write(dataset, f, fmt, partner_id, date_from, date_to, chunk_size)
+        except Exception:
+            # No dejar un fichero a medias que parezca un export válido
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+
+    def count(self, dataset, partner_id=None, date_from=None, date_to=None):
+        sql, params = export_sql(dataset, partner_id, date_from, date_to)
+        with self.connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM ({sql})", params).fetchone()[0]
+
+    def _write_parquet(self, dataset, fileobj, partner_id, date_from, date_to, chunk_size):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("La exportación a Parquet necesita pyarrow (pip install pyarrow)") from e
+
+        arrow_types = {'int': pa.int64(), 'float': pa.float64(), 'text': pa.string()}
+        spec = EXPORTS[dataset]
+        schema = pa.schema([(name, arrow_types[kind]) for _, name, kind in spec.columns])
+
+        rows_written = 0
+        # Un row group por bloque: pyarrow tampoco acumula el fichero en memoria
+        with pq.ParquetWriter(fileobj, schema) as writer:
+            for rows in self.iter_chunks(dataset, partner_id, date_from, date_to, chunk_size):
+                columns = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+                writer.write_batch(pa.RecordBatch.from_arrays(columns, schema=schema))
+                rows_written += len(rows)
+        return rows_written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta leads, oportunidades o comisiones del CRM")
+    parser.add_argument("dataset", choices=sorted(EXPORTS))
+    parser.add_argument("--out", required=True, help="fichero de salida")
+    parser.add_argument("--format", choices=FORMATS, default='csv')
+    parser.add_argument("--partner", type=int, help="sólo este partner (por defecto, todos)")
+    parser.add_argument("--from", dest="date_from", help="fecha inicial YYYY-MM-DD (inclusiva)")
+    parser.add_argument("--to", dest="date_to", help="fecha final YYYY-MM-DD (inclusiva)")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    try:
+        rows = ExportRepository(args.db).write_file(
+            args.dataset, args.out, args.format, args.partner, args.date_from, args.date_to, args.chunk_size
+        )
+    except RuntimeError as e:
+        parser.error(str(e))
+    print(f"{args.out}: {rows:,} filas ({args.dataset}, {args.format})")
+
+
+if __name__ == "__main__":
+    main()
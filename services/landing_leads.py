@@ -0,0 +1,247 @@
+"""
+Almacén único de los leads de los formularios públicos y su paso al CRM.
+
+Las tres landings (main.py, landing_pres.py, BCS_Black_box.landing.py)
+guardan con capture_lead en landing_leads.db: una tabla de sólo
+inserción (los triggers impiden UPDATE y DELETE) escrita a través de la
+cola de utils/write_queue.py.
+
+sync_to_crm pasa las filas nuevas a la tabla leads del CRM por marca de
+agua: landing_sync guarda el último id copiado y cada lote es
+"id > marca ORDER BY id LIMIT n" sobre la clave primaria, sin recorrer lo
+ya sincronizado. Los leads del lote y la marca nueva se confirman en la
+misma transacción del CRM, así que un lote se copia una sola vez aunque
+la sincronización se interrumpa. Como SQLite serializa las escrituras,
+los id se confirman en orden y ninguna fila queda por debajo de la marca
+sin haberse copiado.
+
+Los leads entran asignados al partner BCS_LANDING_PARTNER_EMAIL (por
+defecto el admin del CRM), con fuente "Website" y estado "new".
+
+Uso:
+    python -m services.landing_leads sync [--every 60]
+    python -m services.landing_leads status
+    python -m services.landing_leads import-legacy   # una vez: leads.db, partners.db y el CSV
+"""
+import argparse
+import csv
+import os
+import sqlite3
+import time
+from collections import namedtuple
+
+from services.activities import insert_activity
+from services.base import Repository, now
+from services.leads import DB_PATH, INDUSTRIES, insert_leads
+from utils.migrations import LANDING_DB_PATH, ensure_crm_schema, ensure_landing_schema
+from utils.write_queue import sqlite_write_queue
+
+SYNC_BATCH = 500
+LANDING_PARTNER_EMAIL = os.environ.get("BCS_LANDING_PARTNER_EMAIL", "admin@bcsblackbox.com")
+# Clave de landing_sync para este almacén
+STORE = 'landing_leads'
+
+# Formulario de main.py y registro de partners de BCS_Black_box.landing.py;
+# landing_pres.py usa su propio source ('landing', 'registro_partner')
+SOURCE_BCS_LANDING = 'bcs_landing'
+SOURCE_PARTNER_KIT = 'partner_kit'
+
+LANDING_COLUMNS = [
+    'id', 'source', 'name', 'email', 'phone', 'company',
+    'sector', 'country', 'message', 'created_at',
+]
+LandingLead = namedtuple('LandingLead', LANDING_COLUMNS)
+
+LandingSyncReport = namedtuple('LandingSyncReport', ['synced', 'batches', 'last_id'])
+LandingSyncStatus = namedtuple('LandingSyncStatus', ['last_id', 'synced_at', 'pending'])
+
+# Sectores de los formularios que en el CRM tienen otro nombre
+SECTOR_ALIASES = {'Restaurantes': 'Restauración'}
+
+INSERT_SQL = """
+    INSERT INTO landing_leads (source, name, email, phone, company, sector, country, message)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def capture_lead(source, name, email, phone=None, company=None, sector=None,
+                 country=None, message=None, db_path=LANDING_DB_PATH):
+    """
+    Guarda un lead de un formulario público; vuelve con el id cuando está en
+    disco. Lanza utils.write_queue.QueueFull si la cola está saturada,
+    AckTimeout si el commit no se confirma a tiempo (la fila puede haberse
+    guardado igualmente) y sqlite3.Error si no se pudo escribir.
+    """
+    ensure_landing_schema(db_path)
+    return sqlite_write_queue(db_path).write((
+        INSERT_SQL, (source, name, email, phone, company, sector, country, message),
+    ))
+
+
+class LandingLeadStore(Repository):
+    db_path = LANDING_DB_PATH
+
+    def after(self, last_id, limit):
+        """Hasta limit filas con id > last_id, en orden (rango sobre la clave primaria)"""
+        with self.connection() as conn:
+            rows = conn.execute(f"""
+                SELECT {', '.join(LANDING_COLUMNS)} FROM landing_leads
+                WHERE id > ? ORDER BY id LIMIT ?
+            """, (last_id, limit)).fetchall()
+        return [LandingLead(*row) for row in rows]
+
+    def count_after(self, last_id):
+        with self.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM landing_leads WHERE id > ?", (last_id,)).fetchone()[0]
+
+    def import_legacy(self, leads_db='leads.db', partners_db='partners.db',
+                      csv_path='partners_registrations.csv'):
+        """
+        Copia una vez los almacenes anteriores; legacy_ref (único) evita
+        duplicados si se repite. Devuelve {origen: filas nuevas}.
+        """
+        sources = {
+            leads_db: lambda: _legacy_table(leads_db, """
+                SELECT id, 'bcs_landing', nombre, email, NULL, empresa, sector, NULL, mensaje, NULL
+                FROM leads
+            """),
+            partners_db: lambda: _legacy_table(partners_db, """
+                SELECT id, COALESCE(source, 'landing'), nombre, email, telefono, NULL, sector, NULL, mensaje, fecha
+                FROM leads
+            """),
+            csv_path: lambda: _legacy_csv(csv_path),
+        }
+        result = {}
+        with self.transaction() as conn:
+            for path, read in sources.items():
+                if not os.path.exists(path):
+                    continue
+                rows = [(f"{os.path.basename(path)}:{ref}", *values) for ref, *values in read()]
+                result[path] = conn.executemany("""
+                    INSERT OR IGNORE INTO landing_leads (
+                        legacy_ref, source, name, email, phone, company,
+                        sector, country, message, created_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+                """, rows).rowcount
+        return result
+
+
+def _legacy_table(path, sql):
+    # Sólo lectura: no crear la base si no existe
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'leads'"
+        ).fetchone()
+        return conn.execute(sql).fetchall() if exists else []
+    finally:
+        conn.close()
+
+
+def _legacy_csv(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            created_at = (row.get('timestamp') or '').replace('T', ' ')[:19] or None
+            yield (line, SOURCE_PARTNER_KIT, row.get('name'), row.get('email'), row.get('phone'),
+                   row.get('company'), row.get('niche'), row.get('country'), row.get('notes'), created_at)
+
+
+def to_crm_lead(lead):
+    """Fila de landing_leads -> tupla de insert_leads"""
+    sector = SECTOR_ALIASES.get(lead.sector, lead.sector)
+    notes = f"Landing {lead.source} #{lead.id}"
+    if lead.country:
+        notes += f" · {lead.country}"
+    # pain_points es texto en el CRM (el detalle del lead lo recorta): sin mensaje, ''
+    pain_points = lead.message or ""
+    return (
+        lead.company or lead.name or lead.email, lead.name, lead.email, lead.phone,
+        sector if sector in INDUSTRIES else "Otros", None, pain_points,
+        "Website", "new", notes, lead.created_at[:10],
+    )
+
+
+def resolve_partner_id(conn, email=LANDING_PARTNER_EMAIL):
+    row = conn.execute("SELECT id FROM partners WHERE email = ?", (email,)).fetchone()
+    if row is None:
+        raise ValueError(f"No existe el partner {email} para asignar los leads de las landings")
+    return row[0]
+
+
+def sync_status(crm_path=DB_PATH, landing_path=LANDING_DB_PATH):
+    ensure_crm_schema(crm_path)
+    ensure_landing_schema(landing_path)
+    with Repository(crm_path).connection() as conn:
+        row = conn.execute("SELECT last_id, synced_at FROM landing_sync WHERE store = ?", (STORE,)).fetchone()
+    last_id, synced_at = row if row else (0, None)
+    return LandingSyncStatus(last_id, synced_at, LandingLeadStore(landing_path).count_after(last_id))
+
+
+def sync_to_crm(crm_path=DB_PATH, landing_path=LANDING_DB_PATH, batch_size=SYNC_BATCH,
+                partner_email=LANDING_PARTNER_EMAIL):
+    """Copia al CRM los leads de las landings posteriores a la marca de agua"""
+    ensure_crm_schema(crm_path)
+    ensure_landing_schema(landing_path)
+    store = LandingLeadStore(landing_path)
+    crm = Repository(crm_path)
+
+    synced = batches = 0
+    last_id = 0
+    while True:
+        with crm.transaction() as conn:
+            # La primera sentencia escribe: toma el lock del CRM antes de leer la
+            # marca, así dos sincronizaciones a la vez no copian el mismo lote
+            conn.execute("INSERT INTO landing_sync (store) VALUES (?) ON CONFLICT(store) DO NOTHING", (STORE,))
+            last_id = conn.execute("SELECT last_id FROM landing_sync WHERE store = ?", (STORE,)).fetchone()[0]
+            leads = store.after(last_id, batch_size)
+            if not leads:
+                break
+            partner_id = resolve_partner_id(conn, partner_email)
+            inserted = insert_leads(conn, partner_id, [to_crm_lead(lead) for lead in leads])
+            insert_activity(conn, partner_id, None, None, "leads_imported",
+                            f"{inserted} leads sincronizados desde las landings")
+            last_id = leads[-1].id
+            conn.execute("UPDATE landing_sync SET last_id = ?, synced_at = ? WHERE store = ?",
+                         (last_id, now(), STORE))
+        synced += inserted
+        batches += 1
+        if len(leads) < batch_size:
+            break
+    return LandingSyncReport(synced, batches, last_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Leads de las landings: sincronización con el CRM")
+    parser.add_argument("command", choices=["sync", "status", "import-legacy"])
+    parser.add_argument("--crm", default=DB_PATH)
+    parser.add_argument("--landing", default=LANDING_DB_PATH)
+    parser.add_argument("--batch-size", type=int, default=SYNC_BATCH)
+    parser.add_argument("--partner-email", default=LANDING_PARTNER_EMAIL)
+    parser.add_argument("--every", type=float, help="repetir la sincronización cada N segundos")
+    parser.add_argument("--leads-db", default='leads.db')
+    parser.add_argument("--partners-db", default='partners.db')
+    parser.add_argument("--csv", default='partners_registrations.csv')
+    args = parser.parse_args()
+
+    if args.command == "import-legacy":
+        ensure_landing_schema(args.landing)
+        result = LandingLeadStore(args.landing).import_legacy(args.leads_db, args.partners_db, args.csv)
+        for path, inserted in result.items():
+            print(f"{path}: {inserted:,} filas nuevas")
+        return
+
+    if args.command == "status":
+        status = sync_status(args.crm, args.landing)
+        print(f"Marca de agua: {status.last_id} ({status.synced_at or 'nunca'}); pendientes: {status.pending:,}")
+        return
+
+    while True:
+        report = sync_to_crm(args.crm, args.landing, args.batch_size, args.partner_email)
+        print(f"{report.synced:,} leads sincronizados en {report.batches} lotes; marca de agua {report.last_id}")
+        if not args.every:
+            break
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    main()
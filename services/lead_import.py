@@ -0,0 +1,292 @@
+"""
+Importación masiva de leads desde CSV.
+
+El fichero se lee por bloques de chunk_size filas. Cada fila se valida y
+normaliza con las mismas reglas que show_add_lead (campos obligatorios,
+INDUSTRIES, LEAD_SOURCES, INITIAL_LEAD_STATUSES); las que ya existen para
+el partner (mismo contact_email) o se repiten dentro del fichero se
+descartan. Las válidas de cada bloque se insertan con un executemany en
+una transacción, así que una hoja de 10k filas son ~10 commits.
+
+El resultado es un ImportReport con un RowError por fila descartada,
+que errors_csv convierte en un CSV descargable.
+
+Uso:
+    python -m services.lead_import leads.csv --partner 3 [--dry-run] [--db crm_partner_bcs.db]
+"""
+import argparse
+import codecs
+import csv
+import io
+import re
+import sqlite3
+import unicodedata
+from collections import namedtuple
+
+from services.leads import DB_PATH, INDUSTRIES, INITIAL_LEAD_STATUSES, LEAD_SOURCES, LeadRepository
+
+CHUNK_SIZE = 1000
+
+# Columnas de la tabla que acepta el CSV, en el orden de LeadRepository.bulk_create
+IMPORT_COLUMNS = [
+    'company_name', 'contact_name', 'contact_email', 'contact_phone', 'industry',
+    'company_size', 'pain_points', 'lead_source', 'status', 'notes',
+]
+
+# Cabeceras habituales en las hojas de los partners -> columna
+HEADER_ALIASES = {
+    'empresa': 'company_name', 'company': 'company_name', 'nombre de la empresa': 'company_name',
+    'contacto': 'contact_name', 'nombre': 'contact_name', 'nombre del contacto': 'contact_name',
+    'email': 'contact_email', 'correo': 'contact_email', 'e-mail': 'contact_email',
+    'telefono': 'contact_phone', 'phone': 'contact_phone',
+    'industria': 'industry', 'sector': 'industry',
+    'empleados': 'company_size', 'numero de empleados': 'company_size', 'size': 'company_size',
+    'problemas': 'pain_points',
+    'fuente': 'lead_source', 'source': 'lead_source', 'origen': 'lead_source',
+    'estado': 'status',
+    'notas': 'notes',
+}
+
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+# E.164: hasta 15 dígitos; menos de 7 no es un teléfono
+PHONE_DIGITS = (7, 15)
+# Mismo rango que el number_input de show_add_lead
+COMPANY_SIZE_RANGE = (1, 10000)
+
+RowError = namedtuple('RowError', ['line', 'field', 'value', 'message'])
+ImportReport = namedtuple('ImportReport', ['total_rows', 'inserted', 'duplicates', 'errors'])
+
+
+class RowInvalid(ValueError):
+    def __init__(self, field, value, message):
+        super().__init__(message)
+        self.field = field
+        self.value = value
+
+
+def _key(text):
+    """Minúsculas sin tildes ni espacios sobrantes, para comparar cabeceras y enums"""
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode()
+    return " ".join(text.lower().replace('_', ' ').split())
+
+
+def _choices(values):
+    return {_key(value): value for value in values}
+
+
+_INDUSTRIES = _choices(INDUSTRIES)
+_SOURCES = _choices(LEAD_SOURCES)
+_STATUSES = _choices(INITIAL_LEAD_STATUSES)
+_COLUMNS = {_key(column): column for column in IMPORT_COLUMNS}
+_COLUMNS.update({_key(alias): column for alias, column in HEADER_ALIASES.items()})
+
+
+def _choice(field, value, choices, default):
+    if not value:
+        return default
+    try:
+        return choices[_key(value)]
+    except KeyError:
+        raise RowInvalid(field, value, f"Valor no válido; opciones: {', '.join(choices.values())}")
+
+
+def normalize_email(value):
+    email = value.strip().lower()
+    if email and not EMAIL_RE.match(email):
+        raise RowInvalid('contact_email', value, "Email no válido")
+    return email or None
+
+
+def normalize_phone(value):
+    """'+56 9 1234-5678' -> '+56912345678'; conserva el + inicial si lo hay"""
+    value = value.strip()
+    if not value:
+        return None
+    digits = re.sub(r"\D", "", value)
+    if not PHONE_DIGITS[0] <= len(digits) <= PHONE_DIGITS[1]:
+        raise RowInvalid('contact_phone', value, f"El teléfono debe tener entre {PHONE_DIGITS[0]} y {PHONE_DIGITS[1]} dígitos")
+    return ("+" if value.startswith(("+", "00")) else "") + (digits[2:] if value.startswith("00") else digits)
+
+
+def normalize_company_size(value):
+    value = value.strip().replace(".", "").replace(",", "")
+    if not value:
+        return None
+    try:
+        size = int(value)
+    except ValueError:
+        raise RowInvalid('company_size', value, "El número de empleados debe ser un entero")
+    if not COMPANY_SIZE_RANGE[0] <= size <= COMPANY_SIZE_RANGE[1]:
+        raise RowInvalid('company_size', value, f"El número de empleados debe estar entre {COMPANY_SIZE_RANGE[0]} y {COMPANY_SIZE_RANGE[1]}")
+    return size
+
+
+def validate_row(record):
+    """dict columna -> texto del CSV; devuelve la tupla de IMPORT_COLUMNS o lanza RowInvalid"""
+    def text(column):
+        return (record.get(column) or "").strip()
+
+    company_name = text('company_name')
+    if not company_name:
+        raise RowInvalid('company_name', "", "Falta el nombre de la empresa")
+    contact_name = text('contact_name')
+    if not contact_name:
+        raise RowInvalid('contact_name', "", "Falta el nombre del contacto")
+
+    return (
+        company_name,
+        contact_name,
+        normalize_email(text('contact_email')),
+        normalize_phone(text('contact_phone')),
+        _choice('industry', text('industry'), _INDUSTRIES, "Otros"),
+        normalize_company_size(text('company_size')),
+        text('pain_points'),    # '' como el formulario de alta: las páginas lo tratan como texto
+        _choice('lead_source', text('lead_source'), _SOURCES, "Otros"),
+        _choice('status', text('status'), _STATUSES, "new"),
+        text('notes') or None,
+    )
+
+
+def detect_encoding(fileobj, block_size=64 * 1024):
+    """
+    'utf-8-sig' si el fichero entero es UTF-8; si no, 'cp1252' (Excel en
+    español). Decodifica todo el fichero por bloques antes de importar nada:
+    un byte inválido al final no debe aparecer con lotes ya insertados.
+    Lanza ValueError si tampoco es cp1252. Deja el fichero al principio.
+    """
+    for encoding in ('utf-8-sig', 'cp1252'):
+        decoder = codecs.getincrementaldecoder(encoding)()
+        fileobj.seek(0)
+        try:
+            for block in iter(lambda: fileobj.read(block_size), b''):
+                decoder.decode(block)
+            decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            continue
+        fileobj.seek(0)
+        return encoding
+    fileobj.seek(0)
+    raise ValueError("El CSV no está en UTF-8 ni en Windows-1252 (cp1252)")
+
+
+def read_chunks(fileobj, chunk_size=CHUNK_SIZE):
+    """
+    Lee el CSV (bytes o texto; separador ',' ';' o tabulador) y produce
+    listas de (número de línea, dict columna -> valor) de hasta chunk_size filas.
+    La codificación de los bytes se decide antes de la primera fila (detect_encoding).
+    """
+    if isinstance(fileobj, io.TextIOBase):
+        text = fileobj
+    else:
+        text = io.TextIOWrapper(fileobj, encoding=detect_encoding(fileobj), newline='')
+
+    sample = text.read(64 * 1024)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    text.seek(0)
+
+    reader = csv.reader(text, dialect)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = [_COLUMNS.get(_key(name)) for name in header]
+    if 'company_name' not in columns:
+        raise ValueError("El CSV no tiene columna de empresa (company_name / Empresa)")
+
+    chunk = []
+    for values in reader:
+        if not any(value.strip() for value in values):
+            continue
+        record = {column: value for column, value in zip(columns, values) if column}
+        chunk.append((reader.line_num, record))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_leads(repo, partner_id, fileobj, chunk_size=CHUNK_SIZE, dry_run=False):
+    """
+    Valida e inserta los leads del CSV para partner_id. Con dry_run sólo
+    valida y deduplica, e inserted cuenta las filas que se insertarían.
+    Devuelve un ImportReport.
+    """
+    total_rows = inserted = duplicates = 0
+    errors = []
+    seen_emails = set()
+
+    for chunk in read_chunks(fileobj, chunk_size):
+        total_rows += len(chunk)
+
+        valid = []
+        for line, record in chunk:
+            try:
+                valid.append((line, validate_row(record)))
+            except RowInvalid as e:
+                errors.append(RowError(line, e.field, e.value, str(e)))
+
+        # Duplicados contra la base (una consulta por bloque) y dentro del fichero
+        existing = repo.existing_emails(partner_id, {row[2] for _, row in valid if row[2]})
+        batch, batch_lines = [], []
+        for line, row in valid:
+            email = row[2]
+            if email and (email in existing or email in seen_emails):
+                duplicates += 1
+                reason = "ya existe un lead con este email" if email in existing else "email repetido en el fichero"
+                errors.append(RowError(line, 'contact_email', email, f"Duplicado: {reason}"))
+                continue
+            if email:
+                seen_emails.add(email)
+            batch.append(row)
+            batch_lines.append(line)
+
+        if not batch:
+            continue
+        if dry_run:
+            inserted += len(batch)
+            continue
+        try:
+            inserted += repo.bulk_create(
+                partner_id, batch, f"Importación CSV: {len(batch)} leads (líneas {batch_lines[0]}-{batch_lines[-1]})"
+            )
+        except sqlite3.Error as e:
+            # El lote entero se deshizo: se informa en cada una de sus filas
+            errors.extend(RowError(line, None, None, f"Error de base de datos: {e}") for line in batch_lines)
+
+    return ImportReport(total_rows, inserted, duplicates, sorted(errors, key=lambda error: error.line))
+
+
+def errors_csv(report):
+    """Informe de filas descartadas como CSV (bytes UTF-8)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(RowError._fields)
+    writer.writerows(report.errors)
+    return buffer.getvalue().encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa leads desde un CSV")
+    parser.add_argument("csv_path")
+    parser.add_argument("--partner", type=int, required=True)
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="sólo validar, sin insertar")
+    parser.add_argument("--errors", help="guardar aquí el informe de filas descartadas")
+    args = parser.parse_args()
+
+    with open(args.csv_path, 'rb') as f:
+        report = import_leads(LeadRepository(args.db), args.partner, f, args.chunk_size, args.dry_run)
+
+    print(f"{report.total_rows:,} filas: {report.inserted:,} insertadas, "
+          f"{report.duplicates:,} duplicadas, {len(report.errors) - report.duplicates:,} con errores")
+    if args.errors:
+        with open(args.errors, 'wb') as f:
+            f.write(errors_csv(report))
+
+
+if __name__ == "__main__":
+    main()
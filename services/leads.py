@@ -0,0 +1,266 @@
+"""
+Leads del CRM: listados, altas/ediciones (con su actividad de registro) y métricas.
+"""
+import json
+from collections import namedtuple
+
+from services.activities import insert_activity
+from services.base import Repository, as_date, today
+from utils.pagination import KeysetQuery
+from utils.stats import StatsQuery
+
+DB_PATH = 'crm_partner_bcs.db'
+
+# Valores que ofrecen los formularios de leads
+LEAD_STATUSES = ["new", "contacted", "qualified", "unqualified"]
+# Estados con los que se puede dar de alta un lead (formulario e importación)
+INITIAL_LEAD_STATUSES = ["new", "contacted"]
+INDUSTRIES = ["Pesca", "Salud", "Restauración", "Retail", "Marketing", "Legal", "Otros"]
+LEAD_SOURCES = ["Referido", "Cold Call", "LinkedIn", "Website", "Email", "Otros"]
+
+LEAD_COLUMNS = [
+    'id', 'partner_id', 'company_name', 'contact_name', 'contact_email', 'contact_phone',
+    'industry', 'company_size', 'pain_points', 'lead_source', 'status',
+    'created_date', 'last_contact', 'notes',
+]
+Lead = namedtuple('Lead', LEAD_COLUMNS)
+
+LeadStats = namedtuple('LeadStats', ['qualification_rate', 'avg_days_to_contact', 'leads_this_month'])
+
+# Resultado de delete(): nombre del lead y oportunidades eliminadas en cascada
+LeadDeletion = namedtuple('LeadDeletion', ['company_name', 'opportunity_names'])
+# Resultado de delete_many(): filas borradas de cada tabla
+LeadBulkDeletion = namedtuple('LeadBulkDeletion', ['leads', 'opportunities', 'activities'])
+
+# Las tres métricas de show_leads_analytics en una sola pasada sobre los leads del partner
+LEAD_STATS = StatsQuery("""
+    SELECT
+        COUNT(CASE WHEN status = 'qualified' THEN 1 END) * 100.0 / COUNT(*) as qualification_rate,
+        AVG(CASE WHEN last_contact IS NOT NULL
+                 THEN julianday(last_contact) - julianday(created_date) END) as avg_days_to_contact,
+        COUNT(CASE WHEN created_date >= date('now', 'start of month') THEN 1 END) as leads_this_month
+    FROM leads
+    WHERE partner_id = :partner_id
+""")
+
+
+def insert_leads(conn, partner_id, rows):
+    """
+    executemany de leads dentro de la transacción del llamador. rows son tuplas
+    (company_name, contact_name, contact_email, contact_phone, industry,
+    company_size, pain_points, lead_source, status, notes, created_date).
+    Devuelve las filas insertadas.
+    """
+    return conn.executemany("""
+        INSERT INTO leads (
+            partner_id, company_name, contact_name, contact_email,
+            contact_phone, industry, company_size, pain_points,
+            lead_source, status, notes, created_date
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [(partner_id, *row) for row in rows]).rowcount
+
+
+def delete_leads(conn, lead_ids):
+    """
+    Borra los leads, sus oportunidades y las actividades de ambos con un
+    DELETE por tabla (ids en un array JSON, sin límite de parámetros).
+    Se ejecuta en la transacción del llamador; devuelve un LeadBulkDeletion.
+    """
+    ids = json.dumps([int(lead_id) for lead_id in lead_ids])
+    activities = conn.execute("""
+        DELETE FROM activities
+        WHERE opportunity_id IN (
+            SELECT id FROM opportunities WHERE lead_id IN (SELECT value FROM json_each(?))
+        )
+    """, (ids,)).rowcount
+    activities += conn.execute(
+        "DELETE FROM activities WHERE lead_id IN (SELECT value FROM json_each(?))", (ids,)
+    ).rowcount
+    opportunities = conn.execute(
+        "DELETE FROM opportunities WHERE lead_id IN (SELECT value FROM json_each(?))", (ids,)
+    ).rowcount
+    leads = conn.execute(
+        "DELETE FROM leads WHERE id IN (SELECT value FROM json_each(?))", (ids,)
+    ).rowcount
+    return LeadBulkDeletion(leads, opportunities, activities)
+
+
+class LeadRepository(Repository):
+    db_path = DB_PATH
+
+    def page_query(self, partner_id, status=None, industry=None, source=None, since=None):
+        """
+        KeysetQuery de show_leads_list. Los totales de oportunidades van en
+        subconsultas por lead para que el índice (partner_id, created_date)
+        resuelva ORDER BY + LIMIT.
+        """
+        where = "l.partner_id = ?"
+        params = [partner_id]
+
+        if status is not None:
+            where += " AND l.status = ?"
+            params.append(status)
+
+        if industry is not None:
+            where += " AND l.industry = ?"
+            params.append(industry)
+
+        if source is not None:
+            where += " AND l.lead_source = ?"
+            params.append(source)
+
+        if since is not None:
+            where += " AND l.created_date >= ?"
+            params.append(as_date(since))
+
+        return KeysetQuery(
+            columns="""l.*,
+               (SELECT COUNT(*) FROM opportunities o WHERE o.lead_id = l.id) as opportunities_count,
+               (SELECT COALESCE(SUM(o.total_value), 0) FROM opportunities o WHERE o.lead_id = l.id) as total_value""",
+            table="leads l",
+            where=where,
+            params=params,
+            sort_column="l.created_date",
+            id_column="l.id",
+        )
+
+    def get(self, lead_id, partner_id):
+        return self.fetch_record(
+            Lead,
+            f"SELECT {', '.join(LEAD_COLUMNS)} FROM leads WHERE id = ? AND partner_id = ?",
+            (lead_id, partner_id),
+        )
+
+    def create(self, partner_id, company_name, contact_name, contact_email, contact_phone,
+               industry, company_size, pain_points, lead_source, status, notes):
+        """Inserta el lead y su actividad 'lead_created'; devuelve el id del lead"""
+        with self.transaction() as conn:
+            cursor = conn.execute("""
+                INSERT INTO leads (
+                    partner_id, company_name, contact_name, contact_email,
+                    contact_phone, industry, company_size, pain_points,
+                    lead_source, status, created_date, notes
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                partner_id, company_name, contact_name, contact_email,
+                contact_phone, industry, company_size, pain_points,
+                lead_source, status, today(), notes
+            ))
+            lead_id = cursor.lastrowid
+            insert_activity(conn, partner_id, lead_id, None, "lead_created",
+                            f"Lead creado para {company_name}")
+        return lead_id
+
+    def existing_emails(self, partner_id, emails):
+        """Subconjunto de emails (en minúsculas) que el partner ya tiene en algún lead"""
+        emails = list(emails)
+        if not emails:
+            return set()
+        placeholders = ", ".join("?" * len(emails))
+        with self.connection() as conn:
+            rows = conn.execute(f"""
+                SELECT DISTINCT lower(contact_email) FROM leads
+                WHERE partner_id = ? AND lower(contact_email) IN ({placeholders})
+            """, [partner_id, *emails]).fetchall()
+        return {row[0] for row in rows}
+
+    def bulk_create(self, partner_id, rows, description=None):
+        """
+        Inserta un lote de leads con executemany en una sola transacción.
+        rows son tuplas (company_name, contact_name, contact_email, contact_phone,
+        industry, company_size, pain_points, lead_source, status, notes).
+        Registra una única actividad para todo el lote; devuelve las filas insertadas.
+        """
+        created_date = today()
+        with self.transaction() as conn:
+            inserted = insert_leads(conn, partner_id, [(*row, created_date) for row in rows])
+            if description:
+                insert_activity(conn, partner_id, None, None, "leads_imported", description)
+        return inserted
+
+    def update(self, lead_id, partner_id, company_name, contact_name, contact_email, contact_phone,
+               industry, company_size, lead_source, status, pain_points, notes):
+        """Actualiza el lead y registra la actividad 'lead_updated'"""
+        with self.transaction() as conn:
+            updated = conn.execute("""
+                UPDATE leads SET
+                    company_name = ?, contact_name = ?, contact_email = ?, contact_phone = ?,
+                    industry = ?, company_size = ?, lead_source = ?, status = ?,
+                    pain_points = ?, notes = ?
+                WHERE id = ?
+            """, (
+                company_name, contact_name, contact_email, contact_phone,
+                industry, company_size, lead_source, status,
+                pain_points, notes, lead_id
+            )).rowcount
+            insert_activity(conn, partner_id, lead_id, None, "lead_updated",
+                            f"Lead actualizado: {company_name}")
+        return updated
+
+    def set_status(self, lead_id, status):
+        """Cambia el estado y marca la fecha de último contacto"""
+        with self.transaction() as conn:
+            return conn.execute(
+                "UPDATE leads SET status = ?, last_contact = ? WHERE id = ?",
+                (status, today(), lead_id),
+            ).rowcount
+
+    def delete(self, lead_id):
+        """Elimina el lead con sus oportunidades y actividades; devuelve un LeadDeletion"""
+        with self.transaction() as conn:
+            lead_info = conn.execute("SELECT company_name FROM leads WHERE id = ?", (lead_id,)).fetchone()
+            company_name = lead_info[0] if lead_info else "Lead desconocido"
+
+            opportunity_names = [row[0] for row in conn.execute(
+                "SELECT opportunity_name FROM opportunities WHERE lead_id = ?", (lead_id,)
+            )]
+            delete_leads(conn, [lead_id])
+
+        return LeadDeletion(company_name, opportunity_names)
+
+    def delete_many(self, lead_ids):
+        """Elimina varios leads en cascada en una sola transacción; devuelve un LeadBulkDeletion"""
+        with self.transaction() as conn:
+            return delete_leads(conn, lead_ids)
+
+    def stats(self, partner_id):
+        return self.fetch_stats(LeadStats, LEAD_STATS, {'partner_id': partner_id})
+
+    def by_source(self, partner_id):
+        return self.read("""
+            SELECT lead_source, COUNT(*) as count
+            FROM leads
+            WHERE partner_id = ?
+            GROUP BY lead_source
+        """, [partner_id])
+
+    def daily_trend(self, partner_id):
+        """Leads creados por día en los últimos 30 días (serie de utils/time_series.py)"""
+        return self.read("""
+            SELECT day as date, leads_count
+            FROM lead_daily_counts
+            WHERE partner_id = ?
+            AND day >= date('now', '-30 days')
+            ORDER BY day
+        """, [partner_id])
+
+    def options(self, partner_id):
+        """id y empresa de los leads del partner (selectores de formularios)"""
+        return self.read("SELECT id, company_name FROM leads WHERE partner_id = ?", [partner_id])
+
+    def qualified_options(self, partner_id, include_id=None):
+        """Leads con los que se puede abrir una oportunidad (más include_id si se indica)"""
+        return self.read("""
+            SELECT id, company_name, contact_name
+            FROM leads
+            WHERE partner_id = ? AND (status IN ('qualified', 'contacted') OR id = ?)
+        """, [partner_id, include_id])
+
+    def industry_distribution(self):
+        """Leads de todos los partners por industria (panel de administración)"""
+        return self.read("""
+            SELECT industry, COUNT(*) as count
+            FROM leads
+            GROUP BY industry
+            ORDER BY count DESC
+        """)
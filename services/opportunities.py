@@ -0,0 +1,145 @@
+"""
+Oportunidades del CRM: pipeline por etapas, altas/ediciones y métricas de cierre.
+"""
+import json
+from collections import namedtuple
+
+from services.activities import insert_activity
+from services.base import Repository, as_date, today
+from utils.stats import StatsQuery
+
+DB_PATH = 'crm_partner_bcs.db'
+
+OPPORTUNITY_STAGES = ['discovery', 'demo', 'proposal', 'negotiation', 'closed-won', 'closed-lost']
+
+# Oportunidad con los datos de su lead (detalle y formulario de edición)
+Opportunity = namedtuple('Opportunity', [
+    'id', 'lead_id', 'partner_id', 'opportunity_name', 'bcs_solution',
+    'estimated_users', 'price_per_user', 'total_value', 'probability', 'stage',
+    'expected_close_date', 'actual_close_date', 'status', 'notes', 'created_date',
+    'company_name', 'contact_name', 'contact_email',
+])
+
+OpportunityStats = namedtuple('OpportunityStats', [
+    'total_pipeline', 'weighted_pipeline', 'win_rate', 'avg_deal_size',
+])
+
+OpportunityBulkDeletion = namedtuple('OpportunityBulkDeletion', ['opportunities', 'activities'])
+
+OPPORTUNITY_STATS = StatsQuery("""
+    SELECT
+        COALESCE(SUM(CASE WHEN status = 'open' THEN total_value END), 0) as total_pipeline,
+        COALESCE(SUM(CASE WHEN status = 'open' THEN total_value * probability / 100 END), 0) as weighted_pipeline,
+        COUNT(CASE WHEN stage = 'closed-won' THEN 1 END) * 100.0 /
+            NULLIF(COUNT(CASE WHEN stage IN ('closed-won', 'closed-lost') THEN 1 END), 0) as win_rate,
+        COALESCE(AVG(CASE WHEN stage = 'closed-won' THEN total_value END), 0) as avg_deal_size
+    FROM opportunities
+    WHERE partner_id = :partner_id
+""")
+
+
+class OpportunityRepository(Repository):
+    db_path = DB_PATH
+
+    def pipeline(self, partner_id):
+        """Todas las oportunidades del partner con empresa y contacto, más recientes primero"""
+        return self.read("""
+            SELECT o.*, l.company_name, l.contact_name
+            FROM opportunities o
+            LEFT JOIN leads l ON o.lead_id = l.id
+            WHERE o.partner_id = ?
+            ORDER BY o.created_date DESC
+        """, [partner_id])
+
+    def stage_summary(self, partner_id):
+        """Número y valor de oportunidades abiertas por etapa"""
+        return self.read("""
+            SELECT stage, COUNT(*) as count, SUM(total_value) as value
+            FROM opportunities
+            WHERE partner_id = ? AND status = 'open'
+            GROUP BY stage
+        """, [partner_id])
+
+    def by_solution(self, partner_id):
+        return self.read("""
+            SELECT
+                bcs_solution,
+                COUNT(*) as count,
+                SUM(total_value) as total_value,
+                AVG(probability) as avg_probability
+            FROM opportunities
+            WHERE partner_id = ? AND status = 'open'
+            GROUP BY bcs_solution
+            ORDER BY total_value DESC
+        """, [partner_id])
+
+    def stats(self, partner_id):
+        return self.fetch_stats(OpportunityStats, OPPORTUNITY_STATS, {'partner_id': partner_id})
+
+    def get(self, opp_id):
+        return self.fetch_record(Opportunity, """
+            SELECT o.id, o.lead_id, o.partner_id, o.opportunity_name, o.bcs_solution,
+                   o.estimated_users, o.price_per_user, o.total_value, o.probability, o.stage,
+                   o.expected_close_date, o.actual_close_date, o.status, o.notes, o.created_date,
+                   l.company_name, l.contact_name, l.contact_email
+            FROM opportunities o
+            LEFT JOIN leads l ON o.lead_id = l.id
+            WHERE o.id = ?
+        """, (opp_id,))
+
+    def options(self, partner_id):
+        """id y nombre de las oportunidades del partner (selectores de formularios)"""
+        return self.read("SELECT id, opportunity_name FROM opportunities WHERE partner_id = ?", [partner_id])
+
+    def create(self, lead_id, partner_id, opportunity_name, bcs_solution, estimated_users,
+               price_per_user, total_value, probability, stage, expected_close_date, notes):
+        """Inserta la oportunidad abierta y su actividad 'opportunity_created'; devuelve el id"""
+        with self.transaction() as conn:
+            cursor = conn.execute("""
+                INSERT INTO opportunities (
+                    lead_id, partner_id, opportunity_name, bcs_solution,
+                    estimated_users, price_per_user, total_value, probability,
+                    stage, expected_close_date, status, notes, created_date
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                lead_id, partner_id, opportunity_name, bcs_solution,
+                estimated_users, price_per_user, total_value, probability,
+                stage, as_date(expected_close_date), 'open', notes, today()
+            ))
+            opp_id = cursor.lastrowid
+            insert_activity(conn, partner_id, lead_id, opp_id, "opportunity_created",
+                            f"Oportunidad creada: {opportunity_name}")
+        return opp_id
+
+    def update(self, opp_id, partner_id, opportunity_name, lead_id, bcs_solution, total_value,
+               stage, probability, expected_close_date, notes):
+        """Actualiza la oportunidad y registra la actividad 'opportunity_updated'"""
+        with self.transaction() as conn:
+            updated = conn.execute("""
+                UPDATE opportunities SET
+                    opportunity_name = ?, lead_id = ?, bcs_solution = ?, total_value = ?,
+                    stage = ?, probability = ?, expected_close_date = ?, notes = ?
+                WHERE id = ?
+            """, (
+                opportunity_name, lead_id, bcs_solution, total_value,
+                stage, probability, as_date(expected_close_date), notes, opp_id
+            )).rowcount
+            insert_activity(conn, partner_id, lead_id, opp_id, "opportunity_updated",
+                            f"Oportunidad actualizada: {opportunity_name}")
+        return updated
+
+    def delete(self, opp_id):
+        """Elimina la oportunidad y sus actividades; devuelve las filas de opportunities borradas"""
+        return self.delete_many([opp_id]).opportunities
+
+    def delete_many(self, opp_ids):
+        """Elimina varias oportunidades y sus actividades en una transacción; devuelve un OpportunityBulkDeletion"""
+        ids = json.dumps([int(opp_id) for opp_id in opp_ids])
+        with self.transaction() as conn:
+            activities = conn.execute(
+                "DELETE FROM activities WHERE opportunity_id IN (SELECT value FROM json_each(?))", (ids,)
+            ).rowcount
+            opportunities = conn.execute(
+                "DELETE FROM opportunities WHERE id IN (SELECT value FROM json_each(?))", (ids,)
+            ).rowcount
+        return OpportunityBulkDeletion(opportunities, activities)
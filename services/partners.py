@@ -0,0 +1,116 @@
+"""
+Partners del CRM: autenticación, alta/edición por el administrador y KPIs.
+"""
+from collections import namedtuple
+
+from services.base import Repository, today
+from utils.admin_analytics import PARTNERS_LIST_SQL, PARTNERS_PERFORMANCE_SQL, TOP_PARTNERS_SQL
+from utils.stats import StatsQuery
+
+DB_PATH = 'crm_partner_bcs.db'
+
+SPECIALIZATIONS = ["Todas las industrias", "Pesca", "Salud", "Restauración", "Retail", "Legal"]
+PARTNER_STATUSES = ["active", "suspended", "pending"]
+
+PARTNER_COLUMNS = [
+    'id', 'name', 'email', 'password_hash', 'phone', 'region',
+    'specialization', 'created_date', 'status', 'created_by',
+]
+Partner = namedtuple('Partner', PARTNER_COLUMNS)
+
+AdminKpis = namedtuple('AdminKpis', ['total_partners', 'total_leads', 'total_opportunities', 'total_revenue'])
+PartnerKpis = namedtuple('PartnerKpis', ['leads_count', 'opportunities_count', 'pipeline_value', 'monthly_commissions'])
+
+# KPIs globales: una fila por partner en partner_kpis en lugar de recorrer leads/opportunities/commissions
+ADMIN_KPIS = StatsQuery("""
+    WITH partner_totals AS (
+        SELECT COUNT(*) as total_partners FROM partners WHERE status != 'admin'
+    ),
+    kpi_totals AS (
+        SELECT COALESCE(SUM(leads_count), 0) as total_leads,
+               COALESCE(SUM(open_opportunities), 0) as total_opportunities,
+               COALESCE(SUM(active_revenue), 0) as total_revenue
+        FROM partner_kpis
+    )
+    SELECT total_partners, total_leads, total_opportunities, total_revenue
+    FROM partner_totals, kpi_totals
+""")
+
+# KPIs del dashboard del partner: una fila de partner_kpis (mantenida por triggers)
+PARTNER_KPIS = StatsQuery("""
+    SELECT leads_count,
+           open_opportunities as opportunities_count,
+           pipeline_value,
+           active_commissions as monthly_commissions
+    FROM partner_kpis
+    WHERE partner_id = :partner_id
+""")
+
+_SELECT_PARTNER = f"SELECT {', '.join(PARTNER_COLUMNS)} FROM partners"
+
+
+class PartnerRepository(Repository):
+    db_path = DB_PATH
+
+    def get(self, partner_id):
+        return self.fetch_record(Partner, f"{_SELECT_PARTNER} WHERE id = ?", (partner_id,))
+
+    def get_by_email(self, email):
+        return self.fetch_record(Partner, f"{_SELECT_PARTNER} WHERE email = ?", (email,))
+
+    def email_taken(self, email, exclude_id=None):
+        """True si otro partner (distinto de exclude_id) ya usa el email"""
+        with self.connection() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM partners WHERE email = ? AND id IS NOT ?", (email, exclude_id)
+            ).fetchone()
+        return row is not None
+
+    def create(self, name, email, password_hash, phone, region, specialization, status, created_by="admin"):
+        with self.transaction() as conn:
+            return conn.execute("""
+                INSERT INTO partners (name, email, password_hash, phone, region, specialization, created_date, status, created_by)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (name, email, password_hash, phone, region, specialization, today(), status, created_by)).lastrowid
+
+    def update(self, partner_id, name, email, phone, region, specialization, status, password_hash=None):
+        """Actualiza los datos del partner; la contraseña sólo si se pasa password_hash"""
+        with self.transaction() as conn:
+            if password_hash:
+                return conn.execute("""
+                    UPDATE partners SET
+                        name = ?, email = ?, password_hash = ?, phone = ?,
+                        region = ?, specialization = ?, status = ?
+                    WHERE id = ?
+                """, (name, email, password_hash, phone, region, specialization, status, partner_id)).rowcount
+            return conn.execute("""
+                UPDATE partners SET
+                    name = ?, email = ?, phone = ?,
+                    region = ?, specialization = ?, status = ?
+                WHERE id = ?
+            """, (name, email, phone, region, specialization, status, partner_id)).rowcount
+
+    def set_password_hash(self, partner_id, password_hash):
+        with self.transaction() as conn:
+            return conn.execute(
+                "UPDATE partners SET password_hash = ? WHERE id = ?", (password_hash, partner_id)
+            ).rowcount
+
+    def set_status(self, partner_id, status):
+        with self.transaction() as conn:
+            return conn.execute("UPDATE partners SET status = ? WHERE id = ?", (status, partner_id)).rowcount
+
+    def list_with_totals(self):
+        return self.read(PARTNERS_LIST_SQL)
+
+    def performance(self):
+        return self.read(PARTNERS_PERFORMANCE_SQL)
+
+    def top(self, limit=10):
+        return self.read(TOP_PARTNERS_SQL, {'limit': limit})
+
+    def admin_kpis(self):
+        return self.fetch_stats(AdminKpis, ADMIN_KPIS)
+
+    def kpis(self, partner_id):
+        return self.fetch_stats(PartnerKpis, PARTNER_KPIS, {'partner_id': partner_id})
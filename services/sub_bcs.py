@@ -0,0 +1,271 @@
+"""
+Sub-BCS del sistema BCS (bcs_system.db).
+
+Tres tablas con el mismo papel para cada tipo de usuario:
+- client_sub_bcs: clientes registrados por el partner desde su CRM;
+- user_sub_bcs: apps asignadas por el administrador a un usuario cliente;
+- partner_sub_bcs: herramientas propias de cada partner.
+"""
+from collections import namedtuple
+
+from services.base import Repository, as_date, now
+from utils.stats import StatsQuery
+
+DB_PATH = 'bcs_system.db'
+
+# Orígenes de las filas de client_sub_bcs_for_partner y la tabla de cada uno
+CRM_SOURCE = 'CRM'
+USER_APPS_SOURCE = 'User Apps'
+_CLIENT_TABLES = {CRM_SOURCE: 'client_sub_bcs', USER_APPS_SOURCE: 'user_sub_bcs'}
+
+PartnerStats = namedtuple('PartnerStats', [
+    'total_contacts', 'validated_pending', 'total_client_bcs',
+    'total_partner_bcs', 'monthly_revenue', 'pending_activities',
+])
+UserStats = namedtuple('UserStats', ['total_apps', 'total_accesses', 'most_used_app', 'last_app'])
+
+PARTNER_STATS = StatsQuery("""
+    WITH
+        contact_stats AS (
+            SELECT
+                COUNT(*) AS total_contacts,
+                COALESCE(SUM(validated = 1 AND converted_to_user = 0), 0) AS validated_pending
+            FROM contacts
+            WHERE partner_id = :partner_id AND status = 'active'
+        ),
+        client_bcs_stats AS (
+            SELECT COUNT(*) AS total, COALESCE(SUM(monthly_value), 0) AS monthly_revenue
+            FROM client_sub_bcs
+            WHERE partner_id = :partner_id AND status = 'active'
+        ),
+        client_app_stats AS (
+            SELECT COUNT(*) AS total
+            FROM user_sub_bcs
+            WHERE partner_id = :partner_id AND status = 'active'
+        ),
+        partner_bcs_stats AS (
+            SELECT COUNT(*) AS total
+            FROM partner_sub_bcs
+            WHERE partner_id = :partner_id AND status = 'active'
+        ),
+        activity_stats AS (
+            SELECT COUNT(*) AS pending
+            FROM partner_activities
+            WHERE partner_id = :partner_id AND completed = 0
+        )
+    SELECT
+        contact_stats.total_contacts,
+        contact_stats.validated_pending,
+        client_bcs_stats.total + client_app_stats.total AS total_client_bcs,
+        partner_bcs_stats.total AS total_partner_bcs,
+        client_bcs_stats.monthly_revenue,
+        activity_stats.pending AS pending_activities
+    FROM contact_stats, client_bcs_stats, client_app_stats, partner_bcs_stats, activity_stats
+""")
+
+USER_STATS = StatsQuery("""
+    WITH apps AS (
+        SELECT app_name, status, access_count, last_accessed
+        FROM user_sub_bcs
+        WHERE user_id = :user_id
+    )
+    SELECT
+        (SELECT COUNT(*) FROM apps WHERE status = 'active') AS total_apps,
+        (SELECT COALESCE(SUM(access_count), 0) FROM apps) AS total_accesses,
+        (SELECT app_name FROM apps WHERE access_count > 0
+         ORDER BY access_count DESC LIMIT 1) AS most_used_app,
+        (SELECT app_name FROM apps WHERE last_accessed IS NOT NULL
+         ORDER BY last_accessed DESC LIMIT 1) AS last_app
+""", defaults={'most_used_app': "N/A", 'last_app': "N/A"})
+
+
+def _limit_clause(limit):
+    return "" if limit is None else f"LIMIT {int(limit)}"
+
+
+class SubBcsRepository(Repository):
+    db_path = DB_PATH
+
+    # --- KPIs ---
+    def partner_stats(self, partner_id):
+        return self.fetch_stats(PartnerStats, PARTNER_STATS, {'partner_id': partner_id})
+
+    def user_stats(self, user_id):
+        return self.fetch_stats(UserStats, USER_STATS, {'user_id': user_id})
+
+    # --- Sub-BCS de clientes (vista del partner) ---
+    def client_sub_bcs_for_partner(self, partner_id):
+        """
+        Clientes del CRM y apps asignadas por el administrador en una sola
+        lista con columnas comunes; 'source' indica la tabla de origen.
+        """
+        return self.read(f"""
+            SELECT * FROM (
+                SELECT cb.id, cb.partner_id, cb.contact_id, cb.client_name, cb.company_name,
+                       cb.bcs_type, cb.modules, cb.users_count, cb.status, cb.start_date,
+                       cb.monthly_value, cb.notes, cb.created_at,
+                       c.name as contact_name, '{CRM_SOURCE}' as source
+                FROM client_sub_bcs cb
+                LEFT JOIN contacts c ON cb.contact_id = c.id
+                WHERE cb.partner_id = :partner_id
+                UNION ALL
+                SELECT ubs.id, ubs.partner_id, NULL, ubs.app_name, u.username,
+                       ubs.app_type, ubs.app_url, 0, ubs.status, NULL,
+                       0, ubs.app_description, ubs.created_at,
+                       NULL, '{USER_APPS_SOURCE}'
+                FROM user_sub_bcs ubs
+                JOIN users u ON ubs.user_id = u.id
+                WHERE ubs.partner_id = :partner_id
+            )
+            ORDER BY source = '{USER_APPS_SOURCE}', created_at DESC
+        """, {'partner_id': partner_id})
+
+    def add_client_sub_bcs(self, partner_id, contact_id, client_name, company_name, bcs_type, modules,
+                           users_count, status, start_date, monthly_value, notes):
+        with self.transaction() as conn:
+            return conn.execute('''
+                INSERT INTO client_sub_bcs
+                (partner_id, contact_id, client_name, company_name, bcs_type, modules,
+                 users_count, status, start_date, monthly_value, notes)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (partner_id, contact_id, client_name, company_name, bcs_type, modules,
+                  users_count, status, as_date(start_date), monthly_value, notes)).lastrowid
+
+    def set_client_status(self, source, bcs_id, status):
+        """Cambia el estado de una fila de client_sub_bcs_for_partner según su origen"""
+        with self.transaction() as conn:
+            return conn.execute(
+                f"UPDATE {_CLIENT_TABLES[source]} SET status = ? WHERE id = ?", (status, bcs_id)
+            ).rowcount
+
+    def delete_client(self, source, bcs_id):
+        with self.transaction() as conn:
+            return conn.execute(f"DELETE FROM {_CLIENT_TABLES[source]} WHERE id = ?", (bcs_id,)).rowcount
+
+    def active_by_type(self, partner_id):
+        return self.read('''
+            SELECT bcs_type, COUNT(*) as count
+            FROM client_sub_bcs
+            WHERE partner_id = ? AND status = 'active'
+            GROUP BY bcs_type
+        ''', (partner_id,))
+
+    def top_revenue(self, partner_id, limit=10):
+        return self.read('''
+            SELECT client_name, monthly_value
+            FROM client_sub_bcs
+            WHERE partner_id = ? AND status = 'active' AND monthly_value > 0
+            ORDER BY monthly_value DESC
+            LIMIT ?
+        ''', (partner_id, limit))
+
+    # --- Sub-BCS propios del partner ---
+    def partner_sub_bcs(self, partner_id):
+        return self.read('''
+            SELECT * FROM partner_sub_bcs
+            WHERE partner_id = ?
+            ORDER BY created_at DESC
+        ''', (partner_id,))
+
+    def all_partner_sub_bcs(self, limit=None):
+        """Sub-BCS de todos los partners con su usuario (panel de administración)"""
+        return self.read(f'''
+            SELECT
+                pbs.id,
+                pbs.bcs_name,
+                pbs.bcs_type,
+                pbs.description,
+                pbs.modules,
+                pbs.status,
+                pbs.created_at,
+                pbs.notes,
+                u.username as partner_username,
+                u.email as partner_email
+            FROM partner_sub_bcs pbs
+            JOIN users u ON pbs.partner_id = u.id
+            ORDER BY pbs.created_at DESC
+            {_limit_clause(limit)}
+        ''')
+
+    def add_partner_sub_bcs(self, partner_id, bcs_name, bcs_type, description, modules, status, notes):
+        with self.transaction() as conn:
+            return conn.execute('''
+                INSERT INTO partner_sub_bcs
+                (partner_id, bcs_name, bcs_type, description, modules, status, created_at, notes)
+                VALUES (?, ?, ?, ?, ?, ?, datetime('now'), ?)
+            ''', (partner_id, bcs_name, bcs_type, description, modules, status, notes)).lastrowid
+
+    def set_partner_sub_bcs_status(self, bcs_id, status):
+        with self.transaction() as conn:
+            return conn.execute("UPDATE partner_sub_bcs SET status = ? WHERE id = ?", (status, bcs_id)).rowcount
+
+    def delete_partner_sub_bcs(self, bcs_id):
+        with self.transaction() as conn:
+            return conn.execute("DELETE FROM partner_sub_bcs WHERE id = ?", (bcs_id,)).rowcount
+
+    # --- Apps de usuarios cliente ---
+    def all_user_apps(self, limit=None):
+        """Apps de todos los clientes con cliente y partner (panel de administración)"""
+        return self.read(f'''
+            SELECT
+                ubs.id,
+                ubs.app_name,
+                ubs.app_type,
+                ubs.app_url,
+                ubs.status,
+                ubs.access_count,
+                ubs.last_accessed,
+                ubs.created_at,
+                u.username as client_username,
+                u.email as client_email,
+                p.username as partner_name
+            FROM user_sub_bcs ubs
+            JOIN users u ON ubs.user_id = u.id
+            LEFT JOIN users p ON ubs.partner_id = p.id
+            ORDER BY ubs.created_at DESC
+            {_limit_clause(limit)}
+        ''')
+
+    def user_apps(self, user_id):
+        """Apps activas de un cliente, por nombre"""
+        return self.read('''
+            SELECT
+                ubs.*,
+                p.username as partner_name
+            FROM user_sub_bcs ubs
+            LEFT JOIN users p ON ubs.partner_id = p.id
+            WHERE ubs.user_id = ? AND ubs.status = 'active'
+            ORDER BY ubs.app_name
+        ''', (user_id,))
+
+    def assign_user_app(self, user_id, partner_id, app_name, app_description, app_url, app_icon, app_type, status):
+        with self.transaction() as conn:
+            return conn.execute('''
+                INSERT INTO user_sub_bcs
+                (user_id, partner_id, app_name, app_description, app_url, app_icon, app_type, status, created_at, access_count)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), 0)
+            ''', (user_id, partner_id, app_name, app_description, app_url, app_icon, app_type, status)).lastrowid
+
+    def set_user_app_status(self, app_id, status):
+        with self.transaction() as conn:
+            return conn.execute("UPDATE user_sub_bcs SET status = ? WHERE id = ?", (status, app_id)).rowcount
+
+    def delete_user_app(self, app_id):
+        with self.transaction() as conn:
+            return conn.execute("DELETE FROM user_sub_bcs WHERE id = ?", (app_id,)).rowcount
+
+    def record_app_access(self, app_id):
+        """Suma un acceso y guarda la fecha del último"""
+        with self.transaction() as conn:
+            return conn.execute('''
+                UPDATE user_sub_bcs
+                SET access_count = access_count + 1,
+                    last_accessed = ?
+                WHERE id = ?
+            ''', (now(), app_id)).rowcount
+
+    def users_with_role(self, role_id):
+        """id, username y email de los usuarios de un rol (selectores de asignación)"""
+        return self.read(
+            "SELECT id, username, email FROM users WHERE role_id = ? ORDER BY username", (role_id,)
+        )
@@ -0,0 +1,69 @@
+"""
+Usuarios del sistema BCS (bcs_system.db): listado y borrado.
+
+Borrar un usuario sólo elimina su fila de users, como hacía el panel de
+administración: los contactos, Sub-BCS y actividades que tenga como
+partner, y las apps asignadas como cliente, se conservan. Esas columnas
+son NOT NULL y siguen apuntando al id borrado (users usa AUTOINCREMENT,
+así que el id no se reutiliza). Las referencias opcionales de otras filas
+(creado por, convertido en, partner que asignó la app) se dejan en NULL.
+Todo con una sentencia por tabla sobre el conjunto de ids, en una sola
+transacción.
+"""
+import json
+from collections import namedtuple
+
+from services.base import Repository
+
+DB_PATH = 'bcs_system.db'
+
+# Filas borradas de users y filas de otras tablas cuya referencia se dejó en NULL
+UserDeletion = namedtuple('UserDeletion', ['users', 'detached'])
+
+# Referencias opcionales al usuario desde filas de otros: se dejan en NULL
+_DETACH = [
+    "UPDATE user_sub_bcs SET partner_id = NULL WHERE partner_id IN (SELECT value FROM json_each(:ids))",
+    "UPDATE contacts SET converted_user_id = NULL WHERE converted_user_id IN (SELECT value FROM json_each(:ids))",
+    "UPDATE users SET created_by_partner_id = NULL WHERE created_by_partner_id IN (SELECT value FROM json_each(:ids))",
+    "UPDATE partners SET user_id = NULL WHERE user_id IN (SELECT value FROM json_each(:ids))",
+]
+
+
+def delete_users(conn, user_ids):
+    """Borra los usuarios en la transacción del llamador; devuelve un UserDeletion"""
+    params = {'ids': json.dumps([int(user_id) for user_id in user_ids])}
+    detached = sum(conn.execute(sql, params).rowcount for sql in _DETACH)
+    users = conn.execute(
+        "DELETE FROM users WHERE id IN (SELECT value FROM json_each(:ids))", params
+    ).rowcount
+    return UserDeletion(users, detached)
+
+
+class UserRepository(Repository):
+    db_path = DB_PATH
+
+    def list_with_creator(self):
+        """Todos los usuarios (sin contraseñas) con el partner que los creó, más recientes primero"""
+        return self.read('''
+            SELECT
+                u.id,
+                u.username,
+                u.email,
+                u.role_id,
+                u.role,
+                u.status,
+                u.is_active,
+                u.created_at,
+                u.created_by_partner_id,
+                p.username as created_by_partner
+            FROM users u
+            LEFT JOIN users p ON u.created_by_partner_id = p.id
+            ORDER BY u.created_at DESC
+        ''')
+
+    def delete(self, user_id):
+        return self.delete_many([user_id])
+
+    def delete_many(self, user_ids):
+        with self.transaction() as conn:
+            return delete_users(conn, user_ids)
@@ -0,0 +1,87 @@
+"""
+Consultas agregadas por partner para el panel de administración.
+
+Cada tabla hija (leads, opportunities, commissions) se agrega por
+separado con GROUP BY partner_id y luego se une a partners: una fila por
+partner en cada lado del JOIN. Unir primero las tablas hijas y agrupar
+después multiplica las filas (leads × oportunidades × comisiones por
+partner) e infla los SUM.
+"""
+
+# Subconsultas preagregadas, una por tabla hija
+_LEAD_TOTALS = """
+    SELECT partner_id, COUNT(*) as leads_count
+    FROM leads
+    GROUP BY partner_id
+"""
+
+_OPPORTUNITY_TOTALS = """
+    SELECT partner_id,
+           COUNT(*) as opportunities_count,
+           COUNT(*) FILTER (WHERE stage = 'closed-won') as won_deals,
+           COUNT(*) FILTER (WHERE stage = 'closed-lost') as lost_deals,
+           COALESCE(SUM(total_value) FILTER (WHERE stage = 'closed-won'), 0) as total_revenue
+    FROM opportunities
+    GROUP BY partner_id
+"""
+
+_COMMISSION_TOTALS = """
+    SELECT partner_id, SUM(commission_amount) as active_commissions
+    FROM commissions
+    WHERE status = 'active'
+    GROUP BY partner_id
+"""
+
+_TOTALS = f"""
+    lead_totals AS ({_LEAD_TOTALS}),
+    opportunity_totals AS ({_OPPORTUNITY_TOTALS}),
+    commission_totals AS ({_COMMISSION_TOTALS})
+"""
+
+# show_partners_list: datos del partner + leads, oportunidades y comisiones activas
+PARTNERS_LIST_SQL = f"""
+    WITH {_TOTALS}
+    SELECT p.*,
+           COALESCE(l.leads_count, 0) as leads_count,
+           COALESCE(o.opportunities_count, 0) as opportunities_count,
+           COALESCE(c.active_commissions, 0) as total_commissions
+    FROM partners p
+    LEFT JOIN lead_totals l ON l.partner_id = p.id
+    LEFT JOIN opportunity_totals o ON o.partner_id = p.id
+    LEFT JOIN commission_totals c ON c.partner_id = p.id
+    WHERE p.status != 'admin'
+    ORDER BY p.created_date DESC
+"""
+
+# show_partners_performance
+PARTNERS_PERFORMANCE_SQL = f"""
+    WITH {_TOTALS}
+    SELECT p.name,
+           p.region,
+           COALESCE(l.leads_count, 0) as total_leads,
+           COALESCE(o.won_deals, 0) as won_deals,
+           COALESCE(o.lost_deals, 0) as lost_deals,
+           COALESCE(o.total_revenue, 0) as total_revenue,
+           COALESCE(c.active_commissions, 0) as monthly_commissions
+    FROM partners p
+    LEFT JOIN lead_totals l ON l.partner_id = p.id
+    LEFT JOIN opportunity_totals o ON o.partner_id = p.id
+    LEFT JOIN commission_totals c ON c.partner_id = p.id
+    WHERE p.status != 'admin'
+    ORDER BY total_revenue DESC
+"""
+
+# Gráfico "Partners más Activos" de show_admin_dashboard
+TOP_PARTNERS_SQL = f"""
+    WITH lead_totals AS ({_LEAD_TOTALS}),
+         opportunity_totals AS ({_OPPORTUNITY_TOTALS})
+    SELECT p.name,
+           COALESCE(l.leads_count, 0) as leads_count,
+           COALESCE(o.opportunities_count, 0) as opportunities_count
+    FROM partners p
+    LEFT JOIN lead_totals l ON l.partner_id = p.id
+    LEFT JOIN opportunity_totals o ON o.partner_id = p.id
+    WHERE p.status != 'admin'
+    ORDER BY leads_count DESC
+    LIMIT :limit
+"""
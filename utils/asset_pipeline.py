@@ -0,0 +1,187 @@
+"""
+Variantes comprimidas de las imágenes de assets/ y comprobación de referencias.
+
+build genera, para cada JPG/PNG de assets/, versiones WebP (y AVIF si
+Pillow lo soporta) a los anchos de WIDTHS que no superen el original, y
+escribe assets/build/manifest.json con el ancho y el peso de cada una.
+utils.assets lee el manifiesto y sirve la variante más ligera que cubre
+el ancho con el que la página pinta la imagen. Sólo se regeneran las
+imágenes cuyo original cambió desde el último build.
+
+check busca las rutas "assets/..." que usan las páginas públicas y el
+login del CRM y falla si alguna no existe (build también lo comprueba).
+
+    python -m utils.asset_pipeline build [--formats webp,avif] [--quality 80]
+    python -m utils.asset_pipeline check
+
+Necesita Pillow (dependencia de streamlit).
+"""
+import argparse
+import ast
+import hashlib
+import json
+import os
+import sys
+
+from utils.assets import BUILD_DIR, MANIFEST_PATH
+
+ASSETS_DIR = 'assets'
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+# Anchos en píxeles físicos: logos de 100-300 px CSS a 2x, carrusel y fondos
+WIDTHS = (160, 240, 320, 480, 640, 960, 1280, 1920)
+FORMATS = ('webp', 'avif')
+QUALITY = 80
+
+# Ficheros (y función, si sólo interesa una) cuyas imágenes deben existir
+REFERENCE_SOURCES = (
+    ('app.py', None),
+    ('main.py', None),
+    ('BCS_Blackbox.py', None),
+    ('CRM_partnerBCS.py', 'show_login'),
+)
+
+
+def referenced_assets(sources=REFERENCE_SOURCES):
+    """{ruta de imagen: [(fichero, línea)]} de los literales "assets/..." del código"""
+    found = {}
+    for filename, function in sources:
+        with open(filename, encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename)
+        if function is not None:
+            tree = next(
+                (node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef) and node.name == function),
+                None,
+            )
+            if tree is None:
+                raise ValueError(f"{filename} no define {function}")
+        for node in ast.walk(tree):
+            if (isinstance(node, ast.Constant) and isinstance(node.value, str)
+                    and node.value.startswith(ASSETS_DIR + '/')
+                    and node.value.lower().endswith(SOURCE_EXTENSIONS)):
+                found.setdefault(node.value, []).append((filename, node.lineno))
+    return found
+
+
+def missing_assets(sources=REFERENCE_SOURCES):
+    return {path: refs for path, refs in referenced_assets(sources).items() if not os.path.exists(path)}
+
+
+def supported_formats(formats):
+    try:
+        from PIL import features
+    except ImportError:
+        raise RuntimeError("build necesita Pillow: pip install pillow")
+    return [fmt for fmt in formats if features.check(fmt)]
+
+
+def _variant_name(path, width, fmt):
+    # El hash de la ruta distingue foo.jpg de foo.png (y "foo bar" de "foo_bar"), que comparten stem
+    stem = os.path.splitext(os.path.basename(path))[0].replace(' ', '_')
+    digest = hashlib.sha1(path.replace(os.sep, '/').encode('utf-8')).hexdigest()[:8]
+    return os.path.join(BUILD_DIR, f"{stem}-{digest}-{width}.{fmt}").replace(os.sep, '/')
+
+
+def build_image(path, formats, quality, widths=WIDTHS):
+    """Genera las variantes de path; devuelve su entrada del manifiesto"""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        img.load()
+        source_width, source_height = img.size
+        # Siempre una variante al ancho original, además de los anchos menores
+        targets = sorted({w for w in widths if w < source_width} | {source_width})
+        has_alpha = img.mode in ('RGBA', 'LA', 'P')
+        base = img.convert('RGBA' if has_alpha else 'RGB')
+
+        variants = []
+        for width in targets:
+            height = round(source_height * width / source_width)
+            resized = base if width == source_width else base.resize((width, height), Image.LANCZOS)
+            for fmt in formats:
+                out = _variant_name(path, width, fmt)
+                resized.save(out, fmt.upper(), quality=quality)
+                variants.append({'path': out, 'width': width, 'format': fmt, 'bytes': os.path.getsize(out)})
+
+    stat = os.stat(path)
+    return {
+        'width': source_width,
+        'height': source_height,
+        'bytes': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'variants': variants,
+    }
+
+
+def build(formats=FORMATS, quality=QUALITY, assets_dir=ASSETS_DIR, manifest_path=MANIFEST_PATH):
+    """Regenera las variantes de las imágenes nuevas o modificadas; devuelve el manifiesto"""
+    formats = supported_formats(formats)
+    if not formats:
+        raise RuntimeError("Pillow no soporta ninguno de los formatos pedidos")
+    os.makedirs(BUILD_DIR, exist_ok=True)
+
+    previous = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as f:
+            previous = json.load(f)
+    same_settings = previous.get('formats') == formats and previous.get('quality') == quality
+    previous_images = previous.get('images', {}) if same_settings else {}
+
+    images = {}
+    for name in sorted(os.listdir(assets_dir)):
+        path = f"{assets_dir}/{name}"
+        if not name.lower().endswith(SOURCE_EXTENSIONS) or not os.path.isfile(path):
+            continue
+        entry = previous_images.get(path)
+        unchanged = (
+            entry is not None
+            and entry['mtime_ns'] == os.stat(path).st_mtime_ns
+            and all(os.path.exists(v['path']) and v['path'] == _variant_name(path, v['width'], v['format'])
+                    for v in entry['variants'])
+        )
+        images[path] = entry if unchanged else build_image(path, formats, quality)
+
+    manifest = {'formats': formats, 'quality': quality, 'images': images}
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    # Las páginas nunca leen un manifiesto a medio escribir
+    os.replace(tmp_path, manifest_path)
+    return manifest
+
+
+def _report_missing(missing):
+    for path, refs in sorted(missing.items()):
+        where = ", ".join(f"{filename}:{line}" for filename, line in sorted(refs))
+        print(f"  falta {path} ({where})", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Variantes WebP/AVIF de assets/ y comprobación de imágenes")
+    parser.add_argument("command", choices=["build", "check"])
+    parser.add_argument("--formats", default=",".join(FORMATS))
+    parser.add_argument("--quality", type=int, default=QUALITY)
+    parser.add_argument("--allow-missing", action="store_true", help="no fallar si faltan imágenes referenciadas")
+    args = parser.parse_args()
+
+    missing = missing_assets()
+    if missing:
+        print(f"{len(missing)} imágenes referenciadas no existen:", file=sys.stderr)
+        _report_missing(missing)
+
+    if args.command == "build":
+        try:
+            manifest = build(tuple(args.formats.split(",")), args.quality)
+        except RuntimeError as e:
+            parser.error(str(e))
+        for path, entry in manifest['images'].items():
+            smallest = min(v['bytes'] for v in entry['variants'])
+            print(f"{path}: {entry['bytes'] / 1024:.0f} KB -> {len(entry['variants'])} variantes "
+                  f"({smallest / 1024:.0f} KB la menor)")
+        print(f"Manifiesto: {MANIFEST_PATH} ({', '.join(manifest['formats'])})")
+
+    if missing and not args.allow_missing:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Imágenes de las landings codificadas una sola vez por proceso.
+
+Streamlit vuelve a ejecutar la página entera en cada interacción; leer
+un JPG de cientos de KB y pasarlo a base64 en cada rerun lo pagaba cada
+visitante. Este módulo vive en sys.modules, así que sus cachés duran lo
+que el proceso:
+
+    data_uri(path, width)        "data:image/...;base64,..." listo para <img src>
+    image_bytes(path, width)     bytes para st.image
+    background_css(path)         bloque <style> con la imagen de fondo
+    html_fragment(key, build)    HTML construido una vez (p. ej. un carrusel)
+
+Con width la imagen se reduce a ese ancho en píxeles (sin ampliar) y se
+vuelve a comprimir, para no enviar el original a un hueco de 120 px; hace
+falta Pillow (dependencia de streamlit). Sin Pillow se sirve el original.
+
+Las entradas se indexan por la fecha de modificación del fichero: si se
+sustituye una imagen, la siguiente petición la vuelve a codificar.
+
+Si existe el manifiesto de python -m utils.asset_pipeline build, las
+imágenes salen de las variantes ya comprimidas (WebP/AVIF por ancho):
+image_source(path, width) da la más pequeña que cubre width píxeles en
+pantallas HiDPI, sin coste de CPU en el servidor.
+"""
+import base64
+import io
+import json
+import mimetypes
+import os
+import threading
+
+JPEG_QUALITY = 82
+BUILD_DIR = os.path.join('assets', 'build')
+MANIFEST_PATH = os.path.join(BUILD_DIR, 'manifest.json')
+# Píxeles físicos por píxel CSS que se cubren (pantallas retina / móviles)
+PIXEL_RATIO = 2
+# Formatos que se sirven, en orden de preferencia a igual tamaño
+IMAGE_FORMATS = tuple(os.environ.get("BCS_IMAGE_FORMATS", "webp").split(","))
+# Los fragmentos (CSS, carruseles) incluyen las imágenes en base64: pocos y grandes
+MAX_ENTRIES = 64
+
+_cache = {}
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _cached(key, build):
+    with _lock:
+        if key in _cache:
+            _stats['hits'] += 1
+            return _cache[key]
+    value = build()
+    with _lock:
+        _stats['misses'] += 1
+        if len(_cache) >= MAX_ENTRIES:
+            # Entradas de versiones anteriores de los ficheros: se descarta la más antigua
+            _cache.pop(next(iter(_cache)))
+        _cache[key] = value
+    return value
+
+
+def _resize(data, width):
+    """Reduce la imagen a width píxeles de ancho; devuelve (bytes, formato) o None sin Pillow"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+
+    with Image.open(io.BytesIO(data)) as img:
+        if img.width <= width:
+            return None
+        fmt = img.format
+        height = round(img.height * width / img.width)
+        resized = img.resize((width, height), Image.LANCZOS)
+        out = io.BytesIO()
+        if fmt == 'JPEG':
+            resized.convert('RGB').save(out, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+        else:
+            resized.save(out, fmt, optimize=True)
+    return out.getvalue(), fmt
+
+
+def load_manifest(manifest_path=MANIFEST_PATH):
+    """{ruta original: entrada} del último build, o {} si no se ha generado"""
+    mtime = _mtime(manifest_path)
+    if mtime is None:
+        return {}
+
+    def build():
+        with open(manifest_path, encoding='utf-8') as f:
+            return json.load(f)['images']
+
+    return _cached(('manifest', manifest_path, mtime), build)
+
+
+def pick_variant(path, pixels, formats=IMAGE_FORMATS, manifest_path=MANIFEST_PATH):
+    """
+    Variante del manifiesto más ligera entre las de al menos pixels de ancho
+    (o la más ancha si ninguna llega); None si no hay variantes.
+    """
+    entry = load_manifest(manifest_path).get(str(path).replace(os.sep, '/'))
+    if not entry:
+        return None
+    variants = [v for v in entry['variants'] if v['format'] in formats and os.path.exists(v['path'])]
+    if not variants:
+        return None
+    target = min(pixels, entry['width']) if pixels else entry['width']
+    adequate = [v for v in variants if v['width'] >= target]
+    if not adequate:
+        widest = max(v['width'] for v in variants)
+        adequate = [v for v in variants if v['width'] == widest]
+    return min(adequate, key=lambda v: (v['bytes'], formats.index(v['format'])))
+
+
+def image_source(path, width):
+    """
+    Lo que hay que pasar a st.image(..., width=width): la ruta de la variante
+    adecuada, la imagen reducida en memoria o, si no existe, la ruta original.
+    """
+    variant = pick_variant(path, width * PIXEL_RATIO)
+    if variant is not None:
+        return variant['path']
+    return image_bytes(path, width * PIXEL_RATIO) or path
+
+
+def _load(path, width):
+    """(bytes, mime) de la variante del manifiesto o del original reducido a width"""
+    variant = pick_variant(path, width)
+    if variant is not None:
+        path = variant['path']
+    with open(path, 'rb') as f:
+        data = f.read()
+    if width and variant is None:
+        resized = _resize(data, width)
+        if resized is not None:
+            data = resized[0]
+    return data, mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+
+def image_bytes(path, width=None):
+    """Contenido de la imagen con al menos width píxeles de ancho (si se indica), o None si no existe"""
+    path = str(path)
+    mtime = _mtime(path)
+    if mtime is None:
+        return None
+    return _cached(('bytes', path, mtime, _mtime(MANIFEST_PATH), width), lambda: _load(path, width)[0])
+
+
+def data_uri(path, width=None):
+    """data URI de la imagen, o "" si no existe (la página la omite)"""
+    path = str(path)
+    mtime = _mtime(path)
+    if mtime is None:
+        return ""
+
+    def build():
+        data, mime = _load(path, width)
+        return f"data:{mime};base64," + base64.b64encode(data).decode()
+
+    return _cached(('uri', path, mtime, _mtime(MANIFEST_PATH), width), build)
+
+
+def background_css(path, width=1920):
+    """<style> con la imagen de fondo de .stApp, o "" si no existe"""
+    path = str(path)
+    uri = data_uri(path, width)
+    if not uri:
+        return ""
+    return _cached(('background', path, _mtime(path), _mtime(MANIFEST_PATH), width), lambda: f"""
+        <style>
+        .stApp {{
+            background: url('{uri}') no-repeat center center fixed;
+            background-size: cover;
+        }}
+        </style>
+        """)
+
+
+def html_fragment(key, build, *paths):
+    """
+    Resultado de build() guardado por proceso. paths son los ficheros de los
+    que depende: si cambia alguno (o el manifiesto), se vuelve a construir.
+    """
+    mtimes = tuple(_mtime(str(p)) for p in (*paths, MANIFEST_PATH))
+    return _cached(('fragment', key) + mtimes, build)
+
+
+def asset_stats():
+    with _lock:
+        size = sum(len(value) for value in _cache.values())
+        return {'entries': len(_cache), 'bytes': size, **_stats}
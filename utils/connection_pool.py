@@ -0,0 +1,249 @@
+import gc
+import os
+import sqlite3
+import threading
+import time
+import weakref
+
+from utils.dates import register_adapters
+from utils.query_cache import invalidate, written_table
+
+# Configuración aplicada una sola vez al abrir cada conexión física
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",      # ~16 MB de caché de páginas
+    "PRAGMA mmap_size=134217728",    # 128 MB mapeados en memoria
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+POOL_SIZE = int(os.environ.get("BCS_DB_POOL_SIZE", 8))
+POOL_TIMEOUT = float(os.environ.get("BCS_DB_POOL_TIMEOUT", 5.0))
+
+# date/datetime como parámetros -> texto ISO-8601 UTC (utils/dates.py)
+register_adapters()
+
+
+class TrackingCursor(sqlite3.Cursor):
+    """Cursor que anota en su conexión las tablas que modifica"""
+
+    def execute(self, sql, *args):
+        self.connection._track_write(sql)
+        return super().execute(sql, *args)
+
+    def executemany(self, sql, *args):
+        self.connection._track_write(sql)
+        return super().executemany(sql, *args)
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    Conexión SQLite que vuelve al pool al llamar a close().
+    El resto del código sigue usando conn.close() como siempre.
+
+    Además recuerda las tablas escritas en la transacción en curso y, al
+    confirmarla, sube su versión en utils.query_cache para invalidar las
+    lecturas cacheadas.
+    """
+    _pool = None
+    _finalizer = None
+    db_path = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._written = set()
+
+    def _track_write(self, sql):
+        table = written_table(sql)
+        if table is not None:
+            self._written.add(table)
+
+    def _publish_writes(self):
+        if self._written:
+            invalidate(self.db_path, *self._written)
+            self._written.clear()
+
+    def cursor(self, factory=TrackingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, *args):
+        self._track_write(sql)
+        return super().execute(sql, *args)
+
+    def executemany(self, sql, *args):
+        self._track_write(sql)
+        return super().executemany(sql, *args)
+
+    def commit(self):
+        super().commit()
+        self._publish_writes()
+
+    def rollback(self):
+        super().rollback()
+        self._written.clear()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        result = super().__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            self._publish_writes()
+        else:
+            self._written.clear()
+        return result
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.release(self)
+        else:
+            super().close()
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones para una base de datos SQLite.
+
+    Streamlit ejecuta cada rerun en un hilo nuevo, así que las conexiones
+    se abren con check_same_thread=False y se prestan en exclusiva: un hilo
+    la usa entre get_connection() y close(), luego queda libre para otro.
+    """
+
+    def __init__(self, db_path, size=POOL_SIZE, timeout=POOL_TIMEOUT):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._last_collect = float('-inf')
+        self.stats = {
+            'hits': 0,          # conexión reutilizada del pool
+            'misses': 0,        # conexión nueva abierta
+            'overflow': 0,      # pool lleno tras esperar: conexión fuera del pool
+            'leaked': 0,        # conexiones nunca devueltas (recuperadas por el GC)
+            'waits': 0,         # préstamos que tuvieron que esperar un hueco
+            'wait_time': 0.0,   # segundos acumulados esperando
+        }
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            factory=PooledConnection,
+            check_same_thread=False,
+        )
+        conn.db_path = self.db_path
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self):
+        start = time.perf_counter()
+        got_slot = self._slots.acquire(blocking=False)
+        if not got_slot:
+            # sqlite3.Connection forma ciclos de referencias; una conexión
+            # olvidada sólo se libera cuando pasa el GC de ciclos. Es una pausa
+            # de todo el proceso: como mucho una vez por ventana de timeout
+            collect = False
+            with self._lock:
+                if start - self._last_collect >= self.timeout:
+                    self._last_collect = start
+                    collect = True
+            if collect:
+                gc.collect()
+            got_slot = self._slots.acquire(timeout=self.timeout)
+            waited = time.perf_counter() - start
+            with self._lock:
+                self.stats['waits'] += 1
+                self.stats['wait_time'] += waited
+
+        if not got_slot:
+            # Pool agotado: se entrega una conexión normal para no bloquear la página
+            with self._lock:
+                self.stats['overflow'] += 1
+            conn = self._open()
+            return conn
+
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+            self.stats['hits' if conn is not None else 'misses'] += 1
+
+        if conn is None:
+            conn = self._open()
+        conn._pool = self
+        # Si el llamador olvida close(), el hueco se libera cuando el GC recoge la conexión
+        conn._finalizer = weakref.finalize(conn, self._reclaim_slot)
+        return conn
+
+    def release(self, conn):
+        finalizer = conn._finalizer
+        if finalizer is None or not finalizer.alive:
+            # Ya devuelta (doble close) o conexión fuera del pool
+            conn._pool = None
+            return
+        finalizer.detach()
+        conn._finalizer = None
+
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn._written.clear()
+            conn.row_factory = None
+        except sqlite3.Error:
+            conn._pool = None
+            sqlite3.Connection.close(conn)
+        else:
+            with self._lock:
+                self._idle.append(conn)
+        self._slots.release()
+
+    def _reclaim_slot(self):
+        with self._lock:
+            self.stats['leaked'] += 1
+        self._slots.release()
+
+    def snapshot(self):
+        with self._lock:
+            data = dict(self.stats)
+            data['idle'] = len(self._idle)
+        data['size'] = self.size
+        total = data['hits'] + data['misses']
+        data['hit_rate'] = data['hits'] / total if total else 0.0
+        return data
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn._pool = None
+            conn.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path):
+    """Devuelve (creándolo si hace falta) el pool de una base de datos"""
+    key = os.path.abspath(str(db_path))
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(key)
+                _pools[key] = pool
+    return pool
+
+
+def get_connection(db_path):
+    """
+    Presta una conexión del pool de db_path.
+    Hay que llamar a conn.close() para devolverla.
+    """
+    return get_pool(db_path).acquire()
+
+
+def pool_stats():
+    """Contadores de uso de todos los pools: {ruta_db: {...}}"""
+    with _pools_lock:
+        pools = list(_pools.items())
+    return {path: pool.snapshot() for path, pool in pools}
@@ -0,0 +1,94 @@
+"""
+Representación única de fechas y horas en las bases SQLite.
+
+Todas las columnas DATE, DATETIME y TIMESTAMP guardan texto ISO-8601 en UTC,
+con los mismos formatos que date() / datetime() / CURRENT_TIMESTAMP de SQLite:
+
+    fecha      'YYYY-MM-DD'
+    instante   'YYYY-MM-DD HH:MM:SS'   (UTC, sin zona ni fracciones de segundo)
+
+Con un solo formato el orden del texto es el orden cronológico, así que
+los filtros se escriben sobre la columna desnuda (created_date >= ?,
+start_date < ?) y usan los índices como rangos. Envolver la columna en
+date(), julianday() o strftime() obliga a recorrer la tabla.
+
+register_adapters() hace que los date y datetime de Python (st.date_input,
+datetime.now()) se escriban en este formato al pasarlos como parámetros;
+utils.connection_pool lo llama al importarse. Las lecturas devuelven el
+texto tal cual: ya ordena y compara bien, y es lo que pintan las páginas.
+
+normalize_date_columns reescribe al formato canónico los valores antiguos
+que no lo siguen ('2025-11-13T12:07:52', '2025-11-13 12:07:52.123456',
+'2025-11-13 12:07:52+02:00'); lo aplican las migraciones del CRM y de
+bcs_system.db. Los valores que SQLite no sabe interpretar se dejan igual.
+"""
+import sqlite3
+from datetime import date, datetime, timezone
+
+DATE_FORMAT = '%Y-%m-%d'
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Tipos declarados de las columnas de fecha y la función SQLite que las normaliza
+DATE_TYPES = {'DATE': 'date', 'DATETIME': 'datetime', 'TIMESTAMP': 'datetime'}
+
+
+def utc_now():
+    return datetime.now(timezone.utc)
+
+
+def to_db_date(value):
+    """date/datetime -> 'YYYY-MM-DD'"""
+    if isinstance(value, datetime):
+        value = _to_utc(value)
+    return value.strftime(DATE_FORMAT)
+
+
+def to_db_timestamp(value):
+    """datetime -> 'YYYY-MM-DD HH:MM:SS' en UTC (los datetime sin zona se toman como hora local)"""
+    return _to_utc(value).strftime(TIMESTAMP_FORMAT)
+
+
+def _to_utc(value):
+    # astimezone() interpreta los datetime sin tzinfo como hora local del servidor
+    return value.astimezone(timezone.utc)
+
+
+def register_adapters():
+    """Parámetros date/datetime -> texto canónico en todas las conexiones del proceso"""
+    sqlite3.register_adapter(date, to_db_date)
+    sqlite3.register_adapter(datetime, to_db_timestamp)
+
+
+def date_columns(conn):
+    """[(tabla, columna, función)] de las columnas declaradas como fecha u hora"""
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    )]
+    columns = []
+    for table in tables:
+        for _, column, declared, *_ in conn.execute(f"PRAGMA table_info({table})"):
+            function = DATE_TYPES.get(declared.upper())
+            if function is not None:
+                columns.append((table, column, function))
+    return columns
+
+
+def normalize_date_columns(conn, columns=None):
+    """
+    Reescribe al formato canónico los valores que no lo siguen.
+    Una columna de hora puede guardar sólo la fecha ('YYYY-MM-DD'): también
+    es canónico y ordena antes que cualquier hora de ese día.
+    Devuelve {(tabla, columna): filas cambiadas}. No hace commit.
+    """
+    changed = {}
+    for table, column, function in columns if columns is not None else date_columns(conn):
+        keep_dates = f" AND {column} <> date({column})" if function == 'datetime' else ""
+        count = conn.execute(f"""
+            UPDATE {table} SET {column} = {function}({column})
+            WHERE typeof({column}) = 'text'
+            AND {function}({column}) IS NOT NULL
+            AND {column} <> {function}({column}){keep_dates}
+        """).rowcount
+        if count:
+            changed[(table, column)] = count
+    return changed
@@ -0,0 +1,597 @@
+"""
+Migraciones de esquema versionadas con PRAGMA user_version.
+
+Cada migración es (versión, descripción, función(conn)). run_migrations
+aplica en orden las que tengan versión mayor que la guardada en la base,
+cada una en su propia transacción junto con el nuevo user_version: si
+falla, la base queda en la versión anterior.
+
+ensure_schema hace esto una sola vez por proceso y base de datos; en
+los reruns siguientes de Streamlit no toca la base. Con la base ya al
+día el coste en un proceso nuevo es una lectura de user_version.
+
+Para que las aplicaciones nunca escriban al arrancar, el esquema (y los
+datos iniciales: roles, usuario admin) se crea con el comando
+
+    python -m utils.migrations [--crm crm_partner_bcs.db] [--bcs bcs_system.db] [--landing landing_leads.db]
+
+y se arranca con BCS_AUTO_MIGRATE=0: ensure_schema sólo comprueba la
+versión y falla si la base está atrasada.
+"""
+import argparse
+import os
+import threading
+from datetime import datetime
+
+from utils.connection_pool import get_connection
+from utils.dates import date_columns, normalize_date_columns
+from utils.partner_kpis import install_partner_kpis
+from utils.passwords import hash_password
+from utils.schema import refresh as refresh_schema
+from utils.time_series import install_time_series
+
+CRM_DB_PATH = 'crm_partner_bcs.db'
+BCS_DB_PATH = 'bcs_system.db'
+LANDING_DB_PATH = os.environ.get("BCS_LANDING_DB", 'landing_leads.db')
+
+# 0: las aplicaciones no aplican migraciones, sólo las exigen
+AUTO_MIGRATE = os.environ.get("BCS_AUTO_MIGRATE", "1") != "0"
+
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def add_column(conn, table, column, definition):
+    """ALTER TABLE ADD COLUMN sólo si la columna no existe (bases creadas con versiones anteriores)"""
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+    if column not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _in_transaction(conn, work):
+    # BEGIN IMMEDIATE: toma el lock de escritura antes de releer la versión,
+    # así dos procesos que arrancan a la vez no aplican la misma migración
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        result = work()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return result
+
+
+def run_migrations(conn, migrations, bootstrap=None):
+    """
+    Aplica las migraciones pendientes y devuelve la lista de versiones aplicadas.
+
+    bootstrap es una función idempotente (CREATE TABLE IF NOT EXISTS, add_column)
+    que deja el esquema base listo; sólo se ejecuta si hay migraciones pendientes.
+    Confirma antes cualquier transacción abierta del llamador.
+    """
+    if conn.in_transaction:
+        conn.commit()
+
+    migrations = sorted(migrations, key=lambda m: m[0])
+    latest = migrations[-1][0] if migrations else 0
+    if get_schema_version(conn) >= latest:
+        return []
+
+    if bootstrap is not None:
+        _in_transaction(conn, lambda: bootstrap(conn))
+
+    applied = []
+    for version, description, migrate in migrations:
+        def step(version=version, migrate=migrate):
+            if get_schema_version(conn) >= version:
+                return False
+            migrate(conn)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            return True
+
+        if _in_transaction(conn, step):
+            applied.append(version)
+    return applied
+
+
+_migrated = set()
+_migrated_lock = threading.Lock()
+
+
+def ensure_schema(db_path, migrations, bootstrap=None):
+    """
+    Deja db_path en la última versión. Sólo consulta la base la primera vez
+    que se llama en el proceso; después es una comprobación en memoria.
+    """
+    key = os.path.abspath(str(db_path))
+    if key in _migrated:
+        return []
+
+    with _migrated_lock:
+        if key in _migrated:
+            return []
+        conn = get_connection(db_path)
+        try:
+            if AUTO_MIGRATE:
+                applied = run_migrations(conn, migrations, bootstrap)
+            else:
+                applied = []
+                latest = max(version for version, _, _ in migrations)
+                current = get_schema_version(conn)
+                if current < latest:
+                    raise RuntimeError(
+                        f"{db_path} está en la versión {current} de {latest}; "
+                        f"ejecuta python -m utils.migrations antes de arrancar"
+                    )
+        finally:
+            conn.close()
+        # Las consultas del registro ven el esquema ya migrado
+        refresh_schema(db_path)
+        _migrated.add(key)
+    return applied
+
+
+# --- crm_partner_bcs.db ---
+
+def crm_bootstrap(conn):
+    """Tablas base del CRM"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS partners (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            phone TEXT,
+            region TEXT,
+            specialization TEXT,
+            created_date DATE,
+            status TEXT DEFAULT 'active',
+            created_by TEXT DEFAULT 'admin'
+        )
+    ''')
+    # Columnas añadidas después de la primera versión
+    add_column(conn, 'partners', 'password_hash', 'TEXT')
+    add_column(conn, 'partners', 'created_by', "TEXT DEFAULT 'admin'")
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS leads (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            partner_id INTEGER,
+            company_name TEXT NOT NULL,
+            contact_name TEXT,
+            contact_email TEXT,
+            contact_phone TEXT,
+            industry TEXT,
+            company_size INTEGER,
+            pain_points TEXT,
+            lead_source TEXT,
+            status TEXT DEFAULT 'new',
+            created_date DATE,
+            last_contact DATE,
+            notes TEXT,
+            FOREIGN KEY (partner_id) REFERENCES partners (id)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS opportunities (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            lead_id INTEGER,
+            partner_id INTEGER,
+            opportunity_name TEXT NOT NULL,
+            bcs_solution TEXT,
+            estimated_users INTEGER,
+            price_per_user REAL,
+            total_value REAL,
+            probability INTEGER,
+            stage TEXT DEFAULT 'discovery',
+            expected_close_date DATE,
+            actual_close_date DATE,
+            status TEXT DEFAULT 'open',
+            notes TEXT,
+            created_date DATE,
+            FOREIGN KEY (lead_id) REFERENCES leads (id),
+            FOREIGN KEY (partner_id) REFERENCES partners (id)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS activities (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            lead_id INTEGER,
+            opportunity_id INTEGER,
+            partner_id INTEGER,
+            activity_type TEXT,
+            description TEXT,
+            activity_date DATE,
+            follow_up_date DATE,
+            completed BOOLEAN DEFAULT FALSE,
+            created_date DATETIME,
+            FOREIGN KEY (lead_id) REFERENCES leads (id),
+            FOREIGN KEY (opportunity_id) REFERENCES opportunities (id),
+            FOREIGN KEY (partner_id) REFERENCES partners (id)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS commissions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            partner_id INTEGER,
+            opportunity_id INTEGER,
+            client_name TEXT,
+            monthly_value REAL,
+            commission_rate REAL DEFAULT 0.5,
+            commission_amount REAL,
+            start_date DATE,
+            status TEXT DEFAULT 'active',
+            payment_date DATE,
+            notes TEXT,
+            FOREIGN KEY (partner_id) REFERENCES partners (id),
+            FOREIGN KEY (opportunity_id) REFERENCES opportunities (id)
+        )
+    ''')
+
+
+# Índices para los filtros de las páginas del CRM (WHERE / ORDER BY reales)
+CRM_INDEXES = (
+    # show_leads_list, show_leads_analytics, KPIs de leads
+    "CREATE INDEX IF NOT EXISTS idx_leads_partner_created ON leads (partner_id, created_date)",
+    # pipeline, analytics y KPIs de oportunidades (status = 'open' / stage)
+    "CREATE INDEX IF NOT EXISTS idx_opportunities_partner_status_stage ON opportunities (partner_id, status, stage)",
+    # JOIN leads -> opportunities y borrado de leads
+    "CREATE INDEX IF NOT EXISTS idx_opportunities_lead ON opportunities (lead_id)",
+    # show_opportunities_pipeline ordena por fecha de creación
+    "CREATE INDEX IF NOT EXISTS idx_opportunities_partner_created ON opportunities (partner_id, created_date)",
+    # show_activities_list filtra y ordena por activity_date
+    "CREATE INDEX IF NOT EXISTS idx_activities_partner_date ON activities (partner_id, activity_date)",
+    # actividad reciente del dashboard del partner y del admin
+    "CREATE INDEX IF NOT EXISTS idx_activities_partner_created ON activities (partner_id, created_date)",
+    "CREATE INDEX IF NOT EXISTS idx_activities_created ON activities (created_date)",
+    # borrado en cascada de leads y oportunidades
+    "CREATE INDEX IF NOT EXISTS idx_activities_lead ON activities (lead_id)",
+    "CREATE INDEX IF NOT EXISTS idx_activities_opportunity ON activities (opportunity_id)",
+    # dashboard e historial de comisiones
+    "CREATE INDEX IF NOT EXISTS idx_commissions_partner_start ON commissions (partner_id, start_date)",
+    "CREATE INDEX IF NOT EXISTS idx_commissions_partner_status ON commissions (partner_id, status)",
+)
+
+
+def crm_add_indexes(conn):
+    for statement in CRM_INDEXES:
+        conn.execute(statement)
+    # Estadísticas para que el planificador elija los índices nuevos
+    conn.execute("ANALYZE")
+
+
+def crm_seed_partners(conn):
+    """Contraseña por defecto para partners antiguos y usuario admin inicial"""
+    default_hash = hash_password("123456")
+    conn.execute(
+        "UPDATE partners SET password_hash = ? WHERE password_hash IS NULL OR password_hash = ''",
+        (default_hash,),
+    )
+    conn.execute("UPDATE partners SET created_by = 'admin' WHERE created_by IS NULL OR created_by = ''")
+
+    admin = conn.execute("SELECT id FROM partners WHERE email = 'admin@bcsblackbox.com'").fetchone()
+    if not admin:
+        admin_password_hash = hash_password("admin123")
+        created_date_str = datetime.now().date().strftime('%Y-%m-%d')
+        conn.execute("""
+            INSERT INTO partners (name, email, password_hash, phone, region, specialization, created_date, status, created_by)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, ("Admin BCS", "admin@bcsblackbox.com", admin_password_hash, "+1-555-BCS-ADMIN", "Global", "Administrador", created_date_str, "admin", "system"))
+
+
+def crm_add_lead_email_index(conn):
+    """Deduplicación por email en la importación de leads (services/lead_import.py)"""
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_leads_partner_email ON leads (partner_id, lower(contact_email))"
+    )
+
+
+def crm_add_landing_sync(conn):
+    """Marca de agua de la sincronización landing_leads.db -> leads (services/landing_leads.py)"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS landing_sync (
+            store TEXT PRIMARY KEY,
+            last_id INTEGER NOT NULL DEFAULT 0,
+            synced_at DATETIME
+        )
+    ''')
+
+
+CRM_MIGRATIONS = [
+    (1, "Índices para los filtros de leads, oportunidades, actividades y comisiones", crm_add_indexes),
+    (2, "Contraseñas por defecto y usuario admin inicial", crm_seed_partners),
+    (3, "Tabla partner_kpis mantenida por triggers", install_partner_kpis),
+    (4, "Índice (partner_id, email) para deduplicar importaciones de leads", crm_add_lead_email_index),
+    (5, "Marca de agua de la sincronización de leads de las landings", crm_add_landing_sync),
+    (6, "Series diarias de leads y mensuales de comisiones mantenidas por triggers", install_time_series),
+    (7, "Fechas en texto ISO-8601 UTC (utils/dates.py)", normalize_date_columns),
+]
+
+
+def ensure_crm_schema(db_path=CRM_DB_PATH):
+    return ensure_schema(db_path, CRM_MIGRATIONS, crm_bootstrap)
+
+
+# --- bcs_system.db ---
+
+def bcs_bootstrap(conn):
+    """Tablas base del sistema BCS (usuarios, contactos, sub-BCS, actividades)"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS roles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            description TEXT
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            role_id INTEGER,
+            email TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_active BOOLEAN DEFAULT 1,
+            FOREIGN KEY (role_id) REFERENCES roles (id)
+        )
+    ''')
+    # Columnas que usan los dashboards de admin y partner
+    add_column(conn, 'users', 'created_by_partner_id', 'INTEGER')
+    add_column(conn, 'users', 'role', "TEXT DEFAULT 'client'")
+    add_column(conn, 'users', 'status', "TEXT DEFAULT 'active'")
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS partners (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT NOT NULL,
+            empresa TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            telefono TEXT,
+            direccion TEXT,
+            estado TEXT DEFAULT 'activo',
+            fecha_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            notas TEXT,
+            user_id INTEGER,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+    add_column(conn, 'partners', 'user_id', 'INTEGER')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS contacts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            partner_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            company TEXT,
+            email TEXT,
+            phone TEXT,
+            position TEXT,
+            industry TEXT,
+            status TEXT DEFAULT 'active',
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_contact TIMESTAMP,
+            FOREIGN KEY (partner_id) REFERENCES users (id)
+        )
+    ''')
+    # Validación y conversión de contactos a usuarios
+    add_column(conn, 'contacts', 'validated', 'INTEGER DEFAULT 0')
+    add_column(conn, 'contacts', 'validation_date', 'TEXT')
+    add_column(conn, 'contacts', 'converted_to_user', 'INTEGER DEFAULT 0')
+    add_column(conn, 'contacts', 'converted_user_id', 'INTEGER')
+    add_column(conn, 'contacts', 'conversion_date', 'TEXT')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS client_sub_bcs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            partner_id INTEGER NOT NULL,
+            contact_id INTEGER,
+            client_name TEXT NOT NULL,
+            company_name TEXT NOT NULL,
+            bcs_type TEXT NOT NULL,
+            modules TEXT,
+            users_count INTEGER DEFAULT 1,
+            status TEXT DEFAULT 'active',
+            start_date DATE,
+            monthly_value REAL,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (partner_id) REFERENCES users (id),
+            FOREIGN KEY (contact_id) REFERENCES contacts (id)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS partner_sub_bcs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            partner_id INTEGER NOT NULL,
+            bcs_name TEXT NOT NULL,
+            bcs_type TEXT NOT NULL,
+            description TEXT,
+            modules TEXT,
+            status TEXT DEFAULT 'active',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            notes TEXT,
+            FOREIGN KEY (partner_id) REFERENCES users (id)
+        )
+    ''')
+
+    # Apps/plataformas de los clientes
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS user_sub_bcs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            partner_id INTEGER,
+            app_name TEXT NOT NULL,
+            app_description TEXT,
+            app_url TEXT NOT NULL,
+            app_icon TEXT DEFAULT '🚀',
+            app_type TEXT,
+            status TEXT DEFAULT 'active',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_accessed TIMESTAMP,
+            access_count INTEGER DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users (id),
+            FOREIGN KEY (partner_id) REFERENCES users (id)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS partner_activities (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            partner_id INTEGER NOT NULL,
+            contact_id INTEGER,
+            activity_type TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            description TEXT,
+            activity_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            follow_up_date DATE,
+            completed BOOLEAN DEFAULT 0,
+            FOREIGN KEY (partner_id) REFERENCES users (id),
+            FOREIGN KEY (contact_id) REFERENCES contacts (id)
+        )
+    ''')
+
+
+def bcs_seed_roles_and_admin(conn):
+    """Roles por defecto y usuario admin inicial"""
+    roles = [
+        ('admin', 'Administrador del sistema'),
+        ('partner', 'Socio comercial'),
+        ('cliente', 'Usuario cliente')
+    ]
+    conn.executemany('INSERT OR IGNORE INTO roles (name, description) VALUES (?, ?)', roles)
+
+    admin_role = conn.execute('SELECT id FROM roles WHERE name = ?', ('admin',)).fetchone()
+    if admin_role:
+        admin_password = hash_password("admin123")
+        admin_exists = conn.execute('SELECT id FROM users WHERE username = ?', ("admin",)).fetchone()
+        if admin_exists:
+            conn.execute(
+                'UPDATE users SET password_hash = ?, role_id = ? WHERE username = ?',
+                (admin_password, admin_role[0], "admin")
+            )
+        else:
+            conn.execute(
+                'INSERT INTO users (username, password_hash, role_id, email) VALUES (?, ?, ?, ?)',
+                ("admin", admin_password, admin_role[0], "admin@bcs.com")
+            )
+
+
+# Columnas que apuntan a users: filtros de los dashboards y borrado en cascada de usuarios
+BCS_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_contacts_partner ON contacts (partner_id)",
+    "CREATE INDEX IF NOT EXISTS idx_client_sub_bcs_partner ON client_sub_bcs (partner_id)",
+    "CREATE INDEX IF NOT EXISTS idx_partner_sub_bcs_partner ON partner_sub_bcs (partner_id)",
+    "CREATE INDEX IF NOT EXISTS idx_user_sub_bcs_user ON user_sub_bcs (user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_user_sub_bcs_partner ON user_sub_bcs (partner_id)",
+    "CREATE INDEX IF NOT EXISTS idx_partner_activities_partner ON partner_activities (partner_id)",
+)
+
+
+def bcs_add_indexes(conn):
+    for statement in BCS_INDEXES:
+        conn.execute(statement)
+
+
+def bcs_normalize_dates(conn):
+    # conversion_date se añadió como TEXT, pero guarda un instante
+    normalize_date_columns(conn, date_columns(conn) + [('contacts', 'conversion_date', 'datetime')])
+
+
+BCS_MIGRATIONS = [
+    (1, "Roles por defecto y usuario admin inicial", bcs_seed_roles_and_admin),
+    (2, "Índices sobre las columnas que apuntan a users", bcs_add_indexes),
+    (3, "Fechas en texto ISO-8601 UTC (utils/dates.py)", bcs_normalize_dates),
+]
+
+
+def ensure_bcs_schema(db_path=BCS_DB_PATH):
+    return ensure_schema(db_path, BCS_MIGRATIONS, bcs_bootstrap)
+
+
+# --- landing_leads.db ---
+
+def landing_bootstrap(conn):
+    """Almacén único de los formularios públicos (services/landing_leads.py)"""
+    # AUTOINCREMENT: los id nunca se reutilizan, la marca de agua de la sincronización sólo avanza
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS landing_leads (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source TEXT NOT NULL,
+            name TEXT,
+            email TEXT,
+            phone TEXT,
+            company TEXT,
+            sector TEXT,
+            country TEXT,
+            message TEXT,
+            created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            legacy_ref TEXT
+        )
+    ''')
+
+
+def landing_append_only(conn):
+    """Índices de consulta y triggers que impiden modificar o borrar filas"""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_landing_leads_email ON landing_leads (lower(email))")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_landing_leads_source_created ON landing_leads (source, created_at)")
+    # Importación de los almacenes anteriores: cada fila antigua una sola vez
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_landing_leads_legacy_ref ON landing_leads (legacy_ref)")
+    for action in ("UPDATE", "DELETE"):
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS landing_leads_no_{action.lower()}
+            BEFORE {action} ON landing_leads
+            BEGIN
+                SELECT RAISE(ABORT, 'landing_leads es de sólo inserción');
+            END
+        ''')
+
+
+LANDING_MIGRATIONS = [
+    (1, "Índices y triggers de sólo inserción de landing_leads", landing_append_only),
+]
+
+
+def ensure_landing_schema(db_path=LANDING_DB_PATH):
+    return ensure_schema(db_path, LANDING_MIGRATIONS, landing_bootstrap)
+
+
+def bootstrap(crm_path=CRM_DB_PATH, bcs_path=BCS_DB_PATH, landing_path=LANDING_DB_PATH):
+    """Crea/actualiza las bases con sus datos iniciales; devuelve {ruta: versiones aplicadas}"""
+    result = {}
+    for path, migrations, base in ((crm_path, CRM_MIGRATIONS, crm_bootstrap),
+                                   (bcs_path, BCS_MIGRATIONS, bcs_bootstrap),
+                                   (landing_path, LANDING_MIGRATIONS, landing_bootstrap)):
+        conn = get_connection(path)
+        try:
+            result[path] = run_migrations(conn, migrations, base)
+        finally:
+            conn.close()
+        refresh_schema(path)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crea el esquema y los datos iniciales de las bases BCS")
+    parser.add_argument("--crm", default=CRM_DB_PATH)
+    parser.add_argument("--bcs", default=BCS_DB_PATH)
+    parser.add_argument("--landing", default=LANDING_DB_PATH)
+    args = parser.parse_args()
+
+    for path, applied in bootstrap(args.crm, args.bcs, args.landing).items():
+        conn = get_connection(path)
+        try:
+            version = get_schema_version(conn)
+        finally:
+            conn.close()
+        detail = f"aplicadas {applied}" if applied else "ya estaba al día"
+        print(f"{path}: versión {version} ({detail})")
+
+
+if __name__ == "__main__":
+    main()
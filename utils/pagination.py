@@ -0,0 +1,104 @@
+"""
+Paginación por keyset (sort_column, id) para los listados del CRM.
+
+En lugar de OFFSET, cada página continúa desde la última fila de la
+anterior: WHERE (fecha, id) < (cursor) ORDER BY fecha DESC, id DESC.
+Con un índice (partner_id, fecha) cada página cuesta lo mismo sin
+importar cuántas se hayan cargado, y borrar o insertar filas no desplaza
+las páginas ya mostradas.
+"""
+import os
+from collections import namedtuple
+
+from utils.query_cache import cached_read_sql
+
+PAGE_SIZE = int(os.environ.get("BCS_PAGE_SIZE", 25))
+# El conteo se detiene aquí; por encima se muestra "N+"
+COUNT_CAP = 1000
+
+Page = namedtuple('Page', ['rows', 'next_cursor'])
+
+
+def _plain(value):
+    # numpy.int64 / numpy.float64 -> tipos de Python que sqlite3 sabe enlazar
+    value = value.item() if hasattr(value, 'item') else value
+    # pandas puede devolver NaN en lugar de None para un NULL
+    return None if isinstance(value, float) and value != value else value
+
+
+class KeysetQuery:
+    """
+    Consulta paginable ordenada por (sort_column, id_column) descendente.
+
+    table es la tabla principal con su alias ("leads l"); joins sólo se
+    usan al leer páginas. where sólo debe referirse a la tabla
+    principal para que count_estimate no necesite los JOIN.
+
+    nullable indica que sort_column puede ser NULL: esas filas van al final
+    (ORDER BY ... DESC) y se paginan sólo por id.
+    """
+
+    def __init__(self, columns, table, where, params, sort_column, id_column,
+                 joins='', sort_key=None, id_key='id', nullable=False):
+        self.columns = columns
+        self.table = table
+        self.where = where
+        self.params = list(params)
+        self.sort_column = sort_column
+        self.id_column = id_column
+        self.joins = joins
+        # Nombre de las columnas en el resultado (para construir el cursor)
+        self.sort_key = sort_key or sort_column.split('.')[-1]
+        self.id_key = id_key
+        self.nullable = nullable
+
+    def signature(self):
+        """Identifica la consulta con sus filtros; si cambia, los cursores guardados ya no valen"""
+        return (self.table, self.where, tuple(self.params), self.sort_column)
+
+    def page_sql(self, cursor=None, page_size=PAGE_SIZE):
+        where = self.where
+        params = list(self.params)
+        if cursor is not None:
+            sort_value, id_value = cursor
+            if sort_value is None:
+                where += f" AND {self.sort_column} IS NULL AND {self.id_column} < ?"
+                params.append(id_value)
+            elif self.nullable:
+                where += f" AND (({self.sort_column}, {self.id_column}) < (?, ?) OR {self.sort_column} IS NULL)"
+                params.extend(cursor)
+            else:
+                where += f" AND ({self.sort_column}, {self.id_column}) < (?, ?)"
+                params.extend(cursor)
+        sql = f"""
+            SELECT {self.columns}
+            FROM {self.table} {self.joins}
+            WHERE {where}
+            ORDER BY {self.sort_column} DESC, {self.id_column} DESC
+            LIMIT ?
+        """
+        # Una fila extra para saber si hay más páginas sin otra consulta
+        params.append(page_size + 1)
+        return sql, params
+
+    def fetch_page(self, conn, cursor=None, page_size=PAGE_SIZE):
+        sql, params = self.page_sql(cursor, page_size)
+        rows = cached_read_sql(sql, conn, params=params)
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows.iloc[:page_size]
+            last = rows.iloc[-1]
+            next_cursor = (_plain(last[self.sort_key]), _plain(last[self.id_key]))
+        return Page(rows, next_cursor)
+
+    def count_estimate(self, conn, cap=COUNT_CAP):
+        """
+        Cuenta las filas que cumplen el filtro recorriendo como mucho cap + 1
+        entradas del índice. Devuelve (total, exacto).
+        """
+        sql = f"SELECT COUNT(*) FROM (SELECT 1 FROM {self.table} WHERE {self.where} LIMIT ?)"
+        total = conn.execute(sql, self.params + [cap + 1]).fetchone()[0]
+        if total > cap:
+            return cap, False
+        return total, True
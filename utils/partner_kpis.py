@@ -0,0 +1,224 @@
+"""
+KPIs por partner materializados en crm_partner_bcs.db.
+
+La tabla partner_kpis guarda una fila por partner con los totales que
+muestran los dashboards. Los triggers sobre leads, opportunities y
+commissions aplican el delta de cada escritura, así que leer los KPIs
+cuesta una fila en lugar de agregar tablas completas.
+
+Uso:
+    python -m utils.partner_kpis            # verifica contra un recálculo completo
+    python -m utils.partner_kpis --rebuild  # recalcula la tabla y vuelve a verificar
+"""
+import argparse
+
+from utils.connection_pool import get_connection
+from utils.query_cache import add_dependency
+
+DB_PATH = 'crm_partner_bcs.db'
+
+KPI_COLUMNS = (
+    'leads_count',           # leads del partner
+    'open_opportunities',    # oportunidades con status = 'open'
+    'pipeline_value',        # SUM(total_value * probability / 100) de las abiertas
+    'active_commissions',    # SUM(commission_amount) de comisiones activas
+    'active_revenue',        # SUM(monthly_value) de comisiones activas
+)
+
+# Diferencias menores se deben al redondeo de sumas incrementales en REAL
+TOLERANCE = 0.01
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS partner_kpis (
+        partner_id INTEGER PRIMARY KEY,
+        leads_count INTEGER NOT NULL DEFAULT 0,
+        open_opportunities INTEGER NOT NULL DEFAULT 0,
+        pipeline_value REAL NOT NULL DEFAULT 0,
+        active_commissions REAL NOT NULL DEFAULT 0,
+        active_revenue REAL NOT NULL DEFAULT 0
+    )
+"""
+
+# Aporte de una fila a los KPIs, escrito para NEW/OLD dentro de los triggers
+_OPEN = "CASE WHEN {row}.status = 'open' THEN 1 ELSE 0 END"
+_PIPELINE = ("CASE WHEN {row}.status = 'open' "
+             "THEN COALESCE({row}.total_value * {row}.probability / 100, 0) ELSE 0 END")
+_COMMISSION = "CASE WHEN {row}.status = 'active' THEN COALESCE({row}.commission_amount, 0) ELSE 0 END"
+_REVENUE = "CASE WHEN {row}.status = 'active' THEN COALESCE({row}.monthly_value, 0) ELSE 0 END"
+
+# tabla -> (columnas que afectan a los KPIs, {columna KPI: aporte})
+_SOURCES = {
+    'leads': (
+        ('partner_id',),
+        {'leads_count': '1'},
+    ),
+    'opportunities': (
+        ('partner_id', 'status', 'total_value', 'probability'),
+        {'open_opportunities': _OPEN, 'pipeline_value': _PIPELINE},
+    ),
+    'commissions': (
+        ('partner_id', 'status', 'commission_amount', 'monthly_value'),
+        {'active_commissions': _COMMISSION, 'active_revenue': _REVENUE},
+    ),
+}
+
+
+def _add_delta(row, contributions, sign):
+    """UPSERT que suma (o resta) el aporte de NEW/OLD a la fila del partner"""
+    columns = ', '.join(contributions)
+    values = ', '.join(f"{sign}({expr.format(row=row)})" for expr in contributions.values())
+    updates = ', '.join(f"{column} = {column} + excluded.{column}" for column in contributions)
+    return f"""
+        INSERT INTO partner_kpis (partner_id, {columns})
+        SELECT {row}.partner_id, {values}
+        WHERE {row}.partner_id IS NOT NULL
+        ON CONFLICT(partner_id) DO UPDATE SET {updates};"""
+
+
+def _trigger_statements():
+    statements = []
+    for table, (watched, contributions) in _SOURCES.items():
+        add_new = _add_delta('NEW', contributions, '+')
+        remove_old = _add_delta('OLD', contributions, '-')
+        statements.append(f"""
+            CREATE TRIGGER IF NOT EXISTS partner_kpis_{table}_insert
+            AFTER INSERT ON {table}
+            BEGIN {add_new}
+            END""")
+        statements.append(f"""
+            CREATE TRIGGER IF NOT EXISTS partner_kpis_{table}_delete
+            AFTER DELETE ON {table}
+            BEGIN {remove_old}
+            END""")
+        statements.append(f"""
+            CREATE TRIGGER IF NOT EXISTS partner_kpis_{table}_update
+            AFTER UPDATE OF {', '.join(watched)} ON {table}
+            BEGIN {remove_old} {add_new}
+            END""")
+    return statements
+
+
+# Los triggers escriben en partner_kpis: invalidar sus lecturas cacheadas junto con la tabla fuente
+for _table in _SOURCES:
+    add_dependency(_table, 'partner_kpis')
+
+
+# Recálculo completo: una pasada agregada por tabla fuente
+RECOMPUTE_SQL = """
+    WITH lead_totals AS (
+        SELECT partner_id, COUNT(*) as leads_count
+        FROM leads WHERE partner_id IS NOT NULL
+        GROUP BY partner_id
+    ),
+    opportunity_totals AS (
+        SELECT partner_id,
+               COUNT(*) FILTER (WHERE status = 'open') as open_opportunities,
+               COALESCE(SUM(total_value * probability / 100) FILTER (WHERE status = 'open'), 0) as pipeline_value
+        FROM opportunities WHERE partner_id IS NOT NULL
+        GROUP BY partner_id
+    ),
+    commission_totals AS (
+        SELECT partner_id,
+               COALESCE(SUM(commission_amount) FILTER (WHERE status = 'active'), 0) as active_commissions,
+               COALESCE(SUM(monthly_value) FILTER (WHERE status = 'active'), 0) as active_revenue
+        FROM commissions WHERE partner_id IS NOT NULL
+        GROUP BY partner_id
+    ),
+    partner_ids AS (
+        SELECT partner_id FROM lead_totals
+        UNION SELECT partner_id FROM opportunity_totals
+        UNION SELECT partner_id FROM commission_totals
+    )
+    SELECT ids.partner_id,
+           COALESCE(l.leads_count, 0) as leads_count,
+           COALESCE(o.open_opportunities, 0) as open_opportunities,
+           COALESCE(o.pipeline_value, 0) as pipeline_value,
+           COALESCE(c.active_commissions, 0) as active_commissions,
+           COALESCE(c.active_revenue, 0) as active_revenue
+    FROM partner_ids ids
+    LEFT JOIN lead_totals l ON l.partner_id = ids.partner_id
+    LEFT JOIN opportunity_totals o ON o.partner_id = ids.partner_id
+    LEFT JOIN commission_totals c ON c.partner_id = ids.partner_id
+"""
+
+
+def install_partner_kpis(conn):
+    """
+    Crea la tabla y los triggers si faltan. Si la tabla es nueva la llena
+    con un recálculo completo. No hace commit: lo decide el llamador.
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'partner_kpis'"
+    ).fetchone()
+    conn.execute(SCHEMA)
+    for statement in _trigger_statements():
+        conn.execute(statement)
+    if not exists:
+        _fill(conn)
+
+
+def _fill(conn):
+    conn.execute("DELETE FROM partner_kpis")
+    conn.execute(f"""
+        INSERT INTO partner_kpis (partner_id, {', '.join(KPI_COLUMNS)})
+        {RECOMPUTE_SQL}
+    """)
+
+
+def rebuild_partner_kpis(conn):
+    """Recalcula partner_kpis desde cero en una sola transacción"""
+    with conn:
+        _fill(conn)
+
+
+def verify_partner_kpis(conn):
+    """
+    Compara partner_kpis con un recálculo completo.
+    Devuelve la lista de diferencias [(partner_id, kpi, guardado, esperado)];
+    vacía si la tabla está al día.
+    """
+    expected = {row[0]: row[1:] for row in conn.execute(RECOMPUTE_SQL)}
+    stored = {
+        row[0]: row[1:]
+        for row in conn.execute(f"SELECT partner_id, {', '.join(KPI_COLUMNS)} FROM partner_kpis")
+    }
+    zeros = (0,) * len(KPI_COLUMNS)
+
+    mismatches = []
+    for partner_id in sorted(expected.keys() | stored.keys()):
+        stored_values = stored.get(partner_id, zeros)
+        expected_values = expected.get(partner_id, zeros)
+        for column, got, want in zip(KPI_COLUMNS, stored_values, expected_values):
+            if abs((got or 0) - (want or 0)) > TOLERANCE:
+                mismatches.append((partner_id, column, got, want))
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica o reconstruye la tabla partner_kpis")
+    parser.add_argument('db', nargs='?', default=DB_PATH, help="ruta de crm_partner_bcs.db")
+    parser.add_argument('--rebuild', action='store_true', help="recalcula la tabla antes de verificar")
+    args = parser.parse_args()
+
+    conn = get_connection(args.db)
+    try:
+        with conn:
+            install_partner_kpis(conn)
+        if args.rebuild:
+            rebuild_partner_kpis(conn)
+            print("partner_kpis reconstruida")
+
+        mismatches = verify_partner_kpis(conn)
+    finally:
+        conn.close()
+
+    if mismatches:
+        for partner_id, column, got, want in mismatches:
+            print(f"partner {partner_id}: {column} = {got}, esperado {want}")
+        print(f"{len(mismatches)} diferencias; ejecuta con --rebuild para corregir")
+        raise SystemExit(1)
+    print("partner_kpis coincide con el recálculo completo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Hash de contraseñas con un KDF configurable.
+
+Los hashes se guardan como "<algoritmo>$<parámetros>$<sal>$<hash>", así
+que cada uno lleva su coste y se puede subir el factor de trabajo sin
+invalidar los existentes: verify_password acepta cualquier formato
+conocido y devuelve el hash nuevo cuando el guardado está por debajo de
+la configuración actual. Los SHA-256 sin sal de versiones anteriores
+(64 caracteres hex) se aceptan igual y siempre piden re-hash.
+
+Configuración por entorno:
+    BCS_PASSWORD_HASHER     pbkdf2_sha256 (por defecto) o scrypt
+    BCS_PBKDF2_ITERATIONS   iteraciones de PBKDF2-HMAC-SHA256 (600000)
+    BCS_SCRYPT_N            coste de scrypt, potencia de 2 (2**15)
+
+Para dimensionar el factor de trabajo: python -m benchmarks.password_hashing
+"""
+import base64
+import hashlib
+import hmac
+import os
+import re
+import secrets
+from collections import namedtuple
+
+PBKDF2_ITERATIONS = int(os.environ.get("BCS_PBKDF2_ITERATIONS", 600_000))
+SCRYPT_N = int(os.environ.get("BCS_SCRYPT_N", 2 ** 15))
+SALT_BYTES = 16
+
+# valid: la contraseña es correcta; new_hash: hash a guardar en su lugar (o None)
+PasswordCheck = namedtuple('PasswordCheck', ['valid', 'new_hash'])
+
+
+def _b64(data):
+    return base64.b64encode(data).decode('ascii').rstrip('=')
+
+
+def _unb64(text):
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+
+class Pbkdf2Hasher:
+    """PBKDF2-HMAC-SHA256: pbkdf2_sha256$<iteraciones>$<sal>$<hash>"""
+
+    algorithm = 'pbkdf2_sha256'
+
+    def __init__(self, iterations=PBKDF2_ITERATIONS):
+        self.iterations = iterations
+
+    def encode(self, password, salt=None):
+        salt = salt or secrets.token_bytes(SALT_BYTES)
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, self.iterations)
+        return f"{self.algorithm}${self.iterations}${_b64(salt)}${_b64(digest)}"
+
+    def verify(self, password, encoded):
+        _, iterations, salt, digest = encoded.split('$')
+        candidate = hashlib.pbkdf2_hmac('sha256', password.encode(), _unb64(salt), int(iterations))
+        return hmac.compare_digest(candidate, _unb64(digest))
+
+    def needs_rehash(self, encoded):
+        return int(encoded.split('$')[1]) < self.iterations
+
+
+class ScryptHasher:
+    """scrypt (memoria-dura): scrypt$<n>,<r>,<p>$<sal>$<hash>"""
+
+    algorithm = 'scrypt'
+
+    def __init__(self, n=SCRYPT_N, r=8, p=1):
+        self.n, self.r, self.p = n, r, p
+
+    def _derive(self, password, salt, n, r, p):
+        # maxmem holgado: scrypt necesita 128 * n * r bytes
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r, dklen=32)
+
+    def encode(self, password, salt=None):
+        salt = salt or secrets.token_bytes(SALT_BYTES)
+        digest = self._derive(password, salt, self.n, self.r, self.p)
+        return f"{self.algorithm}${self.n},{self.r},{self.p}${_b64(salt)}${_b64(digest)}"
+
+    def verify(self, password, encoded):
+        _, params, salt, digest = encoded.split('$')
+        n, r, p = (int(value) for value in params.split(','))
+        return hmac.compare_digest(self._derive(password, _unb64(salt), n, r, p), _unb64(digest))
+
+    def needs_rehash(self, encoded):
+        n, r, p = (int(value) for value in encoded.split('$')[1].split(','))
+        return (n, r, p) < (self.n, self.r, self.p)
+
+
+class LegacySha256Hasher:
+    """SHA-256 sin sal de las versiones anteriores: sólo para verificar"""
+
+    algorithm = 'sha256'
+    pattern = re.compile(r'^[0-9a-f]{64}$')
+
+    def encode(self, password, salt=None):
+        return hashlib.sha256(password.encode()).hexdigest()
+
+    def verify(self, password, encoded):
+        return hmac.compare_digest(self.encode(password), encoded)
+
+    def needs_rehash(self, encoded):
+        return True
+
+
+HASHERS = {hasher.algorithm: hasher for hasher in (Pbkdf2Hasher, ScryptHasher)}
+
+_default_hasher = HASHERS[os.environ.get("BCS_PASSWORD_HASHER", Pbkdf2Hasher.algorithm)]()
+_legacy_hasher = LegacySha256Hasher()
+
+
+def get_default_hasher():
+    return _default_hasher
+
+
+def set_default_hasher(hasher):
+    """Cambia el hasher de hash_password (p. ej. otro factor de trabajo); devuelve el anterior"""
+    global _default_hasher
+    previous, _default_hasher = _default_hasher, hasher
+    return previous
+
+
+def identify_hasher(encoded):
+    """Hasher capaz de verificar encoded, o None si el formato no es conocido"""
+    if not encoded:
+        return None
+    if LegacySha256Hasher.pattern.match(encoded):
+        return _legacy_hasher
+    algorithm = encoded.split('$', 1)[0]
+    if algorithm == _default_hasher.algorithm:
+        return _default_hasher
+    hasher_class = HASHERS.get(algorithm)
+    return hasher_class() if hasher_class else None
+
+
+def hash_password(password):
+    return _default_hasher.encode(password)
+
+
+def verify_password(password, encoded):
+    """
+    Comprueba password contra encoded. Si es correcta y encoded usa otro
+    algoritmo o un coste menor que el actual, new_hash trae el hash a guardar.
+    """
+    hasher = identify_hasher(encoded)
+    if hasher is None:
+        # Mismo coste que un usuario real, para no revelar qué cuentas existen
+        _default_hasher.encode(password)
+        return PasswordCheck(False, None)
+    try:
+        valid = hasher.verify(password, encoded)
+    except (ValueError, TypeError):
+        return PasswordCheck(False, None)
+    if not valid:
+        return PasswordCheck(False, None)
+
+    stale = hasher.algorithm != _default_hasher.algorithm or _default_hasher.needs_rehash(encoded)
+    return PasswordCheck(True, hash_password(password) if stale else None)
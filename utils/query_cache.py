@@ -0,0 +1,237 @@
+"""
+Caché de lecturas para los dashboards, invalidada por escrituras.
+
+Cada tabla tiene un contador de versión por base de datos. Las conexiones
+del pool anotan qué tablas modifica cada INSERT/UPDATE/DELETE y suben su
+versión al hacer commit. La clave de caché es (base, consulta, parámetros,
+versiones de las tablas leídas): tras una escritura las entradas viejas
+dejan de coincidir y salen por LRU o TTL.
+
+Dentro de una transacción abierta (o con escrituras sin publicar) la
+caché no se usa: la conexión ve sus propios cambios antes del commit y
+una entrada cacheada no los tendría.
+
+El TTL acota lo desactualizado que puede quedar un dato escrito desde
+fuera de este proceso (otra app Streamlit, sqlite3 a mano).
+"""
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_SIZE = int(os.environ.get("BCS_QUERY_CACHE_SIZE", 256))
+CACHE_TTL = float(os.environ.get("BCS_QUERY_CACHE_TTL", 300))
+
+_WRITE_RE = re.compile(
+    r"^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)"
+    r"\s+[\"`\[]?(\w+)",
+    re.IGNORECASE,
+)
+# Comentarios al inicio de la sentencia y cabecera de cada CTE: nombre [(columnas)] AS [NOT] [MATERIALIZED] (
+_COMMENT_RE = re.compile(r"\s*(?:--[^\n]*(?:\n|$)|/\*.*?\*/)", re.DOTALL)
+_WITH_RE = re.compile(r"\s*WITH(?:\s+RECURSIVE)?\b", re.IGNORECASE)
+_CTE_RE = re.compile(
+    r"\s*[\"`\[]?\w+[\"`\]]?\s*(?:\([^)]*\)\s*)?AS\s+(?:NOT\s+)?(?:MATERIALIZED\s+)?\(",
+    re.IGNORECASE,
+)
+_READ_RE = re.compile(r"\b(?:FROM|JOIN)\s+[\"`\[]?(\w+)", re.IGNORECASE)
+
+# --- versiones por tabla ---
+
+_versions = {}              # (ruta_db, tabla) -> versión
+_dependents = {}            # tabla -> tablas derivadas (p.ej. las que mantiene un trigger)
+_versions_lock = threading.Lock()
+
+
+def _db_key(db_path):
+    return os.path.abspath(str(db_path))
+
+
+def add_dependency(table, dependent):
+    """Escribir en table también invalida dependent (tablas mantenidas por triggers)"""
+    with _versions_lock:
+        _dependents.setdefault(table.lower(), set()).add(dependent.lower())
+
+
+def _skip_comments(sql, pos=0):
+    match = _COMMENT_RE.match(sql, pos)
+    while match:
+        pos = match.end()
+        match = _COMMENT_RE.match(sql, pos)
+    return pos
+
+
+def _after_parens(sql, pos):
+    """Posición siguiente al ')' que cierra el '(' de sql[pos] (ignora paréntesis entre comillas)"""
+    depth, quote = 0, None
+    for index in range(pos, len(sql)):
+        char = sql[index]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return index + 1
+    return len(sql)
+
+
+def _main_statement(sql):
+    """La sentencia sin comentarios iniciales ni la cláusula WITH que la precede"""
+    pos = _skip_comments(sql)
+    with_clause = _WITH_RE.match(sql, pos)
+    if with_clause is None:
+        return sql[pos:]
+    pos = with_clause.end()
+    while True:
+        cte = _CTE_RE.match(sql, _skip_comments(sql, pos))
+        if cte is None:
+            return sql[pos:]
+        pos = _skip_comments(sql, _after_parens(sql, cte.end() - 1))
+        if not sql.startswith(',', pos):
+            return sql[pos:]
+        pos += 1
+
+
+def written_table(sql):
+    """Tabla que modifica una sentencia INSERT/UPDATE/DELETE (también tras WITH o comentarios), o None"""
+    match = _WRITE_RE.match(_main_statement(sql))
+    return match.group(1).lower() if match else None
+
+
+def invalidate(db_path, *tables):
+    """Sube la versión de las tablas (y sus derivadas) de db_path"""
+    db = _db_key(db_path)
+    with _versions_lock:
+        pending = [table.lower() for table in tables]
+        seen = set()
+        while pending:
+            table = pending.pop()
+            if table in seen:
+                continue
+            seen.add(table)
+            _versions[(db, table)] = _versions.get((db, table), 0) + 1
+            pending.extend(_dependents.get(table, ()))
+    _cache.stats_add('invalidations', len(seen))
+
+
+def table_versions(db_path, tables):
+    db = _db_key(db_path)
+    with _versions_lock:
+        return tuple(_versions.get((db, table), 0) for table in tables)
+
+
+def read_tables(sql):
+    return tuple(sorted({table.lower() for table in _READ_RE.findall(sql)}))
+
+
+# --- caché LRU con TTL ---
+
+class QueryCache:
+    def __init__(self, max_entries=CACHE_SIZE, ttl=CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()     # clave -> (expira, valor)
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,        # entrada encontrada pero con el TTL vencido
+            'evictions': 0,      # expulsadas por LRU
+            'invalidations': 0,  # versiones de tabla subidas
+            'bypassed': 0,       # lecturas dentro de una transacción, sin caché
+        }
+
+    def stats_add(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def get_or_load(self, key, loader):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > now:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return value
+                del self._entries[key]
+                self.stats['expired'] += 1
+            self.stats['misses'] += 1
+
+        # La consulta se ejecuta fuera del lock: dos hilos pueden cargar la misma clave
+        value = loader()
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self):
+        with self._lock:
+            data = dict(self.stats)
+            data['entries'] = len(self._entries)
+        data['max_entries'] = self.max_entries
+        data['ttl'] = self.ttl
+        total = data['hits'] + data['misses']
+        data['hit_rate'] = data['hits'] / total if total else 0.0
+        return data
+
+
+_cache = QueryCache()
+
+
+def _connection_path(conn):
+    path = getattr(conn, 'db_path', None)
+    if path is None:
+        # Conexión fuera del pool: se pregunta a SQLite por el archivo
+        path = conn.execute("PRAGMA database_list").fetchone()[2]
+    return path
+
+
+def _params_key(params):
+    if params is None:
+        return ()
+    if isinstance(params, dict):
+        return tuple(sorted(params.items()))
+    return tuple(params)
+
+
+def cached_read_sql(sql, conn, params=None, tables=None):
+    """
+    Igual que pd.read_sql_query pero cacheado. Las tablas leídas se deducen
+    de FROM/JOIN salvo que se indiquen en tables. Devuelve una copia para
+    que el llamador pueda modificar el DataFrame sin tocar la caché.
+    Con una transacción abierta se lee directamente de la base.
+    """
+    import pandas as pd
+
+    if conn.in_transaction or getattr(conn, '_written', None):
+        _cache.stats_add('bypassed')
+        return pd.read_sql_query(sql, conn, params=params)
+
+    db_path = _connection_path(conn)
+    tables = tuple(tables) if tables is not None else read_tables(sql)
+    key = (_db_key(db_path), sql, _params_key(params), tables, table_versions(db_path, tables))
+    df = _cache.get_or_load(key, lambda: pd.read_sql_query(sql, conn, params=params))
+    return df.copy()
+
+
+def cache_stats():
+    return _cache.snapshot()
+
+
+def clear_cache():
+    _cache.clear()
@@ -0,0 +1,262 @@
+"""
+Regresión de planes de consulta del CRM.
+
+Ejecuta EXPLAIN QUERY PLAN sobre las consultas de los dashboards y falla
+si alguna recorre una tabla completa (SCAN sin índice). Sirve para
+detectar consultas nuevas o cambios de esquema que se quedan sin índice.
+
+Las consultas no se copian aquí: se graban llamando a los mismos métodos
+de repositorio que usan las páginas (DASHBOARD_CALLS) con una conexión
+QueryRecorder que anota cada sentencia en lugar de ejecutarla. Si un
+servicio cambia su SQL, la comprobación mide el SQL nuevo.
+
+Por defecto se comprueba sobre una copia vacía del esquema (sin
+sqlite_stat1): el planificador asume tablas grandes, así que el
+resultado depende de los índices y no de cuántas filas tenga hoy la base.
+Con --with-stats se usa la base real con sus estadísticas de ANALYZE; ahí
+un SCAN sobre una tabla de menos de SMALL_TABLE_ROWS filas no cuenta: con
+tan pocas filas recorrerla es lo que elige el planificador aunque el
+índice exista.
+
+Uso:
+    python -m utils.query_plans [ruta crm_partner_bcs.db] [--with-stats]
+"""
+import argparse
+import re
+import sqlite3
+from contextlib import contextmanager
+
+from services.activities import ActivityRepository
+from services.commissions import CommissionRepository
+from services.leads import LeadRepository
+from services.opportunities import OpportunityRepository
+from services.partners import PartnerRepository
+from utils.connection_pool import get_connection
+from utils.migrations import ensure_crm_schema
+
+DB_PATH = 'crm_partner_bcs.db'
+
+# Con --with-stats, tablas más pequeñas que esto se pueden recorrer enteras
+SMALL_TABLE_ROWS = 1000
+
+# Valores de ejemplo para grabar las consultas (el benchmark usa los de su conjunto de datos)
+EXAMPLE_CONTEXT = {
+    'partner_id': 1,
+    'lead_id': 1,
+    'opportunity_id': 1,
+    'since': '2024-01-01',
+    'cursor_date': '2024-06-01',
+    'cursor_id': 100,
+}
+
+
+class QueryRecorder:
+    """
+    Conexión que anota (sql, params) en lugar de ejecutar. Las lecturas
+    devuelven vacío y las escrituras 0 filas, así que un método de
+    repositorio recorre su camino normal sin tocar ninguna base.
+    """
+
+    rowcount = 0
+    lastrowid = None
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, sql, params=()):
+        self.statements.append((sql, params))
+        return self
+
+    def fetchone(self):
+        return None
+
+    def fetchall(self):
+        return []
+
+    def __iter__(self):
+        return iter(())
+
+    # with conn: (Repository.transaction)
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def record(repository, call):
+    """[(sql, params)] que ejecuta call(repository); repository se reconecta a un QueryRecorder"""
+    recorder = QueryRecorder()
+
+    @contextmanager
+    def connection():
+        yield recorder
+
+    repository.connection = connection
+    # read y fetch_stats necesitan filas reales (DataFrame, cursor.description): sólo se anota su SQL
+    repository.read = lambda sql, params=None: recorder.execute(sql, params or ())
+    repository.fetch_stats = lambda record_type, query, params=None: recorder.execute(query.sql, params or {})
+    call(repository)
+    return recorder.statements
+
+
+def page(query, ctx):
+    """SQL de la segunda página de un KeysetQuery, con el cursor de ctx"""
+    return query.page_sql((ctx['cursor_date'], ctx['cursor_id']))
+
+
+# (página, repositorio, llamada(repo, ctx)): lo que ejecuta cada página con los filtros por partner
+DASHBOARD_CALLS = [
+    ("show_dashboard: KPIs del partner", PartnerRepository,
+     lambda repo, ctx: repo.kpis(ctx['partner_id'])),
+    ("show_dashboard: pipeline por etapa", OpportunityRepository,
+     lambda repo, ctx: repo.stage_summary(ctx['partner_id'])),
+    ("show_dashboard: leads por fuente", LeadRepository,
+     lambda repo, ctx: repo.by_source(ctx['partner_id'])),
+    ("show_dashboard: actividades recientes", ActivityRepository,
+     lambda repo, ctx: repo.recent(ctx['partner_id'])),
+    ("show_admin_dashboard: actividad reciente del sistema", ActivityRepository,
+     lambda repo, ctx: repo.recent_system()),
+    ("show_leads_list", LeadRepository,
+     lambda repo, ctx: repo.read(*page(repo.page_query(ctx['partner_id'], status='new', since=ctx['since']), ctx))),
+    ("show_leads_analytics: KPIs", LeadRepository,
+     lambda repo, ctx: repo.stats(ctx['partner_id'])),
+    ("show_leads_analytics: tendencia", LeadRepository,
+     lambda repo, ctx: repo.daily_trend(ctx['partner_id'])),
+    ("show_opportunities_pipeline", OpportunityRepository,
+     lambda repo, ctx: repo.pipeline(ctx['partner_id'])),
+    ("show_opportunities_analytics: KPIs", OpportunityRepository,
+     lambda repo, ctx: repo.stats(ctx['partner_id'])),
+    ("show_opportunities_analytics: pipeline por solución", OpportunityRepository,
+     lambda repo, ctx: repo.by_solution(ctx['partner_id'])),
+    ("show_activities_list", ActivityRepository,
+     lambda repo, ctx: repo.read(*page(repo.page_query(ctx['partner_id'], since=ctx['since']), ctx))),
+    ("show_commissions_dashboard: KPIs", CommissionRepository,
+     lambda repo, ctx: repo.stats(ctx['partner_id'])),
+    ("show_commissions_dashboard: evolución", CommissionRepository,
+     lambda repo, ctx: repo.monthly_trend(ctx['partner_id'])),
+    ("show_commissions_dashboard: top clientes", CommissionRepository,
+     lambda repo, ctx: repo.top_clients(ctx['partner_id'])),
+    ("show_commissions_history", CommissionRepository,
+     lambda repo, ctx: repo.read(*page(repo.page_query(ctx['partner_id']), ctx))),
+    ("delete_lead", LeadRepository,
+     lambda repo, ctx: repo.delete(ctx['lead_id'])),
+    ("delete_opportunity", OpportunityRepository,
+     lambda repo, ctx: repo.delete(ctx['opportunity_id'])),
+]
+
+# Listados globales del administrador: recorren todas las filas por diseño, no se comprueban
+ADMIN_CALLS = [
+    ("show_admin_dashboard: KPIs", PartnerRepository, lambda repo, ctx: repo.admin_kpis()),
+    ("show_admin_dashboard: top partners", PartnerRepository, lambda repo, ctx: repo.top()),
+    ("show_admin_dashboard: leads por industria", LeadRepository, lambda repo, ctx: repo.industry_distribution()),
+    ("show_partners_list", PartnerRepository, lambda repo, ctx: repo.list_with_totals()),
+    ("show_partners_performance", PartnerRepository, lambda repo, ctx: repo.performance()),
+]
+
+
+def recorded_queries(calls, ctx=EXAMPLE_CONTEXT, db_path=DB_PATH):
+    """
+    [(página, sql, params)] de cada llamada; las que ejecutan varias
+    sentencias (los borrados en cascada) dan una entrada por sentencia.
+    """
+    queries = []
+    for name, repository_type, call in calls:
+        statements = record(repository_type(db_path), lambda repo: call(repo, ctx))
+        for number, (sql, params) in enumerate(statements, 1):
+            label = name if len(statements) == 1 else f"{name} ({number}/{len(statements)})"
+            queries.append((label, sql, params))
+    return queries
+
+
+DASHBOARD_QUERIES = recorded_queries(DASHBOARD_CALLS)
+
+# FROM tabla [AS] alias / JOIN tabla [AS] alias
+_TABLE_RE = re.compile(r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+
+
+def full_scans(conn, sql, params=()):
+    """Devuelve los pasos del plan que recorren una tabla completa"""
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    scans = []
+    for _id, _parent, _unused, detail in plan:
+        if (detail.startswith('SCAN ') and 'USING' not in detail and 'VIRTUAL TABLE' not in detail
+                and detail != 'SCAN CONSTANT ROW'):
+            scans.append(detail)
+    return scans
+
+
+def table_rows(conn):
+    """{tabla: filas} según sqlite_stat1; vacío si no se ha ejecutado ANALYZE"""
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone():
+        return {}
+    # stat empieza por el número de filas de la tabla
+    return dict(conn.execute("SELECT tbl, MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 GROUP BY tbl"))
+
+
+def scanned_table(sql, detail):
+    """Tabla del paso 'SCAN <tabla o alias>' del plan de sql"""
+    name = detail.split()[1]
+    for table, alias in _TABLE_RE.findall(sql):
+        if name in (table, alias):
+            return table
+    return name
+
+
+def schema_copy(conn):
+    """Base en memoria con las mismas tablas e índices, sin datos ni estadísticas"""
+    copy = sqlite3.connect(':memory:')
+    rows = conn.execute("""
+        SELECT sql FROM sqlite_master
+        WHERE type IN ('table', 'index') AND sql IS NOT NULL AND name NOT LIKE 'sqlite_%'
+        ORDER BY type = 'index'
+    """).fetchall()
+    for (sql,) in rows:
+        copy.execute(sql)
+    return copy
+
+
+def check_query_plans(conn, queries=DASHBOARD_QUERIES, min_rows=0):
+    """
+    Lista de (página, paso del plan) que hacen full scan; vacía si todo usa índices.
+    Con min_rows se ignoran los SCAN de tablas que según sqlite_stat1 tienen menos filas.
+    """
+    rows = table_rows(conn) if min_rows else {}
+    failures = []
+    for name, sql, params in queries:
+        for detail in full_scans(conn, sql, params):
+            table = scanned_table(sql, detail)
+            if table in rows and rows[table] < min_rows:
+                continue
+            failures.append((name, detail))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comprueba que las consultas del CRM usan índices")
+    parser.add_argument('db', nargs='?', default=DB_PATH, help="ruta de crm_partner_bcs.db")
+    parser.add_argument('--with-stats', action='store_true',
+                        help="usar la base real con sus estadísticas en lugar de una copia del esquema")
+    args = parser.parse_args()
+
+    ensure_crm_schema(args.db)
+    conn = get_connection(args.db)
+    try:
+        if args.with_stats:
+            failures = check_query_plans(conn, min_rows=SMALL_TABLE_ROWS)
+        else:
+            copy = schema_copy(conn)
+            failures = check_query_plans(copy)
+            copy.close()
+    finally:
+        conn.close()
+
+    if failures:
+        for name, detail in failures:
+            print(f"FULL SCAN en {name}: {detail}")
+        raise SystemExit(1)
+    print(f"{len(DASHBOARD_QUERIES)} consultas usan índices")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Registro del esquema de las bases, cargado una vez por proceso.
+
+El código que necesita saber qué columnas tiene una tabla lo consulta
+aquí en lugar de lanzar PRAGMA table_info en cada llamada. La primera
+consulta de una base lee todas sus tablas con una sola sentencia; las
+siguientes son búsquedas en memoria.
+
+Las migraciones (utils/migrations.py) llaman a refresh() al terminar,
+así que el registro refleja siempre el esquema ya migrado. Las propias
+migraciones sí leen PRAGMA table_info: necesitan el esquema a mitad de
+cambio.
+
+require_columns permite escribir INSERT/SELECT estáticos contra el
+esquema de las migraciones y fallar con un mensaje claro si la base está
+atrasada, en vez de construir la sentencia según las columnas que haya.
+"""
+import os
+import threading
+
+from utils.connection_pool import get_connection
+
+_schemas = {}
+_lock = threading.Lock()
+
+
+def _key(db_path):
+    return os.path.abspath(str(db_path))
+
+
+def _load(db_path):
+    conn = get_connection(db_path)
+    try:
+        rows = conn.execute("""
+            SELECT m.name, p.name
+            FROM sqlite_master m, pragma_table_info(m.name) p
+            WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+            ORDER BY m.name, p.cid
+        """).fetchall()
+    finally:
+        conn.close()
+    tables = {}
+    for table, column in rows:
+        tables.setdefault(table, []).append(column)
+    return {table: tuple(columns) for table, columns in tables.items()}
+
+
+def tables(db_path):
+    """{tabla: (columnas en orden)} de db_path"""
+    key = _key(db_path)
+    schema = _schemas.get(key)
+    if schema is None:
+        with _lock:
+            schema = _schemas.get(key)
+            if schema is None:
+                schema = _schemas[key] = _load(db_path)
+    return schema
+
+
+def columns(db_path, table):
+    """Columnas de table en orden; () si la tabla no existe"""
+    return tables(db_path).get(table, ())
+
+
+def has_table(db_path, table):
+    return table in tables(db_path)
+
+
+def has_column(db_path, table, column):
+    return column in columns(db_path, table)
+
+
+def require_columns(db_path, table, required):
+    """Lanza RuntimeError si a table le falta alguna de las columnas required"""
+    missing = [column for column in required if not has_column(db_path, table, column)]
+    if missing:
+        raise RuntimeError(
+            f"{db_path}: a {table} le faltan las columnas {', '.join(missing)}; "
+            f"ejecuta python -m utils.migrations"
+        )
+
+
+def refresh(db_path=None):
+    """Olvida el esquema guardado de db_path (o de todas las bases); se relee en la siguiente consulta"""
+    with _lock:
+        if db_path is None:
+            _schemas.clear()
+        else:
+            _schemas.pop(_key(db_path), None)
@@ -0,0 +1,87 @@
+"""
+Tokens de sesión en memoria del proceso.
+
+Tras un login correcto se emite un token aleatorio asociado al usuario y
+se guarda sólo en st.session_state, en el servidor: nunca en la URL, donde
+quedaría en el historial, en los enlaces compartidos, en el Referer y en
+los logs de los proxies. Cada rerun comprueba el token con una búsqueda
+en un dict (caducidad y revocación) en lugar de volver a pasar por el KDF
+de utils/passwords.py. Recargar la página abre una sesión nueva de
+Streamlit y pide login otra vez.
+
+Las cachés viven en este módulo y no en el script de Streamlit, que se
+vuelve a ejecutar entero en cada rerun. Cada aplicación usa la suya:
+get_token_cache('crm'), get_token_cache('bcs').
+
+Configuración por entorno:
+    BCS_SESSION_TTL           vida de un token en segundos (8 horas)
+    BCS_SESSION_MAX_TOKENS    tokens vivos como máximo; se descartan los más antiguos
+"""
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+SESSION_TTL = int(os.environ.get("BCS_SESSION_TTL", 8 * 3600))
+MAX_TOKENS = int(os.environ.get("BCS_SESSION_MAX_TOKENS", 10_000))
+
+
+class SessionTokenCache:
+    """token -> (user_id, datos del usuario, caducidad), con TTL y tamaño máximo"""
+
+    def __init__(self, ttl=SESSION_TTL, max_tokens=MAX_TOKENS):
+        self.ttl = ttl
+        self.max_tokens = max_tokens
+        self._tokens = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def issue(self, user_id, user):
+        token = secrets.token_urlsafe(32)
+        with self._lock:
+            self._tokens[token] = (user_id, dict(user), time.monotonic() + self.ttl)
+            while len(self._tokens) > self.max_tokens:
+                self._tokens.popitem(last=False)
+        return token
+
+    def get(self, token):
+        """Copia de los datos del usuario del token, o None si no existe o caducó"""
+        if not token:
+            return None
+        with self._lock:
+            entry = self._tokens.get(token)
+            if entry is not None and entry[2] < time.monotonic():
+                del self._tokens[token]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return dict(entry[1])
+
+    def revoke(self, token):
+        with self._lock:
+            self._tokens.pop(token, None)
+
+    def revoke_user(self, user_id):
+        """Cierra todas las sesiones del usuario (cambio de contraseña, suspensión, borrado)"""
+        with self._lock:
+            for token in [t for t, entry in self._tokens.items() if entry[0] == user_id]:
+                del self._tokens[token]
+
+    def stats(self):
+        with self._lock:
+            return {'tokens': len(self._tokens), 'hits': self.hits, 'misses': self.misses}
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_token_cache(name):
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = SessionTokenCache()
+        return _caches[name]
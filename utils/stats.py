@@ -0,0 +1,24 @@
+class StatsQuery:
+    """
+    Conjunto de KPIs calculados en una sola sentencia SQL.
+
+    La sentencia debe devolver una única fila; cada columna es un KPI.
+    Los parámetros van con nombre (:partner_id, :user_id...) para poder
+    reutilizarlos en todos los CTE sin repetirlos.
+    """
+
+    def __init__(self, sql, defaults=None):
+        self.sql = sql
+        self.defaults = defaults or {}
+
+    def fetch(self, conn, params=None):
+        """Ejecuta la consulta y devuelve {kpi: valor} en un solo viaje a la base"""
+        cursor = conn.execute(self.sql, params or {})
+        row = cursor.fetchone()
+        columns = [description[0] for description in cursor.description]
+        values = row if row is not None else (None,) * len(columns)
+
+        stats = {}
+        for column, value in zip(columns, values):
+            stats[column] = self.defaults.get(column, 0) if value is None else value
+        return stats
@@ -0,0 +1,49 @@
+"""
+Tabla con selección de fila para los listados de los dashboards.
+
+En lugar de un expander con botones por fila, se pinta un único
+st.dataframe con selección de una fila y la página muestra un solo panel
+de detalle/edición para la fila elegida. El número de widgets por página
+es constante aunque la tabla tenga miles de filas.
+
+Requiere streamlit >= 1.35 (st.dataframe con on_select).
+"""
+import streamlit as st
+
+
+def select_row(df, key, columns=None, column_config=None, height=None):
+    """
+    Muestra df en una tabla con selección de una sola fila.
+
+    columns limita (y ordena) las columnas visibles; column_config se pasa
+    tal cual a st.dataframe para renombrar o dar formato. Devuelve la fila
+    seleccionada del DataFrame completo (con todas sus columnas) o None.
+    """
+    visible = df[columns] if columns else df
+    options = {}
+    if height is not None:
+        options['height'] = height
+
+    event = st.dataframe(
+        visible,
+        key=key,
+        on_select="rerun",
+        selection_mode="single-row",
+        hide_index=True,
+        use_container_width=True,
+        column_config=column_config,
+        **options,
+    )
+
+    selected = event.selection.rows
+    if not selected or selected[0] >= len(df):
+        # Sin selección, o la fila ya no existe tras recargar los datos
+        return None
+    return df.iloc[selected[0]]
+
+
+def detail_panel(title):
+    """Contenedor con borde para el detalle de la fila seleccionada"""
+    panel = st.container(border=True)
+    panel.markdown(f"#### {title}")
+    return panel
@@ -0,0 +1,209 @@
+"""
+Series temporales de los gráficos de tendencia materializadas en crm_partner_bcs.db.
+
+    lead_daily_counts           leads creados por partner y día (show_leads_analytics)
+    commission_monthly_totals   comisiones por partner y mes de inicio (show_commissions_dashboard)
+
+Agrupar por date(created_date) o strftime('%Y-%m', start_date) no puede
+usar ningún índice y recorre todo el histórico del partner en cada
+render. Aquí cada bucket es una fila con clave primaria (partner_id,
+periodo): los triggers de leads y commissions aplican el delta de cada
+escritura, y un gráfico lee como mucho 31 días o 13 meses por rango
+sobre la clave, tenga el partner el histórico que tenga.
+
+Los buckets que se quedan a cero se borran, así que la tabla sólo tiene
+periodos con datos, igual que el GROUP BY al que sustituye.
+
+Uso:
+    python -m utils.time_series            # verifica contra un recálculo completo
+    python -m utils.time_series --rebuild  # rellena las tablas desde cero y vuelve a verificar
+"""
+import argparse
+from collections import namedtuple
+
+from utils.connection_pool import get_connection
+from utils.query_cache import add_dependency
+
+DB_PATH = 'crm_partner_bcs.db'
+
+# Diferencias menores se deben al redondeo de sumas incrementales en REAL
+TOLERANCE = 0.01
+
+# table: tabla materializada; period: columna del bucket; source: tabla de origen
+# bucket: expresión del periodo sobre {row}; watched: columnas que lo cambian
+# measures: {columna: aporte de {row}}; la primera cuenta filas y decide si el bucket existe
+Rollup = namedtuple('Rollup', ['table', 'period', 'source', 'bucket', 'watched', 'measures'])
+
+ROLLUPS = (
+    Rollup(
+        'lead_daily_counts', 'day', 'leads',
+        "date({row}.created_date)",
+        ('partner_id', 'created_date'),
+        {'leads_count': ('INTEGER', '1')},
+    ),
+    Rollup(
+        'commission_monthly_totals', 'month', 'commissions',
+        "strftime('%Y-%m', {row}.start_date)",
+        ('partner_id', 'start_date', 'commission_amount'),
+        {
+            'commissions_count': ('INTEGER', '1'),
+            'total_commission': ('REAL', 'COALESCE({row}.commission_amount, 0)'),
+        },
+    ),
+)
+
+
+def _schema(rollup):
+    measures = ',\n'.join(
+        f"            {column} {kind} NOT NULL DEFAULT 0" for column, (kind, _) in rollup.measures.items()
+    )
+    return f"""
+        CREATE TABLE IF NOT EXISTS {rollup.table} (
+            partner_id INTEGER NOT NULL,
+            {rollup.period} TEXT NOT NULL,
+{measures},
+            PRIMARY KEY (partner_id, {rollup.period})
+        ) WITHOUT ROWID
+    """
+
+
+def _add_delta(rollup, row, sign):
+    """UPSERT que suma (o resta) el aporte de NEW/OLD a su bucket"""
+    bucket = rollup.bucket.format(row=row)
+    columns = ', '.join(rollup.measures)
+    values = ', '.join(f"{sign}({expr.format(row=row)})" for _, expr in rollup.measures.values())
+    updates = ', '.join(f"{column} = {column} + excluded.{column}" for column in rollup.measures)
+    statement = f"""
+        INSERT INTO {rollup.table} (partner_id, {rollup.period}, {columns})
+        SELECT {row}.partner_id, {bucket}, {values}
+        WHERE {row}.partner_id IS NOT NULL AND {bucket} IS NOT NULL
+        ON CONFLICT(partner_id, {rollup.period}) DO UPDATE SET {updates};"""
+    if sign == '-':
+        counter = next(iter(rollup.measures))
+        statement += f"""
+        DELETE FROM {rollup.table}
+        WHERE partner_id = {row}.partner_id AND {rollup.period} = {bucket} AND {counter} <= 0;"""
+    return statement
+
+
+def _trigger_statements(rollup):
+    add_new = _add_delta(rollup, 'NEW', '+')
+    remove_old = _add_delta(rollup, 'OLD', '-')
+    prefix = f"{rollup.table}_{rollup.source}"
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {prefix}_insert
+        AFTER INSERT ON {rollup.source}
+        BEGIN {add_new}
+        END""",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {prefix}_delete
+        AFTER DELETE ON {rollup.source}
+        BEGIN {remove_old}
+        END""",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {prefix}_update
+        AFTER UPDATE OF {', '.join(rollup.watched)} ON {rollup.source}
+        BEGIN {remove_old} {add_new}
+        END""",
+    ]
+
+
+# Los triggers escriben en las series: invalidar sus lecturas cacheadas junto con la tabla fuente
+for _rollup in ROLLUPS:
+    add_dependency(_rollup.source, _rollup.table)
+
+
+def recompute_sql(rollup):
+    """Recálculo completo de una serie: un GROUP BY sobre la tabla de origen"""
+    bucket = rollup.bucket.format(row='s')
+    measures = ', '.join(f"SUM({expr.format(row='s')}) as {column}" for column, (_, expr) in rollup.measures.items())
+    return f"""
+        SELECT s.partner_id, {bucket} as {rollup.period}, {measures}
+        FROM {rollup.source} s
+        WHERE s.partner_id IS NOT NULL AND {bucket} IS NOT NULL
+        GROUP BY s.partner_id, {bucket}
+    """
+
+
+def install_time_series(conn):
+    """
+    Crea las tablas y los triggers si faltan; las tablas nuevas se llenan
+    con un recálculo completo. No hace commit: lo decide el llamador.
+    """
+    for rollup in ROLLUPS:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (rollup.table,)
+        ).fetchone()
+        conn.execute(_schema(rollup))
+        for statement in _trigger_statements(rollup):
+            conn.execute(statement)
+        if not exists:
+            _fill(conn, rollup)
+
+
+def _fill(conn, rollup):
+    conn.execute(f"DELETE FROM {rollup.table}")
+    conn.execute(f"""
+        INSERT INTO {rollup.table} (partner_id, {rollup.period}, {', '.join(rollup.measures)})
+        {recompute_sql(rollup)}
+    """)
+
+
+def rebuild_time_series(conn):
+    """Recalcula todas las series desde cero en una sola transacción"""
+    with conn:
+        for rollup in ROLLUPS:
+            _fill(conn, rollup)
+
+
+def verify_time_series(conn):
+    """
+    Compara las series con un recálculo completo.
+    Devuelve [(tabla, partner_id, periodo, columna, guardado, esperado)];
+    vacía si están al día.
+    """
+    mismatches = []
+    for rollup in ROLLUPS:
+        columns = ', '.join(rollup.measures)
+        expected = {row[:2]: row[2:] for row in conn.execute(recompute_sql(rollup))}
+        stored = {
+            row[:2]: row[2:]
+            for row in conn.execute(f"SELECT partner_id, {rollup.period}, {columns} FROM {rollup.table}")
+        }
+        zeros = (0,) * len(rollup.measures)
+        for key in sorted(expected.keys() | stored.keys()):
+            for column, got, want in zip(rollup.measures, stored.get(key, zeros), expected.get(key, zeros)):
+                if abs((got or 0) - (want or 0)) > TOLERANCE:
+                    mismatches.append((rollup.table, *key, column, got, want))
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica o reconstruye las series de los gráficos de tendencia")
+    parser.add_argument('db', nargs='?', default=DB_PATH, help="ruta de crm_partner_bcs.db")
+    parser.add_argument('--rebuild', action='store_true', help="recalcula las series antes de verificar")
+    args = parser.parse_args()
+
+    conn = get_connection(args.db)
+    try:
+        with conn:
+            install_time_series(conn)
+        if args.rebuild:
+            rebuild_time_series(conn)
+            print(f"{', '.join(r.table for r in ROLLUPS)} reconstruidas")
+
+        mismatches = verify_time_series(conn)
+    finally:
+        conn.close()
+
+    if mismatches:
+        for table, partner_id, period, column, got, want in mismatches:
+            print(f"{table} partner {partner_id} {period}: {column} = {got}, esperado {want}")
+        print(f"{len(mismatches)} diferencias; ejecuta con --rebuild para corregir")
+        raise SystemExit(1)
+    print("Las series coinciden con el recálculo completo")
+
+
+if __name__ == "__main__":
+    main()
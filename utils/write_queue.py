@@ -0,0 +1,264 @@
+"""
+Cola de escritura en segundo plano para los formularios públicos.
+
+Las páginas de captación no escriben en la petición: encolan la fila y
+esperan a que un único hilo escritor la confirme. El hilo junta lo que
+haya en la cola (hasta BATCH_SIZE filas o BATCH_WAIT_MS de espera) y lo
+escribe con un solo commit. Con un único escritor por base no hay
+"database is locked" entre formularios simultáneos, y el coste del
+fsync se reparte entre todas las filas del lote.
+
+Durabilidad: write() sólo vuelve cuando el lote que contiene la fila
+está en disco (synchronous=FULL). Si falla, write() lanza la
+excepción y el formulario puede mostrar el error: sqlite3.Error si la
+fila o el lote no se pudieron escribir, o AckTimeout si el commit no se
+confirma en ACK_TIMEOUT. En ese caso la fila sigue en la cola y puede
+acabar escrita, así que reenviarla podría duplicarla.
+
+La cola es acotada: si está llena, write() espera ENQUEUE_TIMEOUT y
+lanza QueueFull, para que la página pida reintentar en lugar de
+acumular memoria sin límite.
+
+Configuración por entorno:
+    BCS_WRITE_QUEUE_SIZE      filas pendientes como máximo (1000)
+    BCS_WRITE_BATCH           filas por commit como máximo (100)
+    BCS_WRITE_BATCH_WAIT_MS   espera para completar un lote (5 ms)
+
+Métricas (profundidad de la cola, latencia de los commits) con
+write_queue_stats().
+"""
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from utils.connection_pool import PRAGMAS
+from utils.query_cache import invalidate, written_table
+
+QUEUE_SIZE = int(os.environ.get("BCS_WRITE_QUEUE_SIZE", 1000))
+BATCH_SIZE = int(os.environ.get("BCS_WRITE_BATCH", 100))
+BATCH_WAIT = float(os.environ.get("BCS_WRITE_BATCH_WAIT_MS", 5)) / 1000
+# Espera máxima para encolar (cola llena) y para la confirmación del commit
+ENQUEUE_TIMEOUT = 2.0
+ACK_TIMEOUT = 30.0
+# Latencias guardadas para los percentiles
+LATENCY_SAMPLES = 1000
+
+_STOP = object()
+
+
+class QueueFull(Exception):
+    """La cola de escritura sigue llena tras ENQUEUE_TIMEOUT"""
+
+
+class AckTimeout(Exception):
+    """El commit no se confirmó en ACK_TIMEOUT; la fila sigue en la cola y puede escribirse después"""
+
+
+class SqliteSink:
+    """Lotes de (sql, params) en una transacción; devuelve el lastrowid de cada fila"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = None
+
+    def write_batch(self, items):
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            for pragma in PRAGMAS:
+                self.conn.execute(pragma)
+            # El commit es el acuse de recibo: debe sobrevivir a un corte de luz
+            self.conn.execute("PRAGMA synchronous=FULL")
+
+        conn = self.conn
+        results, tables = [], set()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for sql, params in items:
+                # Un savepoint por fila: una fila inválida no tumba el lote
+                conn.execute("SAVEPOINT item")
+                try:
+                    results.append(conn.execute(sql, params).lastrowid)
+                    tables.add(written_table(sql))
+                except sqlite3.Error as e:
+                    conn.execute("ROLLBACK TO item")
+                    results.append(e)
+                conn.execute("RELEASE item")
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        tables.discard(None)
+        if tables:
+            invalidate(self.db_path, *tables)
+        return results
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class WriteQueue:
+    """Cola acotada + hilo escritor que confirma los lotes con un commit"""
+
+    def __init__(self, sink, max_queue=QUEUE_SIZE, max_batch=BATCH_SIZE, max_wait=BATCH_WAIT):
+        self.sink = sink
+        self.max_queue = max_queue
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._flush_ms = deque(maxlen=LATENCY_SAMPLES)
+        self._ack_ms = deque(maxlen=LATENCY_SAMPLES)
+        self.stats = {
+            'writes': 0,       # filas confirmadas
+            'failed': 0,       # filas rechazadas por la base o en lotes fallidos
+            'rejected': 0,     # filas no encoladas (cola llena)
+            'batches': 0,      # commits
+            'peak_depth': 0,   # mayor profundidad de cola observada
+        }
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="bcs-write-queue", daemon=True)
+                    self._thread.start()
+
+    def submit(self, item, timeout=ENQUEUE_TIMEOUT):
+        """Encola item y devuelve un Future que se resuelve tras el commit"""
+        self._ensure_thread()
+        future = Future()
+        try:
+            self._queue.put((item, future, time.perf_counter()), timeout=timeout)
+        except queue.Full:
+            with self._stats_lock:
+                self.stats['rejected'] += 1
+            raise QueueFull(f"Cola de escritura llena ({self.max_queue} pendientes)")
+        depth = self._queue.qsize()
+        with self._stats_lock:
+            self.stats['peak_depth'] = max(self.stats['peak_depth'], depth)
+        return future
+
+    def write(self, item, timeout=ACK_TIMEOUT):
+        """Encola item y espera a que esté en disco; devuelve el resultado del sink"""
+        future = self.submit(item)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            raise AckTimeout(f"Sin confirmación del commit tras {timeout:g} s") from None
+
+    def _next_batch(self):
+        first = self._queue.get()
+        if first is _STOP:
+            return None, True
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                entry = self._queue.get(timeout=max(remaining, 0)) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch, stop = self._next_batch()
+            if batch:
+                self._flush(batch)
+        self.sink.close()
+
+    def _flush(self, batch):
+        start = time.perf_counter()
+        try:
+            results = self.sink.write_batch([item for item, _, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        done = time.perf_counter()
+
+        failed = 0
+        for (_, future, enqueued), result in zip(batch, results):
+            if isinstance(result, Exception):
+                failed += 1
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+            self._ack_ms.append((done - enqueued) * 1000)
+        with self._stats_lock:
+            self._flush_ms.append((done - start) * 1000)
+            self.stats['batches'] += 1
+            self.stats['writes'] += len(batch) - failed
+            self.stats['failed'] += failed
+
+    def close(self, timeout=ACK_TIMEOUT):
+        """Escribe lo pendiente y detiene el hilo"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def snapshot(self):
+        with self._stats_lock:
+            data = dict(self.stats)
+            flush = sorted(self._flush_ms)
+        ack = sorted(self._ack_ms)
+        data['queue_depth'] = self._queue.qsize()
+        data['max_queue'] = self.max_queue
+        rows = data['writes'] + data['failed']
+        data['avg_batch'] = round(rows / data['batches'], 2) if data['batches'] else 0.0
+        data['flush_ms_p50'] = _percentile(flush, 0.50)
+        data['flush_ms_p95'] = _percentile(flush, 0.95)
+        data['flush_ms_max'] = round(flush[-1], 3) if flush else 0.0
+        # Desde que el formulario encola hasta que recibe la confirmación
+        data['ack_ms_p95'] = _percentile(ack, 0.95)
+        return data
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    return round(values[min(int(len(values) * q), len(values) - 1)], 3)
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def _get_queue(key, make_sink):
+    with _queues_lock:
+        if key not in _queues:
+            _queues[key] = WriteQueue(make_sink())
+        return _queues[key]
+
+
+def sqlite_write_queue(db_path):
+    """Cola compartida por el proceso para las escrituras en db_path"""
+    key = ('sqlite', os.path.abspath(str(db_path)))
+    return _get_queue(key, lambda: SqliteSink(db_path))
+
+
+def write_queue_stats():
+    with _queues_lock:
+        queues = dict(_queues)
+    return {f"{kind}:{path}": q.snapshot() for (kind, path), q in queues.items()}
+
+
+@atexit.register
+def _close_all():
+    with _queues_lock:
+        queues = list(_queues.values())
+    for q in queues:
+        q.close()